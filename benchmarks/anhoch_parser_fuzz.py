@@ -0,0 +1,236 @@
+"""
+Fuzz benchmark for the Anhoch name parsers.
+
+Compares uitls/anhoch_data_reforger.py against the regex parsers it replaced
+(kept below as the reference) on every name in data/anhoch_*.csv and on
+random names built from the tokens the patterns care about, then times both
+on adversarial names of growing length.
+
+    python benchmarks/anhoch_parser_fuzz.py [--names 50000] [--seed 0]
+"""
+import argparse
+import csv
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR / "uitls"))
+
+from anhoch_data_reforger import parse_laptop_name, parse_phone_name, parse_tv_name  # noqa: E402
+
+
+def legacy_parse_laptop_name(name):
+    pattern = r"Notebook\s+([A-Za-z0-9]+)\s+([A-Za-z0-9\s]+?)\s+([A-Za-z0-9\-]+)\/([A-Za-z0-9]+)\/([A-Za-z0-9\s]+)\/([A-Za-z0-9\.\"\s]+)\/(.+)"
+    match = re.search(pattern, name)
+
+    if not match:
+        pattern_fallback = r"Notebook\s+([A-Za-z0-9]+)\s+([A-Za-z0-9\s]+?)\s+([^\/]+)\/([^\/]+)\/([^\/]+)\/([^\/]+)\/(.+)"
+        match = re.search(pattern_fallback, name)
+        if not match:
+            return {"brand": None, "model_line": None, "cpu": None, "ram": None,
+                    "storage": None, "screen_info": None, "features": None}
+
+    brand = match.group(1).strip()
+    model_line = match.group(2).strip()
+    cpu = match.group(3).strip()
+    ram = match.group(4).strip()
+    storage = match.group(5).strip()
+    screen_info = match.group(6).strip()
+    features = match.group(7).strip()
+
+    screen_size_match = re.search(r'(\d+\.?\d*")', screen_info)
+    screen_size = screen_size_match.group(1) if screen_size_match else None
+
+    color = None
+    color_keywords = ['Grey', 'Black', 'Blue', 'Silver', 'White', 'Red', 'Gold', 'Fog Blue', 'Awesome Lavander',
+                      'Awesome White', 'Awesome Black']
+    for keyword in color_keywords:
+        if keyword in features:
+            color = keyword
+            break
+
+    return {
+        "brand": brand,
+        "model_line": model_line,
+        "cpu": cpu,
+        "ram": ram,
+        "storage": storage,
+        "screen_size": screen_size,
+        "screen_info": screen_info,
+        "features": features,
+        "color": color
+    }
+
+
+def legacy_parse_phone_name(name):
+    pattern = r"([A-Za-z]+)\s+([A-Za-z0-9\s]+?)\s+([A-Za-z0-9]+)\/([A-Za-z0-9]+)\s+([A-Za-z\s]+)"
+    match = re.search(pattern, name)
+
+    if not match:
+        return {"brand": None, "model": None, "ram": None, "storage": None, "color": None}
+
+    return {
+        "brand": match.group(1).strip(),
+        "model": match.group(2).strip(),
+        "ram": match.group(3).strip(),
+        "storage": match.group(4).strip(),
+        "color": match.group(5).strip()
+    }
+
+
+def legacy_parse_tv_name(name):
+    pattern1 = r"TV\s+([A-Za-z]+)\s+(\d+\")\s+([A-Za-z0-9\-]+)\s+([A-Za-z0-9\s]+?)\s+([A-Za-z]+)\s+([A-Za-z\s]+)"
+    match = re.search(pattern1, name)
+
+    if match:
+        brand = match.group(1).strip()
+        size = match.group(2).strip()
+        model = match.group(3).strip()
+        resolution = match.group(4).strip()
+        tv_type = match.group(5).strip()
+        features = match.group(6).strip()
+    else:
+        pattern2 = r"([A-Za-z]+)\s+([A-Za-z0-9\-]+)\s+(\d+\")\s+([A-Za-z0-9\s]+)"
+        match = re.search(pattern2, name)
+        if match:
+            brand = match.group(1).strip()
+            model = match.group(2).strip()
+            size = match.group(3).strip()
+            features = match.group(4).strip()
+            resolution = None
+            tv_type = None
+        else:
+            return {"brand": None, "model": None, "size": None, "resolution": None,
+                    "type": None, "features": None}
+
+    return {
+        "brand": brand,
+        "model": model,
+        "size": size,
+        "resolution": resolution,
+        "type": tv_type,
+        "features": features
+    }
+
+
+PARSERS = {
+    "laptop": (legacy_parse_laptop_name, parse_laptop_name),
+    "phone": (legacy_parse_phone_name, parse_phone_name),
+    "tv": (legacy_parse_tv_name, parse_tv_name),
+}
+
+# Fragments the patterns branch on, plus characters that sit at the edges of
+# their character classes (non-ASCII letters and digits, other whitespace).
+TOKENS = ["Notebook", "TV", "Dell", "Samsung", "Latitude", "5540", "i5-1335U", "16GB", "512GB", "SSD", '15.6"',
+          '55"', "4K", "UHD", "Smart", "Black", "Fog Blue", "A", "x", "1", "7.", "-", ".", '"', "/", "//", " ",
+          " ", " ", "  ", "   ", "\t", "\n", "\xa0", "é", "٣", "_", ","]
+
+
+def random_name(rng):
+    return "".join(rng.choice(TOKENS) for _ in range(rng.randint(1, 24)))
+
+
+# Names that make chained \s+ / lazy groups retry every split of a long run.
+ADVERSARIAL = {
+    "laptop-spaces": lambda n: "Notebook Dell " + " " * n + "x",
+    "laptop-words": lambda n: "Notebook Dell " + "a " * n + "-x/1/1/1",
+    "phone-spaces": lambda n: "Samsung A" + " " * n + "1/",
+    "phone-words": lambda n: "a " * n + "-",
+    "tv-spaces": lambda n: 'TV A 1" M' + " " * n + "-",
+    "tv-words": lambda n: 'TV LG 55" X ' * n,
+}
+
+
+def load_real_names():
+    names = []
+    for path in sorted((BASE_DIR / "data").glob("anhoch_*.csv")):
+        with open(path, newline="", encoding="utf-8") as f:
+            names.extend(row["name"] for row in csv.DictReader(f) if row.get("name"))
+    return names
+
+
+def compare(names, label):
+    mismatches = 0
+    for name in names:
+        for kind, (legacy, current) in PARSERS.items():
+            expected, actual = legacy(name), current(name)
+            if expected != actual:
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"  {kind} mismatch on {name!r}\n    legacy:  {expected}\n    current: {actual}")
+    print(f"{label}: {len(names)} names x {len(PARSERS)} parsers, {mismatches} mismatches")
+    return mismatches
+
+
+def time_one(parse, name, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(name)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def adversarial_timings(sizes, legacy_budget):
+    """Worst per-name time of both implementations as names grow; the legacy side stops once it exceeds the budget."""
+    rows = []
+    for family, build in ADVERSARIAL.items():
+        kind = family.split("-")[0]
+        legacy, current = PARSERS[kind]
+        legacy_done = False
+        for size in sizes:
+            name = build(size)
+            current_time = time_one(current, name)
+            legacy_time = None
+            if not legacy_done:
+                start = time.perf_counter()
+                expected = legacy(name)
+                legacy_time = time.perf_counter() - start
+                legacy_done = legacy_time > legacy_budget
+                if expected != current(name):
+                    print(f"  {family} mismatch at length {len(name)}")
+            rows.append((family, len(name), legacy_time, current_time))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--names", type=int, default=50000, help="random names to compare")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-length", type=int, default=8192, help="longest adversarial name")
+    parser.add_argument("--legacy-budget", type=float, default=2.0, help="seconds before legacy timing stops")
+    args = parser.parse_args()
+
+    failures = compare(load_real_names(), "Real CSV names")
+
+    rng = random.Random(args.seed)
+    failures += compare([random_name(rng) for _ in range(args.names)], "Random names")
+
+    sizes = []
+    size = 16
+    while size <= args.max_length:
+        sizes.append(size)
+        size *= 4
+
+    print(f"\n{'family':<14} {'length':>8} {'legacy':>12} {'current':>12}")
+    worst = {}
+    for family, length, legacy_time, current_time in adversarial_timings(sizes, args.legacy_budget):
+        legacy_text = f"{legacy_time * 1000:.2f} ms" if legacy_time is not None else "skipped"
+        print(f"{family:<14} {length:>8} {legacy_text:>12} {current_time * 1000:>9.2f} ms")
+        worst[family] = (length, current_time)
+
+    # Linear time: the longest names should cost about length x per-character time.
+    for family, (length, current_time) in worst.items():
+        per_char_us = current_time / length * 1_000_000
+        if per_char_us > 5:
+            print(f"{family}: {per_char_us:.1f} µs per character at length {length}")
+            failures += 1
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
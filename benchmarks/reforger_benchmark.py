@@ -0,0 +1,397 @@
+"""
+Throughput and memory benchmark for the four reforgers.
+
+For every retailer and corpus scale it measures
+  - startup:  importing the reforger and reading its first CSV row, with the
+              chosen input backend (csv, or pandas loaded on demand)
+  - parse:    the parse_*_name functions, rows/sec
+  - schema:   parse_price + create_product_schema, rows/sec
+  - pipeline: the whole process_*_data run (CSV in, JSON-LD out, derived
+              outputs off so the shared catalogue files are left alone)
+and the peak RSS of each measurement. Scale 1 is data/ itself; larger scales
+are synthetic corpora generated from the real names (cached under
+benchmarks/corpora/). Each measurement runs in its own process, and every
+run is appended to benchmarks/results/reforger.jsonl and compared with the
+previous one.
+
+    python benchmarks/reforger_benchmark.py [--scales 1,10,100,1000] [--retailers anhoch,setec]
+                                            [--backends csv,pandas]
+"""
+import argparse
+import contextlib
+import csv
+import hashlib
+import io
+import json
+import platform
+import random
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = BASE_DIR / "data"
+CORPORA_DIR = BASE_DIR / "benchmarks" / "corpora"
+RESULTS_FILE = BASE_DIR / "benchmarks" / "results" / "reforger.jsonl"
+sys.path.insert(0, str(BASE_DIR / "uitls"))
+
+from parse_profiler import REFORGERS  # noqa: E402
+from reforge_input import BACKENDS  # noqa: E402
+
+FILES = {
+    "anhoch": [("anhoch_laptops.csv", "Laptops", "parse_laptop_name"),
+               ("anhoch_phones.csv", "Smartphones", "parse_phone_name"),
+               ("anhoch_tvs.csv", "Televisions", "parse_tv_name")],
+    "neptun": [("neptun_laptops.csv", "Laptops", "parse_laptop_name"),
+               ("neptun_phones.csv", "Smartphones", "parse_phone_name"),
+               ("neptun_tvs.csv", "Televisions", "parse_tv_name")],
+    "setec": [("setec_laptops.csv", "Laptops", "parse_laptop_name"),
+              ("setec_smartphones.csv", "Smartphones", "parse_phone_name"),
+              ("setec_oled_tvs.csv", "Televisions", "parse_tv_name")],
+    "tehnomarket": [("tehnomarket_laptops.csv", "Laptops", "parse_laptop_name"),
+                    ("tehnomarket_phones.csv", "Smartphones", "parse_phone_name"),
+                    ("tehnomarket_tvs.csv", "Televisions", "parse_tv_name")],
+}
+
+STAGES = ["startup", "functions", "pipeline"]
+GENERATOR_VERSION = 1
+
+
+# Synthetic corpora ----------------------------------------------------------
+
+CAPACITY = re.compile(r'(?<![\d.])(\d+)(\s?)(GB|TB)\b', re.IGNORECASE)
+SCREEN = re.compile(r'(?<![\d.])(\d{2}(?:[.,]\d)?)(\s?(?:"|”|\'\'|inch|cm))', re.IGNORECASE)
+CODE = re.compile(r'\b(?=[A-Za-z0-9-]*\d)(?=[A-Za-z0-9-]*[A-Za-z])[A-Za-z0-9-]{4,}\b')
+
+
+# Capacities are re-rolled within their class: small values are RAM, larger ones storage.
+CAPACITY_LADDERS = {"GB": [["4", "6", "8", "12", "16", "24", "32", "64"], ["64", "128", "256", "512"]],
+                    "TB": [["1", "2", "4"]]}
+
+
+def screen_sizes(names):
+    """Screen sizes that occur in a file, so variants only use sizes the retailer lists."""
+    return sorted({size for name in names for size, _ in SCREEN.findall(name)})
+
+
+def vary_name(name, screens, rng):
+    """
+    A realistic sibling of a real listing: RAM and storage moved along the
+    usual capacity steps, screen sizes drawn from the same file and the
+    digits of model codes (after the first one) re-rolled, so the names keep
+    the shapes the parsers expect.
+    """
+    def capacity(match):
+        unit = match.group(3).upper()
+        ladders = CAPACITY_LADDERS[unit]
+        ladder = ladders[0] if len(ladders) == 1 or int(match.group(1)) < 64 else ladders[1]
+        return rng.choice(ladder) + match.group(2) + match.group(3)
+
+    def screen(match):
+        return (rng.choice(screens) if screens else match.group(1)) + match.group(2)
+
+    def code(match):
+        text = match.group()
+        first_digit = next(index for index, char in enumerate(text) if char.isdigit())
+        return text[:first_digit + 1] + "".join(
+            str(rng.randrange(10)) if char.isdigit() else char for char in text[first_digit + 1:])
+
+    # Codes first: tokens such as "512GB" look like codes too and must end up on the ladder.
+    return CAPACITY.sub(capacity, SCREEN.sub(screen, CODE.sub(code, name)))
+
+
+def read_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        return reader.fieldnames, list(reader)
+
+
+def _source_digest():
+    digest = hashlib.blake2b(str(GENERATOR_VERSION).encode(), digest_size=12)
+    for path in sorted(DATA_DIR.glob("*.csv")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def corpus_dir(scale, seed=0):
+    """
+    data/ for scale 1; otherwise benchmarks/corpora/x<scale>/, regenerated
+    when the real CSVs, the seed or the generator change. Every real row is
+    kept and followed by scale - 1 variants with the same prices.
+    """
+    if scale == 1:
+        return DATA_DIR
+
+    target = CORPORA_DIR / f"x{scale}"
+    stamp = f"{_source_digest()} seed={seed}"
+    marker = target / ".source"
+    if marker.exists() and marker.read_text() == stamp:
+        return target
+
+    target.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    for files in FILES.values():
+        for filename, _, _ in files:
+            source = DATA_DIR / filename
+            if not source.exists():
+                continue
+            fieldnames, rows = read_rows(source)
+            screens = screen_sizes(row["name"] for row in rows if row.get("name"))
+            rng = random.Random(f"{seed}:{filename}")
+            with open(target / filename, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer.writeheader()
+                for copy in range(scale):
+                    for row in rows:
+                        if copy and row.get("name"):
+                            row = dict(row, name=vary_name(row["name"], screens, rng))
+                        writer.writerow(row)
+    marker.write_text(stamp)
+    print(f"Generated the x{scale} corpus in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+    return target
+
+
+# Measurements (each runs in a fresh worker process) ---------------------------
+
+def _schema_builders(module):
+    """row -> the price arguments create_product_schema takes, or None where the reforger skips the row."""
+    def anhoch(row):
+        return module.parse_price(row["price"])
+
+    def neptun(row):
+        if row["name"] == "N/A":
+            return None
+        price_data = {key: module.parse_price(row[key]) for key in ("price", "regular_price", "discount_price")}
+        return None if price_data["price"] is None else (price_data,)
+
+    def single(row):
+        price = module.parse_price(row["price"])
+        return None if price is None else (price,)
+
+    return {"anhoch_data_reforger": anhoch, "neptun_data_reforger": neptun}.get(module.__name__, single)
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure_startup(retailer, data_dir, backend):
+    """Time from a bare interpreter to the first row handed to the reforger loop."""
+    import importlib
+
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    module = importlib.import_module(REFORGERS[retailer][0])
+    imported = time.perf_counter()
+    first_file = next((Path(data_dir) / filename for filename, _, _ in FILES[retailer]
+                       if (Path(data_dir) / filename).exists()), None)
+    if first_file is not None:
+        next(module.read_rows(first_file, backend=backend), None)
+    elapsed = time.perf_counter() - start
+
+    return {"import_seconds": imported - start, "seconds": elapsed, "baseline_rss_mb": baseline,
+            "peak_rss_mb": _peak_rss_mb()}
+
+
+def measure_functions(retailer, data_dir, backend):
+    import importlib
+
+    module = importlib.import_module(REFORGERS[retailer][0])
+    price_arguments = _schema_builders(module)
+    rows = parse_time = schema_time = 0
+    baseline = _peak_rss_mb()
+    counter = time.perf_counter
+
+    for filename, category, parser_name in FILES[retailer]:
+        path = Path(data_dir) / filename
+        if not path.exists():
+            continue
+        parser = getattr(module, parser_name)
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if not row["name"]:
+                    continue
+                rows += 1
+                start = counter()
+                arguments = price_arguments(row)
+                if arguments is None:
+                    schema_time += counter() - start
+                    continue
+                parsed_at = counter()
+                parsed = parser(row["name"])
+                built_at = counter()
+                module.create_product_schema(f"{retailer}-{category.lower()}-{rows}", category, row["name"],
+                                             *arguments, parsed)
+                end = counter()
+                parse_time += built_at - parsed_at
+                schema_time += (parsed_at - start) + (end - built_at)
+
+    return {"rows": rows, "parse_rows_per_sec": rows / parse_time if parse_time else None,
+            "schema_rows_per_sec": rows / schema_time if schema_time else None,
+            "baseline_rss_mb": baseline, "peak_rss_mb": _peak_rss_mb()}
+
+
+def measure_pipeline(retailer, data_dir, backend):
+    import importlib
+
+    module_name, function_name = REFORGERS[retailer]
+    process = getattr(importlib.import_module(module_name), function_name)
+    rows = 0
+    for filename, _, _ in FILES[retailer]:
+        path = Path(data_dir) / filename
+        if path.exists():
+            with open(path, newline="", encoding="utf-8") as f:
+                rows += sum(1 for _ in csv.DictReader(f))
+    baseline = _peak_rss_mb()
+
+    with tempfile.TemporaryDirectory() as output_dir, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        products = process(data_dir=data_dir, output_dir=output_dir, derived_outputs=False, backend=backend)
+        elapsed = time.perf_counter() - start
+        output_bytes = sum(path.stat().st_size for path in Path(output_dir).iterdir())
+
+    return {"rows": rows, "products": len(products), "seconds": elapsed, "rows_per_sec": rows / elapsed,
+            "output_mb": output_bytes / 1024 / 1024, "baseline_rss_mb": baseline, "peak_rss_mb": _peak_rss_mb()}
+
+
+def run_worker(stage, retailer, data_dir, backend, timeout):
+    command = [sys.executable, __file__, "--worker", stage, retailer, str(data_dir), backend]
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"error": f"timed out after {timeout} s"}
+    if completed.returncode != 0:
+        reason = f"signal {-completed.returncode}" if completed.returncode < 0 else f"exit {completed.returncode}"
+        tail = completed.stderr.strip().splitlines()[-1:] or [""]
+        return {"error": f"{reason} {tail[0]}".strip()}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+# Results ------------------------------------------------------------------------
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_previous_run(path=RESULTS_FILE):
+    if not path.exists():
+        return None
+    last = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                last = json.loads(line)
+    return last
+
+
+def _rate(value):
+    return f"{value:>10,.0f}" if value else f"{'-':>10}"
+
+
+def _change(current, previous):
+    if not current or not previous:
+        return ""
+    return f" ({(current - previous) / previous:+.0%})"
+
+
+def _result_key(result):
+    # Runs from before the backend option read everything through pandas; the
+    # functions stage does not read through a backend at all.
+    backend = None if result["stage"] == "functions" else result.get("backend", "pandas")
+    return result["retailer"], result["scale"], result["stage"], backend
+
+
+def print_results(results, previous=None):
+    before = {_result_key(r): r for r in (previous or {}).get("results", [])}
+    print(f"\n{'retailer':<12} {'scale':>6} {'backend':<8} {'stage':<16} {'rows':>9} {'rows/sec':>10}  "
+          f"{'':<8}{'peak MB':>8}")
+    for result in results:
+        key = (result["retailer"], result["scale"], result["stage"], result["backend"])
+        old = before.get(_result_key(result), {})
+        prefix = f"{key[0]:<12} {key[1]:>5}x {key[3]:<8}"
+        if "error" in result:
+            print(f"{prefix} {key[2]:<16} failed: {result['error']}")
+            continue
+        if result["stage"] == "startup":
+            print(f"{prefix} {key[2]:<16} {'':>9} {result['seconds'] * 1000:>7.0f} ms  "
+                  f"{_change(result['seconds'], old.get('seconds')):<8}{result['peak_rss_mb']:>8.0f}"
+                  f"   (import {result['import_seconds'] * 1000:.0f} ms)")
+            continue
+        rates = ([("parse", "parse_rows_per_sec"), ("schema", "schema_rows_per_sec")]
+                 if result["stage"] == "functions" else [("total", "rows_per_sec")])
+        for label, field in rates:
+            print(f"{prefix} {key[2] + '/' + label if label != 'total' else key[2]:<16} "
+                  f"{result['rows']:>9,} {_rate(result[field])}  {_change(result[field], old.get(field)):<8}"
+                  f"{result['peak_rss_mb']:>8.0f}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        stage, retailer, data_dir, backend = sys.argv[2:6]
+        measure = {"startup": measure_startup, "functions": measure_functions, "pipeline": measure_pipeline}[stage]
+        print(json.dumps(measure(retailer, data_dir, backend)))
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", default="1,10,100,1000", help="comma-separated corpus multipliers")
+    parser.add_argument("--retailers", default=",".join(REFORGERS))
+    parser.add_argument("--stages", default=",".join(STAGES))
+    parser.add_argument("--backends", default="csv", help="CSV input backends to compare, e.g. csv,pandas")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=1800, help="seconds per measurement")
+    parser.add_argument("--label", help="stored with the results, e.g. the change being measured")
+    parser.add_argument("--no-save", action="store_true", help="do not append to the results file")
+    args = parser.parse_args()
+
+    scales = [int(scale) for scale in args.scales.split(",")]
+    retailers = args.retailers.split(",")
+    stages = args.stages.split(",")
+    backends = args.backends.split(",")
+    for retailer in retailers:
+        if retailer not in REFORGERS:
+            parser.error(f"unknown retailer {retailer!r}")
+    for stage in stages:
+        if stage not in STAGES:
+            parser.error(f"unknown stage {stage!r}")
+    for backend in backends:
+        if backend not in BACKENDS:
+            parser.error(f"unknown backend {backend!r}")
+
+    results = []
+    for scale in scales:
+        data_dir = corpus_dir(scale, args.seed)
+        for retailer in retailers:
+            for stage in stages:
+                # The parse and schema functions never touch the input backend.
+                for backend in backends if stage != "functions" else backends[:1]:
+                    print(f"{retailer} x{scale} {stage} ({backend})...", file=sys.stderr)
+                    result = run_worker(stage, retailer, data_dir, backend, args.timeout)
+                    results.append({"retailer": retailer, "scale": scale, "stage": stage, "backend": backend,
+                                    **result})
+
+    previous = load_previous_run()
+    print_results(results, previous)
+    if previous:
+        print(f"\nChanges are relative to the run of {previous['timestamp']} ({previous.get('commit')})")
+
+    if not args.no_save:
+        RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        run = {"timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"), "commit": _git_commit(),
+               "label": args.label, "python": platform.python_version(), "seed": args.seed, "results": results}
+        with open(RESULTS_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run) + "\n")
+        print(f"Results appended to {RESULTS_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,12 +7,20 @@ from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
 import time
 import csv
-import os
+from pathlib import Path
 import random
+from page_cache import LazyDriver, open_cache
 
 # Path to your ChromeDriver
 CHROMEDRIVER_PATH = r"C:\Users\dakag\Downloads\chromedriver-win64\chromedriver.exe"
 
+# The scraped CSVs go to <repo>/data, wherever the script is run from.
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+# The listing is in the server-rendered HTML, so the page cache may reuse
+# products when a plain HTTP probe shows the page unchanged.
+PROBE_CACHE = True
+
 
 def setup_driver():
     chrome_options = Options()
@@ -25,50 +33,88 @@ def setup_driver():
     return driver
 
 
-def scrape_anhoch_products(category_url, category_name, max_pages=1):
-    driver = setup_driver()
-    all_products = []
-    page = 1
+CATEGORIES = {
+    "laptops": ("https://www.anhoch.com/categories/site-laptopi/products?brand=&attribute=&toPrice=324980&inStockOnly=2&sort=latest&perPage=50", "Laptops", 6),
+    "tvs": ("https://www.anhoch.com/categories/Televisions/products?brand=&attribute=&toPrice=324980&inStockOnly=2&sort=latest&perPage=50", "TVs", 4),
+    "phones": ("https://www.anhoch.com/categories/mobilni-telefoni/products?brand=&attribute=&toPrice=324980&inStockOnly=2&sort=latest&perPage=50", "Phones", 6),
+}
 
-    while page <= max_pages:
-        url = f"{category_url}&page={page}"
-        print(f"Scraping {url}")
 
+def page_url(category_url, page):
+    return f"{category_url}&page={page}"
+
+
+def load_page(driver, url):
+    driver.get(url)
+    WebDriverWait(driver, 15).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, "div.product-card"))
+    )
+
+    # Scroll to trigger lazy loading
+    for _ in range(3):
+        driver.execute_script("window.scrollBy(0, 500)")
+        time.sleep(random.uniform(0.5, 1.5))
+
+    return driver.page_source
+
+
+def extract_products(html):
+    soup = BeautifulSoup(html, "lxml")
+    products = []
+
+    for product in soup.select("div.product-card"):
         try:
-            driver.get(url)
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div.product-card"))
-            )
+            name_elem = product.select_one("a.product-name h6")
+            name = name_elem.get_text(strip=True) if name_elem else "N/A"
 
-            # Scroll to trigger lazy loading
-            for _ in range(3):
-                driver.execute_script("window.scrollBy(0, 500)")
-                time.sleep(random.uniform(0.5, 1.5))
+            price_elem = product.select_one("div.product-price")
+            price = price_elem.get_text(strip=True) if price_elem else "N/A"
 
-            soup = BeautifulSoup(driver.page_source, "lxml")
-            products = soup.select("div.product-card")
+            products.append({
+                "name": name,
+                "price": price
+            })
 
-            if not products:
-                print(f"No products found on page {page}")
-                break
+        except Exception as e:
+            print(f"Error processing product: {e}")
+            continue
 
-            for product in products:
-                try:
-                    name_elem = product.select_one("a.product-name h6")
-                    name = name_elem.get_text(strip=True) if name_elem else "N/A"
+    return products
 
-                    price_elem = product.select_one("div.product-price")
-                    price = price_elem.get_text(strip=True) if price_elem else "N/A"
 
-                    all_products.append({
-                        "name": name,
-                        "price": price
-                    })
+def scrape_page(driver, category_url, page, cache=None):
+    url = page_url(category_url, page)
+    print(f"Scraping {url}")
+    if cache is not None:
+        return cache.products(url, lambda: load_page(driver, url), extract_products, probe=PROBE_CACHE)
+    return extract_products(load_page(driver, url))
 
-                except Exception as e:
-                    print(f"Error processing product: {e}")
-                    continue
 
+def save_products(category_name, products):
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    filename = DATA_DIR / f"anhoch_{category_name.lower().replace(' ', '_')}.csv"
+    with open(filename, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["name", "price"])
+        writer.writeheader()
+        writer.writerows(products)
+    return filename
+
+
+def scrape_anhoch_products(category_url, category_name, max_pages=1):
+    driver = LazyDriver(setup_driver)
+    cache = open_cache()
+    all_products = []
+    page = 1
+
+    while page <= max_pages:
+        try:
+            products = scrape_page(driver, category_url, page, cache)
+
+            if not products:
+                print(f"No products found on page {page}")
+                break
+
+            all_products.extend(products)
             page += 1
             time.sleep(random.uniform(2, 4))
 
@@ -77,31 +123,25 @@ def scrape_anhoch_products(category_url, category_name, max_pages=1):
             break
 
     driver.quit()
+    if cache is not None:
+        print(f"Page cache: {cache.summary()}")
+        cache.close()
 
-    os.makedirs("../data", exist_ok=True)
-    filename = f"../data/anhoch_{category_name.lower().replace(' ', '_')}.csv"
-    with open(filename, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=["name", "price"])
-        writer.writeheader()
-        writer.writerows(all_products)
-
+    filename = save_products(category_name, all_products)
     print(f"Scraped {len(all_products)} {category_name} products. Saved to {filename}")
     return all_products
 
 
 def scrape_laptops():
-    url = "https://www.anhoch.com/categories/site-laptopi/products?brand=&attribute=&toPrice=324980&inStockOnly=2&sort=latest&perPage=50"
-    return scrape_anhoch_products(url, "Laptops", max_pages=6)
+    return scrape_anhoch_products(*CATEGORIES["laptops"])
 
 
 def scrape_tvs():
-    url = "https://www.anhoch.com/categories/Televisions/products?brand=&attribute=&toPrice=324980&inStockOnly=2&sort=latest&perPage=50"
-    return scrape_anhoch_products(url, "TVs", max_pages=4)
+    return scrape_anhoch_products(*CATEGORIES["tvs"])
 
 
 def scrape_phones():
-    url = "https://www.anhoch.com/categories/mobilni-telefoni/products?brand=&attribute=&toPrice=324980&inStockOnly=2&sort=latest&perPage=50"
-    return scrape_anhoch_products(url, "Phones", max_pages=6)
+    return scrape_anhoch_products(*CATEGORIES["phones"])
 
 
 if __name__ == "__main__":
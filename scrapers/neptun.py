@@ -7,12 +7,20 @@ from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
 import time
 import csv
-import os
+from pathlib import Path
 import random
+from page_cache import LazyDriver, open_cache
 
 # Path to your ChromeDriver
 CHROMEDRIVER_PATH = r"C:\Users\dakag\Downloads\chromedriver-win64\chromedriver.exe"
 
+# The scraped CSVs go to <repo>/data, wherever the script is run from.
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+# Neptun fills in its prices with Angular after the page loads, so the raw HTML
+# the page cache probes is the same shell on every run; always render.
+PROBE_CACHE = False
+
 
 def setup_driver():
     chrome_options = Options()
@@ -25,50 +33,88 @@ def setup_driver():
     return driver
 
 
-def scrape_neptun_products(category_url, category_name, max_pages=15):
-    driver = setup_driver()
-    all_products = []
-    page = 1
+CATEGORIES = {
+    "tvs": ("https://www.neptun.mk/televizori.nspx", "TVs", 13),
+    "phones": ("https://www.neptun.mk/mobilni_telefoni.nspx", "Phones", 11),
+    "laptops": ("https://www.neptun.mk/prenosni_kompjuteri.nspx", "Laptops", 7),
+}
 
-    while page <= max_pages:
-        url = f"{category_url}?page={page}"
-        print(f"Scraping {url}")
 
+def page_url(category_url, page):
+    return f"{category_url}?page={page}"
+
+
+def load_page(driver, url):
+    driver.get(url)
+    WebDriverWait(driver, 15).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, "div.white-box"))
+    )
+
+    # Scroll to trigger lazy loading
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2)")
+    time.sleep(random.uniform(1, 2))
+
+    return driver.page_source
+
+
+def extract_products(html):
+    soup = BeautifulSoup(html, "lxml")
+    products = []
+
+    for product in soup.select("div.white-box"):
         try:
-            driver.get(url)
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div.white-box"))
-            )
+            name_elem = product.select_one("h2.product-list-item__content--title")
+            name = name_elem.get_text(strip=True) if name_elem else "N/A"
 
-            # Scroll to trigger lazy loading
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2)")
-            time.sleep(random.uniform(1, 2))
+            price_elem = product.select_one(
+                "div.product-price__amount span.product-price__amount--value.ng-binding")
+            price = price_elem.get_text(strip=True) + " ден." if price_elem else "N/A"
 
-            soup = BeautifulSoup(driver.page_source, "lxml")
-            products = soup.select("div.white-box")
+            products.append({
+                "name": name,
+                "price": price
+            })
 
-            if not products:
-                print(f"No products found on page {page}")
-                break
+        except Exception as e:
+            print(f"Error processing product: {e}")
+            continue
 
-            for product in products:
-                try:
-                    name_elem = product.select_one("h2.product-list-item__content--title")
-                    name = name_elem.get_text(strip=True) if name_elem else "N/A"
+    return products
 
-                    price_elem = product.select_one(
-                        "div.product-price__amount span.product-price__amount--value.ng-binding")
-                    price = price_elem.get_text(strip=True) + " ден." if price_elem else "N/A"
 
-                    all_products.append({
-                        "name": name,
-                        "price": price
-                    })
+def scrape_page(driver, category_url, page, cache=None):
+    url = page_url(category_url, page)
+    print(f"Scraping {url}")
+    if cache is not None:
+        return cache.products(url, lambda: load_page(driver, url), extract_products, probe=PROBE_CACHE)
+    return extract_products(load_page(driver, url))
 
-                except Exception as e:
-                    print(f"Error processing product: {e}")
-                    continue
 
+def save_products(category_name, products):
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    filename = DATA_DIR / f"neptun_{category_name.lower().replace(' ', '_')}.csv"
+    with open(filename, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["name", "price"])
+        writer.writeheader()
+        writer.writerows(products)
+    return filename
+
+
+def scrape_neptun_products(category_url, category_name, max_pages=15):
+    driver = LazyDriver(setup_driver)
+    cache = open_cache()
+    all_products = []
+    page = 1
+
+    while page <= max_pages:
+        try:
+            products = scrape_page(driver, category_url, page, cache)
+
+            if not products:
+                print(f"No products found on page {page}")
+                break
+
+            all_products.extend(products)
             page += 1
             time.sleep(random.uniform(2, 4))
 
@@ -77,31 +123,25 @@ def scrape_neptun_products(category_url, category_name, max_pages=15):
             break
 
     driver.quit()
+    if cache is not None:
+        print(f"Page cache: {cache.summary()}")
+        cache.close()
 
-    os.makedirs("../data", exist_ok=True)
-    filename = f"../data/neptun_{category_name.lower().replace(' ', '_')}.csv"
-    with open(filename, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=["name", "price"])
-        writer.writeheader()
-        writer.writerows(all_products)
-
+    filename = save_products(category_name, all_products)
     print(f"Scraped {len(all_products)} {category_name} products. Saved to {filename}")
     return all_products
 
 
 def scrape_tvs():
-    url = "https://www.neptun.mk/televizori.nspx"
-    return scrape_neptun_products(url, "TVs", max_pages=13)
+    return scrape_neptun_products(*CATEGORIES["tvs"])
 
 
 def scrape_phones():
-    url = "https://www.neptun.mk/mobilni_telefoni.nspx"
-    return scrape_neptun_products(url, "Phones", max_pages=11)
+    return scrape_neptun_products(*CATEGORIES["phones"])
 
 
 def scrape_laptops():
-    url = "https://www.neptun.mk/prenosni_kompjuteri.nspx"
-    return scrape_neptun_products(url, "Laptops", max_pages=7)
+    return scrape_neptun_products(*CATEGORIES["laptops"])
 
 
 if __name__ == "__main__":
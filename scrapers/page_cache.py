@@ -0,0 +1,170 @@
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+CACHE_FILE = DATA_DIR / "page_cache.sqlite"
+
+MAX_BYTES = 32 * 1024 * 1024
+# Prices that a site fills in with JavaScript after the page has loaded do
+# not change the HTML the probe sees, so every page still gets one real
+# browser load per MAX_AGE.
+MAX_AGE = 24 * 3600
+PROBE_TIMEOUT = 15
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/120.0 Safari/537.36")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    body_hash TEXT,
+    rendered_hash TEXT,
+    products TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    rendered_at REAL NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_used ON pages (used_at);
+"""
+
+
+class LazyDriver:
+    """Stands in for a WebDriver and starts the browser only when a page actually has to be rendered."""
+
+    def __init__(self, setup):
+        self._setup = setup
+        self._driver = None
+
+    def __getattr__(self, name):
+        if self._driver is None:
+            self._driver = self._setup()
+        return getattr(self._driver, name)
+
+    def quit(self):
+        if self._driver is not None:
+            self._driver.quit()
+            self._driver = None
+
+
+def body_hash(body):
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def probe_page(url, etag=None, last_modified=None, timeout=PROBE_TIMEOUT):
+    """
+    Plain conditional GET of the listing page. Returns (status, etag,
+    last_modified, body hash); status is None when the site refused the
+    request, in which case the caller just renders the page.
+    """
+    headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip"}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout) as response:
+            body = response.read()
+            if response.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            return (response.status, response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                    body_hash(body))
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return 304, e.headers.get("ETag") or etag, e.headers.get("Last-Modified") or last_modified, None
+        return None, None, None, None
+    except (OSError, ValueError):
+        return None, None, None, None
+
+
+class PageCache:
+    """
+    Remembers, per listing URL, the validators (ETag, Last-Modified, body
+    hash) of the last fetch and the products extracted from it. A page that
+    answers 304 or comes back with the same body is not rendered or parsed
+    again. The least recently used pages are evicted once the stored
+    products exceed max_bytes.
+    """
+
+    def __init__(self, path=CACHE_FILE, max_bytes=MAX_BYTES, max_age=MAX_AGE):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.stats = {"not modified": 0, "same body": 0, "same render": 0, "rendered": 0}
+
+    def products(self, url, load, extract, probe=True):
+        """
+        The products of `url`: from the cache when the page is unchanged,
+        otherwise extract(load()). `load` renders the page and returns its
+        HTML; it is only called when the cached products cannot be used.
+        With probe=False, for sites whose raw HTML does not carry the listing,
+        the page is always rendered and only the parsing can be skipped. URLs
+        with a #fragment are never probed: HTTP requests do not send it.
+        """
+        now = time.time()
+        entry = self.conn.execute("SELECT etag, last_modified, body_hash, rendered_hash, products, rendered_at "
+                                  "FROM pages WHERE url = ?", (url,)).fetchone()
+        fresh = entry is not None and now - entry[5] < self.max_age
+
+        if probe and "#" not in url:
+            status, etag, last_modified, new_hash = probe_page(url, *(entry[:2] if fresh else (None, None)))
+        else:
+            status, etag, last_modified, new_hash = None, None, None, None
+        if fresh and (status == 304 or (status == 200 and new_hash == entry[2])):
+            self.stats["not modified" if status == 304 else "same body"] += 1
+            self.conn.execute("UPDATE pages SET etag = ?, last_modified = ?, used_at = ? WHERE url = ?",
+                              (etag or entry[0], last_modified or entry[1], now, url))
+            return json.loads(entry[4])
+
+        html = load()
+        rendered_hash = body_hash(html.encode("utf-8"))
+        if entry is not None and rendered_hash == entry[3]:
+            self.stats["same render"] += 1
+            products = json.loads(entry[4])
+        else:
+            self.stats["rendered"] += 1
+            products = extract(html)
+
+        stored = json.dumps(products, ensure_ascii=False)
+        self.conn.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                          (url, etag, last_modified, new_hash, rendered_hash, stored,
+                           len(stored.encode("utf-8")), now, now))
+        self.evict()
+        return products
+
+    def evict(self):
+        """Drops the least recently used pages until the cache fits in max_bytes."""
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        evicted = 0
+        for url, size in self.conn.execute("SELECT url, size FROM pages ORDER BY used_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            total -= size
+            evicted += 1
+        return evicted
+
+    def summary(self):
+        return ", ".join(f"{count} {name}" for name, count in self.stats.items())
+
+    def close(self):
+        self.conn.close()
+
+
+def open_cache():
+    """The shared page cache, or None when SCRAPE_CACHE=0 turns it off."""
+    if os.environ.get("SCRAPE_CACHE", "1").lower() in ("0", "off", "no", "false"):
+        return None
+    return PageCache()
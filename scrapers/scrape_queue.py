@@ -0,0 +1,346 @@
+import argparse
+import csv
+import importlib
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from page_cache import LazyDriver, open_cache
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+QUEUE_FILE = DATA_DIR / "scrape_queue.sqlite"
+
+RETAILERS = ["anhoch", "neptun", "setec", "tehnomarket"]
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 3
+POLL_INTERVAL = 2.0
+PAGE_DELAY = 2.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    retailer TEXT NOT NULL,
+    category_name TEXT NOT NULL,
+    url TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_token TEXT,
+    lease_expires REAL,
+    finished_at REAL,
+    error TEXT,
+    UNIQUE (run_id, retailer, category_name, page)
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, run_id);
+CREATE TABLE IF NOT EXISTS results (
+    job_id INTEGER NOT NULL REFERENCES jobs(job_id),
+    position INTEGER NOT NULL,
+    name TEXT,
+    price TEXT,
+    PRIMARY KEY (job_id, position)
+);
+"""
+
+# Oldest run first; within it, the site with the fewest live leases, so
+# workers spread over the retailers instead of all hitting one site.
+_NEXT_JOB = """
+SELECT j.job_id FROM jobs j
+WHERE j.status = 'queued' OR (j.status = 'leased' AND j.lease_expires < :now)
+ORDER BY j.run_id,
+         (SELECT COUNT(*) FROM jobs l
+          WHERE l.run_id = j.run_id AND l.retailer = j.retailer
+            AND l.status = 'leased' AND l.lease_expires >= :now),
+         j.job_id
+LIMIT 1
+"""
+
+
+def connect(path=QUEUE_FILE):
+    """
+    Opens the queue. Every writer takes the database lock with BEGIN
+    IMMEDIATE, so any number of worker processes can share one file; workers
+    on other hosts need it on a filesystem with working locks.
+    """
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class _Transaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+def csv_name(retailer, category_name):
+    return f"{retailer}_{category_name.lower().replace(' ', '_')}.csv"
+
+
+def enqueue(conn, retailers=None, categories=None):
+    """Adds one job per (retailer, category, page) from each scraper's CATEGORIES. Returns the new run id."""
+    with _Transaction(conn):
+        run_id = conn.execute("INSERT INTO runs (created_at) VALUES (?)", (time.time(),)).lastrowid
+        for retailer in retailers or RETAILERS:
+            module = importlib.import_module(retailer)
+            for key, (url, category_name, max_pages) in module.CATEGORIES.items():
+                if categories and key not in categories:
+                    continue
+                conn.executemany(
+                    "INSERT OR IGNORE INTO jobs (run_id, retailer, category_name, url, page) VALUES (?, ?, ?, ?, ?)",
+                    [(run_id, retailer, category_name, url, page) for page in range(1, max_pages + 1)])
+    return run_id
+
+
+def lease(conn, worker, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+    """
+    Claims the next job for `worker` until now + lease_seconds. A job whose
+    lease ran out goes back to the pool, or fails once it has used up its
+    attempts. Returns the job row (with its lease token) or None.
+    """
+    now = time.time()
+    with _Transaction(conn):
+        conn.execute("""UPDATE jobs SET status = 'failed', error = COALESCE(error, 'lease expired')
+                        WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?""", (now, max_attempts))
+        row = conn.execute(_NEXT_JOB, {"now": now}).fetchone()
+        if row is None:
+            return None
+        token = uuid.uuid4().hex
+        conn.execute("""UPDATE jobs SET status = 'leased', worker = ?, lease_token = ?, lease_expires = ?,
+                        attempts = attempts + 1 WHERE job_id = ?""",
+                     (worker, token, now + lease_seconds, row["job_id"]))
+        return conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row["job_id"],)).fetchone()
+
+
+def complete(conn, job, products):
+    """
+    Stores a job's products if the caller still holds its lease. A worker
+    whose lease was taken over gets False and its result is dropped, so every
+    page is stored exactly once. An empty page ends its category: the later
+    pages still queued are skipped.
+    """
+    with _Transaction(conn):
+        updated = conn.execute("""UPDATE jobs SET status = 'done', finished_at = ?, error = NULL
+                                  WHERE job_id = ? AND lease_token = ? AND status = 'leased'""",
+                               (time.time(), job["job_id"], job["lease_token"])).rowcount
+        if not updated:
+            return False
+        conn.executemany("INSERT OR IGNORE INTO results (job_id, position, name, price) VALUES (?, ?, ?, ?)",
+                         [(job["job_id"], position, product.get("name"), product.get("price"))
+                          for position, product in enumerate(products)])
+        if not products:
+            conn.execute("""UPDATE jobs SET status = 'skipped'
+                            WHERE run_id = ? AND retailer = ? AND category_name = ? AND page > ?
+                              AND status = 'queued'""",
+                         (job["run_id"], job["retailer"], job["category_name"], job["page"]))
+    return True
+
+
+def fail(conn, job, error, max_attempts=MAX_ATTEMPTS):
+    """Puts the job back in the queue, or marks it failed after max_attempts."""
+    with _Transaction(conn):
+        conn.execute("""UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,
+                        error = ?, lease_token = NULL, lease_expires = NULL
+                        WHERE job_id = ? AND lease_token = ?""",
+                     (max_attempts, error, job["job_id"], job["lease_token"]))
+
+
+def has_open_jobs(conn):
+    return conn.execute("SELECT 1 FROM jobs WHERE status IN ('queued', 'leased') LIMIT 1").fetchone() is not None
+
+
+def work(conn, worker=None, lease_seconds=LEASE_SECONDS, delay=PAGE_DELAY, forever=False):
+    """
+    Leases and scrapes jobs until the queue is empty (or forever). Keeps one
+    browser per retailer for the worker's lifetime, started only when a page
+    is not in the page cache, and drops it after an error, so the next job
+    gets a fresh one. Returns the number of pages done.
+    """
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    drivers = {}
+    cache = open_cache()
+    pages = 0
+    try:
+        while True:
+            job = lease(conn, worker, lease_seconds)
+            if job is None:
+                if not forever and not has_open_jobs(conn):
+                    return pages
+                time.sleep(POLL_INTERVAL)
+                continue
+
+            retailer = job["retailer"]
+            module = importlib.import_module(retailer)
+            try:
+                if retailer not in drivers:
+                    drivers[retailer] = LazyDriver(module.setup_driver)
+                products = module.scrape_page(drivers[retailer], job["url"], job["page"], cache)
+            except Exception as e:
+                print(f"{worker}: {retailer} {job['category_name']} page {job['page']} failed: {e}")
+                fail(conn, job, str(e))
+                driver = drivers.pop(retailer, None)
+                if driver is not None:
+                    driver.quit()
+                continue
+
+            if complete(conn, job, products):
+                pages += 1
+            else:
+                print(f"{worker}: lease on job {job['job_id']} was lost; result dropped")
+            time.sleep(delay)
+    finally:
+        for driver in drivers.values():
+            driver.quit()
+        if cache is not None:
+            print(f"{worker}: page cache: {cache.summary()}")
+            cache.close()
+
+
+def collect(conn, run_id=None):
+    """
+    Writes the CSV of every category of the run whose pages are all settled.
+    Pages are joined in order up to the first empty or failed one, exactly
+    as the single-browser scrapers join them, so both paths write the same
+    CSV. A page stored twice by two workers is ruled out by complete().
+    """
+    run_id = run_id or conn.execute("SELECT MAX(run_id) FROM runs").fetchone()[0]
+    written = {}
+    categories = conn.execute("SELECT DISTINCT retailer, category_name FROM jobs WHERE run_id = ? ORDER BY job_id",
+                              (run_id,)).fetchall()
+    for retailer, category_name in categories:
+        jobs = conn.execute("""SELECT job_id, page, status FROM jobs
+                               WHERE run_id = ? AND retailer = ? AND category_name = ? ORDER BY page""",
+                            (run_id, retailer, category_name)).fetchall()
+        if any(job["status"] in ("queued", "leased") for job in jobs):
+            print(f"{retailer} {category_name}: still being scraped, not written")
+            continue
+
+        products = []
+        for job in jobs:
+            if job["status"] != "done":
+                break
+            rows = conn.execute("SELECT name, price FROM results WHERE job_id = ? ORDER BY position",
+                                (job["job_id"],)).fetchall()
+            if not rows:
+                break
+            products.extend({"name": row["name"], "price": row["price"]} for row in rows)
+
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        filename = DATA_DIR / csv_name(retailer, category_name)
+        with open(filename, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["name", "price"])
+            writer.writeheader()
+            writer.writerows(products)
+        written[filename] = len(products)
+        print(f"Collected {len(products)} {category_name} products. Saved to {filename}")
+    return written
+
+
+def print_status(conn):
+    rows = conn.execute("""SELECT run_id, retailer, status, COUNT(*) AS jobs, MIN(finished_at) AS first,
+                           MAX(finished_at) AS last FROM jobs GROUP BY run_id, retailer, status
+                           ORDER BY run_id, retailer, status""").fetchall()
+    print(f"{'run':>4} {'retailer':<12} {'status':<8} {'jobs':>6}")
+    for row in rows:
+        print(f"{row['run_id']:>4} {row['retailer']:<12} {row['status']:<8} {row['jobs']:>6}")
+    done = conn.execute("""SELECT COUNT(*), MIN(finished_at), MAX(finished_at) FROM jobs
+                           WHERE status = 'done' AND run_id = (SELECT MAX(run_id) FROM runs)""").fetchone()
+    if done[0] > 1 and done[2] > done[1]:
+        print(f"\nLatest run: {done[0]} pages, {done[0] / (done[2] - done[1]) * 60:.1f} pages/min")
+
+
+def run_local(queue_file, workers, retailers=None, lease_seconds=LEASE_SECONDS, delay=PAGE_DELAY):
+    """Coordinator: enqueues a run, starts `workers` local worker processes, waits for them and collects."""
+    conn = connect(queue_file)
+    run_id = enqueue(conn, retailers)
+    total = conn.execute("SELECT COUNT(*) FROM jobs WHERE run_id = ?", (run_id,)).fetchone()[0]
+    print(f"Run {run_id}: {total} pages queued for {workers} workers")
+
+    start = time.perf_counter()
+    command = [sys.executable, str(Path(__file__).resolve()), "--queue", str(queue_file), "work",
+               "--lease", str(lease_seconds), "--delay", str(delay)]
+    processes = [subprocess.Popen(command) for _ in range(workers)]
+    for process in processes:
+        process.wait()
+    elapsed = time.perf_counter() - start
+
+    collect(conn, run_id)
+    done = conn.execute("SELECT COUNT(*) FROM jobs WHERE run_id = ? AND status = 'done'", (run_id,)).fetchone()[0]
+    print(f"Run {run_id}: {done} pages in {elapsed:.1f} s ({done / elapsed * 60:.1f} pages/min)")
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape through a durable SQLite job queue with many workers.")
+    parser.add_argument("--queue", type=Path, default=QUEUE_FILE, help="queue database (shared by all workers)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_parser = commands.add_parser("enqueue", help="queue one job per category page")
+    enqueue_parser.add_argument("retailers", nargs="*")
+    enqueue_parser.add_argument("--categories", help="comma-separated CATEGORIES keys, e.g. laptops,tvs")
+
+    work_parser = commands.add_parser("work", help="lease and scrape jobs until the queue is empty")
+    work_parser.add_argument("--worker", help="worker name (default: host:pid)")
+    work_parser.add_argument("--lease", type=float, default=LEASE_SECONDS, help="seconds before a job is re-leased")
+    work_parser.add_argument("--delay", type=float, default=PAGE_DELAY, help="seconds to wait between pages")
+    work_parser.add_argument("--forever", action="store_true", help="keep polling when the queue is empty")
+
+    collect_parser = commands.add_parser("collect", help="write the CSVs of a finished run")
+    collect_parser.add_argument("--run", type=int, help="run id (default: the latest)")
+
+    commands.add_parser("status", help="jobs per run, retailer and status")
+
+    run_parser = commands.add_parser("run", help="enqueue, scrape with local workers and collect")
+    run_parser.add_argument("retailers", nargs="*")
+    run_parser.add_argument("--workers", type=int, default=4)
+    run_parser.add_argument("--lease", type=float, default=LEASE_SECONDS)
+    run_parser.add_argument("--delay", type=float, default=PAGE_DELAY)
+
+    args = parser.parse_args()
+    for retailer in getattr(args, "retailers", None) or []:
+        if retailer not in RETAILERS:
+            parser.error(f"unknown retailer {retailer!r}")
+
+    if args.command == "run":
+        run_local(args.queue, args.workers, args.retailers or None, args.lease, args.delay)
+        return
+
+    conn = connect(args.queue)
+    try:
+        if args.command == "enqueue":
+            categories = args.categories.split(",") if args.categories else None
+            run_id = enqueue(conn, args.retailers or None, categories)
+            total = conn.execute("SELECT COUNT(*) FROM jobs WHERE run_id = ?", (run_id,)).fetchone()[0]
+            print(f"Run {run_id}: {total} pages queued")
+        elif args.command == "work":
+            pages = work(conn, args.worker, args.lease, args.delay, args.forever)
+            print(f"Worker finished after {pages} pages")
+        elif args.command == "collect":
+            collect(conn, args.run)
+        else:
+            print_status(conn)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
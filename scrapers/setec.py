@@ -7,12 +7,27 @@ from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
 import time
 import csv
-import os
+from pathlib import Path
+from page_cache import LazyDriver, open_cache
 
 CHROMEDRIVER_PATH = r"C:\Users\dakag\Downloads\chromedriver-win64\chromedriver.exe"
 
+# The scraped CSVs go to <repo>/data, wherever the script is run from.
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 
-def scrape_setec_products(category_url, category_name, max_pages=20):
+# The listing is in the server-rendered HTML, so the page cache may reuse
+# products when a plain HTTP probe shows the page unchanged.
+PROBE_CACHE = True
+
+
+CATEGORIES = {
+    "oled_tvs": ("https://setec.mk/category/oled-30334", "OLED_TVs", 5),
+    "laptops": ("https://setec.mk/category/prenosni-20komp-d1-98uteri-3", "Laptops", 20),
+    "smartphones": ("https://setec.mk/category/mobilni-20telefoni-67", "Smartphones", 20),
+}
+
+
+def setup_driver():
     chrome_options = Options()
     chrome_options.add_argument("--start-maximized")
 
@@ -30,38 +45,73 @@ def scrape_setec_products(category_url, category_name, max_pages=20):
             })
         '''
     })
+    return driver
 
-    all_products = []
-    page = 1
 
-    while page <= max_pages:
-        url = f"{category_url}?page={page}"
-        print(f"Scraping {url}")
+def page_url(category_url, page):
+    return f"{category_url}?page={page}"
 
-        try:
-            driver.get(url)
 
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div.relative.bg-white.p-4"))
-            )
+def load_page(driver, url):
+    driver.get(url)
+
+    WebDriverWait(driver, 15).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, "div.relative.bg-white.p-4"))
+    )
+
+    # Scroll to trigger lazy loading
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2)")
+    time.sleep(1)
+
+    return driver.page_source
+
+
+def extract_products(html):
+    soup = BeautifulSoup(html, "lxml")
+    products = []
+
+    for p in soup.select("div.relative.bg-white.p-4"):
+        name = p.select_one("h3").get_text(strip=True) if p.select_one("h3") else ""
+        price = p.select_one("span.text-xl").get_text(strip=True) if p.select_one("span.text-xl") else ""
+        products.append({"name": name, "price": price})
+
+    return products
+
 
-            # Scroll to trigger lazy loading
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2)")
-            time.sleep(1)
+def scrape_page(driver, category_url, page, cache=None):
+    url = page_url(category_url, page)
+    print(f"Scraping {url}")
+    if cache is not None:
+        return cache.products(url, lambda: load_page(driver, url), extract_products, probe=PROBE_CACHE)
+    return extract_products(load_page(driver, url))
 
-            soup = BeautifulSoup(driver.page_source, "lxml")
-            products = soup.select("div.relative.bg-white.p-4")
+
+def save_products(category_name, products):
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    filename = DATA_DIR / f"setec_{category_name.lower().replace(' ', '_')}.csv"
+    with open(filename, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["name", "price"])
+        writer.writeheader()
+        writer.writerows(products)
+    return filename
+
+
+def scrape_setec_products(category_url, category_name, max_pages=20):
+    driver = LazyDriver(setup_driver)
+    cache = open_cache()
+    all_products = []
+    page = 1
+
+    while page <= max_pages:
+        try:
+            products = scrape_page(driver, category_url, page, cache)
 
             if not products:
                 if page == 1:
                     print("No products found on first page - check URL or if blocked")
                 break
 
-            for p in products:
-                name = p.select_one("h3").get_text(strip=True) if p.select_one("h3") else ""
-                price = p.select_one("span.text-xl").get_text(strip=True) if p.select_one("span.text-xl") else ""
-                all_products.append({"name": name, "price": price})
-
+            all_products.extend(products)
             page += 1
             time.sleep(2)
 
@@ -70,31 +120,25 @@ def scrape_setec_products(category_url, category_name, max_pages=20):
             break
 
     driver.quit()
+    if cache is not None:
+        print(f"Page cache: {cache.summary()}")
+        cache.close()
 
-    os.makedirs("../data", exist_ok=True)
-    filename = f"../data/setec_{category_name.lower().replace(' ', '_')}.csv"
-    with open(filename, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=["name", "price"])
-        writer.writeheader()
-        writer.writerows(all_products)
-
+    filename = save_products(category_name, all_products)
     print(f"Scraped {len(all_products)} {category_name} products. Saved to {filename}")
     return all_products
 
 
 def scrape_oled_tvs():
-    url = "https://setec.mk/category/oled-30334"
-    return scrape_setec_products(url, "OLED_TVs", max_pages=5)
+    return scrape_setec_products(*CATEGORIES["oled_tvs"])
 
 
 def scrape_laptops():
-    url = "https://setec.mk/category/prenosni-20komp-d1-98uteri-3"
-    return scrape_setec_products(url, "Laptops", max_pages=20)
+    return scrape_setec_products(*CATEGORIES["laptops"])
 
 
 def scrape_smartphones():
-    url = "https://setec.mk/category/mobilni-20telefoni-67"
-    return scrape_setec_products(url, "Smartphones", max_pages=20)
+    return scrape_setec_products(*CATEGORIES["smartphones"])
 
 
 if __name__ == "__main__":
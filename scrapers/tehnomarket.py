@@ -7,12 +7,20 @@ from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
 import time
 import csv
-import os
+from pathlib import Path
 import random
+from page_cache import LazyDriver, open_cache
 
 # Path to your ChromeDriver
 CHROMEDRIVER_PATH = r"C:\Users\dakag\Downloads\chromedriver-win64\chromedriver.exe"
 
+# The scraped CSVs go to <repo>/data, wherever the script is run from.
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+# Pages 2+ differ only in the #page/N/ fragment, which a plain HTTP request
+# never sends, so the page cache cannot probe them; always render.
+PROBE_CACHE = False
+
 
 def setup_driver():
     chrome_options = Options()
@@ -25,61 +33,97 @@ def setup_driver():
     return driver
 
 
-def scrape_tehnomarket_products(category_url, category_name, max_pages=1):
-    driver = setup_driver()
-    all_products = []
-    page = 1
+CATEGORIES = {
+    "tvs": ("https://tehnomarket.com.mk/category/4332/oled-tv", "TVs", 1),
+    "laptops": ("https://tehnomarket.com.mk/category/4003/laptopi", "Laptops", 2),
+    "phones": ("https://tehnomarket.com.mk/category/4109/mobilni-telefoni", "Phones", 9),
+}
 
-    while page <= max_pages:
-        if page > 1:
-            url = f"{category_url}#page/{page}/"
-        else:
-            url = category_url
 
-        print(f"Scraping {url}")
+def page_url(category_url, page):
+    if page > 1:
+        return f"{category_url}#page/{page}/"
+    return category_url
+
+
+def load_page(driver, url):
+    driver.get(url)
+    WebDriverWait(driver, 15).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, "div.pbox"))
+    )
+
+    # Scroll to trigger lazy loading
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2)")
+    time.sleep(random.uniform(1, 2))
 
+    return driver.page_source
+
+
+def extract_products(html):
+    soup = BeautifulSoup(html, "lxml")
+    products = []
+
+    for product in soup.select("div.pbox"):
         try:
-            driver.get(url)
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div.pbox"))
-            )
+            name_elem = product.select_one("div.product-name a")
+            name = name_elem.get_text(strip=True) if name_elem else "N/A"
 
-            # Scroll to trigger lazy loading
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2)")
-            time.sleep(random.uniform(1, 2))
+            regular_price_elem = product.select_one("div.product-price div strong span.nm")
+            smart_price_elem = product.select_one("div.product-price div.smart-price strong span.nm")
 
-            soup = BeautifulSoup(driver.page_source, "lxml")
-            products = soup.select("div.pbox")
+            # Use smart price if available, otherwise regular price
+            if smart_price_elem:
+                price = smart_price_elem.get_text(strip=True) + " ден."
+            elif regular_price_elem:
+                price = regular_price_elem.get_text(strip=True) + " ден."
+            else:
+                price = "N/A"
 
-            if not products:
-                print(f"No products found on page {page}")
-                break
+            products.append({
+                "name": name,
+                "price": price
+            })
+
+        except Exception as e:
+            print(f"Error processing product: {e}")
+            continue
+
+    return products
 
-            for product in products:
-                try:
-                    name_elem = product.select_one("div.product-name a")
-                    name = name_elem.get_text(strip=True) if name_elem else "N/A"
 
-                    regular_price_elem = product.select_one("div.product-price div strong span.nm")
-                    smart_price_elem = product.select_one("div.product-price div.smart-price strong span.nm")
+def scrape_page(driver, category_url, page, cache=None):
+    url = page_url(category_url, page)
+    print(f"Scraping {url}")
+    if cache is not None:
+        return cache.products(url, lambda: load_page(driver, url), extract_products, probe=PROBE_CACHE)
+    return extract_products(load_page(driver, url))
 
-                    # Use smart price if available, otherwise regular price
-                    if smart_price_elem:
-                        price = smart_price_elem.get_text(strip=True) + " ден."
-                    elif regular_price_elem:
-                        price = regular_price_elem.get_text(strip=True) + " ден."
-                    else:
-                        price = "N/A"
 
-                    all_products.append({
-                        "name": name,
-                        "price": price
-                    })
+def save_products(category_name, products):
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    filename = DATA_DIR / f"tehnomarket_{category_name.lower().replace(' ', '_')}.csv"
+    with open(filename, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["name", "price"])
+        writer.writeheader()
+        writer.writerows(products)
+    return filename
+
+
+def scrape_tehnomarket_products(category_url, category_name, max_pages=1):
+    driver = LazyDriver(setup_driver)
+    cache = open_cache()
+    all_products = []
+    page = 1
+
+    while page <= max_pages:
+        try:
+            products = scrape_page(driver, category_url, page, cache)
 
-                except Exception as e:
-                    print(f"Error processing product: {e}")
-                    continue
+            if not products:
+                print(f"No products found on page {page}")
+                break
 
+            all_products.extend(products)
             page += 1
             time.sleep(random.uniform(2, 4))
 
@@ -88,31 +132,25 @@ def scrape_tehnomarket_products(category_url, category_name, max_pages=1):
             break
 
     driver.quit()
+    if cache is not None:
+        print(f"Page cache: {cache.summary()}")
+        cache.close()
 
-    os.makedirs("../data", exist_ok=True)
-    filename = f"../data/tehnomarket_{category_name.lower().replace(' ', '_')}.csv"
-    with open(filename, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=["name", "price"])
-        writer.writeheader()
-        writer.writerows(all_products)
-
+    filename = save_products(category_name, all_products)
     print(f"Scraped {len(all_products)} {category_name} products. Saved to {filename}")
     return all_products
 
 
 def scrape_tvs():
-    url = "https://tehnomarket.com.mk/category/4332/oled-tv"
-    return scrape_tehnomarket_products(url, "TVs", max_pages=1)
+    return scrape_tehnomarket_products(*CATEGORIES["tvs"])
 
 
 def scrape_laptops():
-    url = "https://tehnomarket.com.mk/category/4003/laptopi"
-    return scrape_tehnomarket_products(url, "Laptops", max_pages=2)
+    return scrape_tehnomarket_products(*CATEGORIES["laptops"])
 
 
 def scrape_phones():
-    url = "https://tehnomarket.com.mk/category/4109/mobilni-telefoni"
-    return scrape_tehnomarket_products(url, "Phones", max_pages=9)
+    return scrape_tehnomarket_products(*CATEGORIES["phones"])
 
 
 if __name__ == "__main__":
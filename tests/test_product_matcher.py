@@ -0,0 +1,30 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "uitls"))
+
+from product_matcher import match_products  # noqa: E402
+
+
+def laptop(product_id, name):
+    return {"@id": product_id, "name": name, "brand": {"@type": "Brand", "name": "Lenovo"}}
+
+
+class WeakListingTest(unittest.TestCase):
+    def test_weak_listings_do_not_bridge_configurations(self):
+        # a matches only x, b matches only y, and a matches b: the weak pair
+        # must not pull the two configurations into one group.
+        catalogue = [
+            ("anhoch", laptop("x", "Lenovo IdeaPad Slim 15IAU7 i5-1235U 8GB 256GB")),
+            ("neptun", laptop("y", "Lenovo Yoga 15IAU7 i7-1255U 16GB 512GB")),
+            ("setec", laptop("a", "Lenovo IdeaPad Slim 15IAU7")),
+            ("tehnomarket", laptop("b", "Lenovo Yoga IdeaPad 15IAU7 i7-1255U")),
+        ]
+        products = match_products(catalogue)["products"]
+        self.assertNotEqual(products["x"], products["y"])
+        self.assertEqual(products["a"], products["b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,15 @@
 import re
-import json
-import pandas as pd
+import bisect
+import string
 import os
+import sys
 from pathlib import Path
 
+from parse_profiler import profiled
+from product_model import Offer, Product, write_products
+from reforge_input import read_rows
+from reforge_outputs import rebuild_catalogue_outputs, write_derived_outputs
+
 
 def parse_price(price_str):
     try:
@@ -14,32 +20,172 @@ def parse_price(price_str):
         return None, None
 
 
-def parse_laptop_name(name):
-    pattern = r"Notebook\s+([A-Za-z0-9]+)\s+([A-Za-z0-9\s]+?)\s+([A-Za-z0-9\-]+)\/([A-Za-z0-9]+)\/([A-Za-z0-9\s]+)\/([A-Za-z0-9\.\"\s]+)\/(.+)"
-    match = re.search(pattern, name)
+# The name parsers below scan each name once with single character-class
+# runs (which cannot backtrack) instead of chained lazy/greedy groups. They
+# return exactly what the previous regexes captured; see
+# benchmarks/anhoch_parser_fuzz.py for the equivalence and timing checks.
+SPACES = re.compile(r'\s*')
+ALNUM = re.compile(r'[A-Za-z0-9]*')
+ALPHA = re.compile(r'[A-Za-z]*')
+ALNUM_DASH = re.compile(r'[A-Za-z0-9\-]*')
+DIGITS = re.compile(r'\d*')
+ALNUM_SPACE = re.compile(r'[A-Za-z0-9\s]*')
+ALPHA_SPACE = re.compile(r'[A-Za-z\s]*')
+LINE = re.compile(r'[^\n]*')
+WORDS = re.compile(r'[A-Za-z]+')
+SPACE_RUNS = re.compile(r'\s+')
+DIGIT_RUNS = re.compile(r'\d+')
+RAM_FIELD = re.compile(r'[A-Za-z0-9]+')
+STORAGE_FIELD = re.compile(r'[A-Za-z0-9\s]+')
+SCREEN_FIELD = re.compile(r'[A-Za-z0-9."\s]+')
+
+ASCII_ALNUM = frozenset(string.ascii_letters + string.digits)
+ASCII_ALPHA = frozenset(string.ascii_letters)
+CPU_CHARS = ASCII_ALNUM | {"-"}
+
+LAPTOP_COLORS = ['Grey', 'Black', 'Blue', 'Silver', 'White', 'Red', 'Gold', 'Fog Blue', 'Awesome Lavander',
+                 'Awesome White', 'Awesome Black']
+
+
+def _end(run, text, position):
+    return run.match(text, position).end()
+
+
+def _is_space(text, position):
+    return position < len(text) and text[position].isspace()
+
+
+def _run_start(text, end, chars=None):
+    """Start of the run ending at `end` of characters in `chars` (whitespace when None)."""
+    start = end
+    while start > 0 and (text[start - 1] in chars if chars is not None else text[start - 1].isspace()):
+        start -= 1
+    return start
+
+
+# parse_laptop_name splits the name on "/" and classifies the segments
+#
+#     Notebook <brand> <model> <cpu> / <ram> / <storage> / <screen info> / <features>
+#
+# as the original pattern did:
+#
+#     Notebook\s+(brand)\s+(model)\s+(cpu)/(ram)/(storage)/(screen info)/(features)
+#
+# The strict classifiers take its character classes (brand and RAM
+# [A-Za-z0-9]+, model [A-Za-z0-9\s]+?, CPU [A-Za-z0-9\-]+, storage
+# [A-Za-z0-9\s]+, screen info [A-Za-z0-9."\s]+); the loose ones its fallback,
+# where the CPU and the fields may be anything but "/". Features run to the
+# end of the line in both.
+
+
+def _laptop_fields(name, starts, index, strict):
+    """RAM, storage, screen info and features from the segments after segment `index`, or None."""
+    if index + 4 >= len(starts):
+        return None
+    ram, storage, screen_info = (name[starts[i]:starts[i + 1] - 1] for i in range(index + 1, index + 4))
+    features = LINE.match(name, starts[index + 4]).group()
+    if not features:
+        return None
+    if strict:
+        if not (RAM_FIELD.fullmatch(ram) and STORAGE_FIELD.fullmatch(storage) and SCREEN_FIELD.fullmatch(screen_info)):
+            return None
+    elif not (ram and storage and screen_info):
+        return None
+    return ram, storage, screen_info, features
+
+
+def _strict_model_cpu(rest):
+    """
+    (model)\s+(cpu) from the whitespace-led text after the brand: the CPU is
+    the last word and the model everything before it, letters, digits and
+    whitespace only. A blank model still needs three whitespace characters,
+    one each for the \s+ around it and one for the model itself.
+    """
+    cpu_start = _run_start(rest, len(rest), CPU_CHARS)
+    if cpu_start == len(rest) or not rest[cpu_start - 1].isspace():
+        return None
+    between = rest[:cpu_start]
+    if not ALNUM_SPACE.fullmatch(between):
+        return None
+    model = between.strip()
+    if not model and len(between) < 3:
+        return None
+    return model, rest[cpu_start:]
+
+
+def _loose_model_cpu(rest):
+    """
+    (model)\s+(cpu) from the whitespace-led text after the brand, where the
+    CPU is anything up to the slash. The lazy model is the first word when
+    whitespace and at least one more character follow it; otherwise it is
+    blank, which takes three whitespace characters as in the strict case,
+    plus a fourth for the CPU when nothing else is left.
+    """
+    gap = _end(SPACES, rest, 0)
+    word_end = _end(ALNUM, rest, gap)
+    if gap < word_end < len(rest) - 1 and rest[word_end].isspace():
+        return rest[gap:word_end], rest[word_end:].strip()
+    if gap >= (3 if gap < len(rest) else 4):
+        return "", rest[gap:].strip()
+    return None
+
+
+def _laptop_head(head, strict):
+    """Brand, model and CPU from the text between "Notebook" and the first slash, or None."""
+    brand_start = _end(SPACES, head, 0)
+    brand_end = _end(ALNUM, head, brand_start)
+    if brand_start == 0 or brand_end == brand_start or not _is_space(head, brand_end):
+        return None
+    model_cpu = (_strict_model_cpu if strict else _loose_model_cpu)(head[brand_end:])
+    if model_cpu is None:
+        return None
+    return (head[brand_start:brand_end],) + model_cpu
+
+
+def _match_laptop(name, strict):
+    """The first "Notebook" whose head and following segments all classify, as re.search would find it."""
+    starts = [0] + [match.end() for match in re.finditer('/', name)]
+    fields_cache = {}
+
+    position = name.find("Notebook")
+    while position != -1:
+        index = bisect.bisect_right(starts, position) - 1
+        if index + 1 == len(starts):
+            return None
+        if index not in fields_cache:
+            fields_cache[index] = _laptop_fields(name, starts, index, strict)
+        if fields_cache[index]:
+            head = _laptop_head(name[position + 8:starts[index + 1] - 1], strict)
+            if head:
+                return head + fields_cache[index]
+        position = name.find("Notebook", position + 1)
+    return None
+
+
+def _screen_size(screen_info):
+    for match in DIGIT_RUNS.finditer(screen_info):
+        end = match.end()
+        if screen_info.startswith('"', end):
+            return screen_info[match.start():end + 1]
+        if screen_info.startswith('.', end):
+            fraction_end = _end(DIGITS, screen_info, end + 1)
+            if screen_info.startswith('"', fraction_end):
+                return screen_info[match.start():fraction_end + 1]
+    return None
 
+
+def parse_laptop_name(name):
+    match = _match_laptop(name, strict=True) or _match_laptop(name, strict=False)
     if not match:
-        pattern_fallback = r"Notebook\s+([A-Za-z0-9]+)\s+([A-Za-z0-9\s]+?)\s+([^\/]+)\/([^\/]+)\/([^\/]+)\/([^\/]+)\/(.+)"
-        match = re.search(pattern_fallback, name)
-        if not match:
-            return {"brand": None, "model_line": None, "cpu": None, "ram": None,
-                    "storage": None, "screen_info": None, "features": None}
-
-    brand = match.group(1).strip()
-    model_line = match.group(2).strip()
-    cpu = match.group(3).strip()
-    ram = match.group(4).strip()
-    storage = match.group(5).strip()
-    screen_info = match.group(6).strip()
-    features = match.group(7).strip()
-
-    screen_size_match = re.search(r'(\d+\.?\d*")', screen_info)
-    screen_size = screen_size_match.group(1) if screen_size_match else None
+        return {"brand": None, "model_line": None, "cpu": None, "ram": None,
+                "storage": None, "screen_info": None, "features": None}
+
+    brand, model_line, cpu, ram, storage, screen_info, features = (group.strip() for group in match)
+
+    screen_size = _screen_size(screen_info)
 
     color = None
-    color_keywords = ['Grey', 'Black', 'Blue', 'Silver', 'White', 'Red', 'Gold', 'Fog Blue', 'Awesome Lavander',
-                      'Awesome White', 'Awesome Black']
-    for keyword in color_keywords:
+    for keyword in LAPTOP_COLORS:
         if keyword in features:
             color = keyword
             break
@@ -57,47 +203,179 @@ def parse_laptop_name(name):
     }
 
 
+def _phone_tail(name, slash):
+    """RAM, storage, colour and the model boundaries around the slash, or None."""
+    ram_start = _run_start(name, slash, ASCII_ALNUM)
+    if ram_start == slash or not _is_space(name, ram_start - 1):
+        return None
+    storage_end = _end(ALNUM, name, slash + 1)
+    if storage_end == slash + 1 or not _is_space(name, storage_end):
+        return None
+    color_start = _end(SPACES, name, storage_end)
+    if color_start < len(name) and name[color_start] in ASCII_ALPHA:
+        color = name[color_start:_end(ALPHA_SPACE, name, color_start)]
+    elif color_start - storage_end >= 2:
+        color = name[color_start - 1]
+    else:
+        return None
+    return ram_start, _run_start(name, ram_start), name[ram_start:slash], name[slash + 1:storage_end], color
+
+
 def parse_phone_name(name):
-    pattern = r"([A-Za-z]+)\s+([A-Za-z0-9\s]+?)\s+([A-Za-z0-9]+)\/([A-Za-z0-9]+)\s+([A-Za-z\s]+)"
-    match = re.search(pattern, name)
+    tails = {}
+    scanned_from = scanned_to = -1
 
-    if not match:
-        return {"brand": None, "model": None, "ram": None, "storage": None, "color": None}
+    for word in WORDS.finditer(name):
+        brand_end = word.end()
+        if not _is_space(name, brand_end):
+            continue
+        model_start = _end(SPACES, name, brand_end)
+        gap = model_start - brand_end
+
+        # Everything between the brand and the slash must be letters, digits or whitespace.
+        if not scanned_from <= brand_end < scanned_to:
+            scanned_from, scanned_to = brand_end, _end(ALNUM_SPACE, name, brand_end)
+        slash = scanned_to
+        if slash >= len(name) or name[slash] != '/':
+            continue
+        if slash not in tails:
+            tails[slash] = _phone_tail(name, slash)
+        if tails[slash] is None:
+            continue
 
-    brand = match.group(1).strip()
-    model = match.group(2).strip()
-    ram = match.group(3).strip()
-    storage = match.group(4).strip()
-    color = match.group(5).strip()
+        ram_start, model_end, ram, storage, color = tails[slash]
+        if model_start < ram_start:
+            model = name[model_start:model_end]
+        elif model_start == ram_start and gap >= 3:
+            model = ""
+        else:
+            continue
 
-    return {
-        "brand": brand,
-        "model": model,
-        "ram": ram,
-        "storage": storage,
-        "color": color
-    }
+        return {
+            "brand": word.group().strip(),
+            "model": model.strip(),
+            "ram": ram.strip(),
+            "storage": storage.strip(),
+            "color": color.strip()
+        }
+
+    return {"brand": None, "model": None, "ram": None, "storage": None, "color": None}
+
+
+def _tv_type_and_features(name, type_start):
+    """Type word followed by the feature text, as matched by ([A-Za-z]+)\\s+([A-Za-z\\s]+)."""
+    if type_start >= len(name) or name[type_start] not in ASCII_ALPHA:
+        return None
+    type_end = _end(ALPHA, name, type_start)
+    features_start = _end(SPACES, name, type_end)
+    if features_start == type_end:
+        return None
+    if features_start < len(name) and name[features_start] in ASCII_ALPHA:
+        features = name[features_start:_end(ALPHA_SPACE, name, features_start)]
+    elif features_start - type_end >= 2:
+        features = name[features_start - 1]
+    else:
+        return None
+    return name[type_start:type_end], features
+
+
+def _tv_size(name, start):
+    """End of a '55"' size token at start, or None."""
+    end = _end(DIGITS, name, start)
+    return end + 1 if end > start and name.startswith('"', end) else None
+
+
+def _match_tv_labelled(name):
+    failed_from = failed_to = -1
+
+    position = name.find("TV")
+    while position != -1:
+        match, rejected = _match_tv_labelled_at(name, position + 2, failed_from, failed_to)
+        if match:
+            return match
+        if rejected:
+            failed_from, failed_to = rejected
+        position = name.find("TV", position + 1)
+    return None
+
+
+def _match_tv_labelled_at(name, start, failed_from, failed_to):
+    """
+    The match after one "TV" and the range of resolution text whose
+    whitespace runs were all rejected (later attempts inside it can skip them).
+    """
+    brand_start = _end(SPACES, name, start)
+    if brand_start == start:
+        return None, None
+    brand_end = _end(ALPHA, name, brand_start)
+    size_start = _end(SPACES, name, brand_end) if brand_end > brand_start else brand_end
+    if size_start == brand_end:
+        return None, None
+    size_end = _tv_size(name, size_start)
+    if size_end is None:
+        return None, None
+    model_start = _end(SPACES, name, size_end)
+    if model_start == size_end:
+        return None, None
+    model_end = _end(ALNUM_DASH, name, model_start)
+    resolution_start = _end(SPACES, name, model_end) if model_end > model_start else model_end
+    gap = resolution_start - model_end
+    if not gap:
+        return None, None
+
+    head = (name[brand_start:brand_end], name[size_start:size_end], name[model_start:model_end])
+    rejected = None
+
+    # ([A-Za-z0-9\s]+?)\s+([A-Za-z]+): the resolution runs up to the first
+    # whitespace whose next word can serve as the type.
+    if not failed_from <= resolution_start < failed_to:
+        resolution_end = _end(ALNUM_SPACE, name, resolution_start)
+        for spaces in SPACE_RUNS.finditer(name, resolution_start, resolution_end):
+            tail = _tv_type_and_features(name, spaces.end())
+            if tail:
+                return head + (name[resolution_start:spaces.start()],) + tail, None
+        rejected = (resolution_start, resolution_end)
+
+    if gap >= 3:
+        tail = _tv_type_and_features(name, resolution_start)
+        if tail:
+            return head + ("",) + tail, None
+    return None, rejected
+
+
+def _match_tv_unlabelled(name):
+    for word in WORDS.finditer(name):
+        brand_end = word.end()
+        model_start = _end(SPACES, name, brand_end)
+        if model_start == brand_end:
+            continue
+        model_end = _end(ALNUM_DASH, name, model_start)
+        size_start = _end(SPACES, name, model_end) if model_end > model_start else model_end
+        if size_start == model_end:
+            continue
+        size_end = _tv_size(name, size_start)
+        if size_end is None:
+            continue
+        features_start = _end(SPACES, name, size_end)
+        if features_start < len(name) and name[features_start] in ASCII_ALNUM and features_start > size_end:
+            features = name[features_start:_end(ALNUM_SPACE, name, features_start)]
+        elif features_start - size_end >= 2:
+            features = name[features_start - 1]
+        else:
+            continue
+        return word.group(), name[model_start:model_end], name[size_start:size_end], features
+    return None
 
 
 def parse_tv_name(name):
-    pattern1 = r"TV\s+([A-Za-z]+)\s+(\d+\")\s+([A-Za-z0-9\-]+)\s+([A-Za-z0-9\s]+?)\s+([A-Za-z]+)\s+([A-Za-z\s]+)"
-    match = re.search(pattern1, name)
+    match = _match_tv_labelled(name)
 
     if match:
-        brand = match.group(1).strip()
-        size = match.group(2).strip()
-        model = match.group(3).strip()
-        resolution = match.group(4).strip()
-        tv_type = match.group(5).strip()
-        features = match.group(6).strip()
+        brand, size, model, resolution, tv_type, features = (group.strip() for group in match)
     else:
-        pattern2 = r"([A-Za-z]+)\s+([A-Za-z0-9\-]+)\s+(\d+\")\s+([A-Za-z0-9\s]+)"
-        match = re.search(pattern2, name)
+        match = _match_tv_unlabelled(name)
         if match:
-            brand = match.group(1).strip()
-            model = match.group(2).strip()
-            size = match.group(3).strip()
-            features = match.group(4).strip()
+            brand, model, size, features = (group.strip() for group in match)
             resolution = None
             tv_type = None
         else:
@@ -115,31 +393,7 @@ def parse_tv_name(name):
 
 
 def create_product_schema(product_id, category, original_name, price, price_currency, parsed_data):
-    product = {
-        "@context": "https://schema.org",
-        "@type": "Product",
-        "@id": product_id,
-        "category": category,
-        "name": original_name,
-        "offers": {
-            "@type": "Offer",
-            "price": price,
-            "priceCurrency": price_currency,
-            "availability": "https://schema.org/InStock"
-        }
-    }
-
-    if parsed_data.get("brand"):
-        product["brand"] = {
-            "@type": "Brand",
-            "name": parsed_data["brand"]
-        }
-
-    if parsed_data.get("model") or parsed_data.get("model_line"):
-        product["model"] = parsed_data.get("model") or parsed_data.get("model_line")
-
-    if parsed_data.get("color"):
-        product["color"] = parsed_data["color"]
+    offer = Offer(price, price_currency)
 
     additional_props = []
 
@@ -169,14 +423,7 @@ def create_product_schema(product_id, category, original_name, price, price_curr
 
     for key, schema_name in properties_map.items():
         if parsed_data.get(key):
-            additional_props.append({
-                "@type": "PropertyValue",
-                "name": schema_name,
-                "value": parsed_data[key]
-            })
-
-    if additional_props:
-        product["additionalProperty"] = additional_props
+            additional_props.append((schema_name, parsed_data[key]))
 
     description_parts = []
     if parsed_data.get("brand"):
@@ -188,18 +435,23 @@ def create_product_schema(product_id, category, original_name, price, price_curr
     if category == "Smartphones" and parsed_data.get("ram") and parsed_data.get("storage"):
         description_parts.append(f"with {parsed_data['ram']} RAM and {parsed_data['storage']} storage")
 
-    if description_parts:
-        product["description"] = " ".join(description_parts) + "."
+    description = " ".join(description_parts) + "." if description_parts else None
 
-    return product
+    return Product(product_id, category, original_name, offer,
+                   brand=parsed_data.get("brand") or None,
+                   model=parsed_data.get("model") or parsed_data.get("model_line") or None,
+                   color=parsed_data.get("color") or None,
+                   properties=additional_props,
+                   description=description)
 
 
-def process_anhoch_data():
+def process_anhoch_data(graph_output=False, data_dir=None, output_dir=None, derived_outputs=True, backend=None,
+                        columnar_format="ipc"):
     base_dir = Path(__file__).parent.parent  # Goes up from 'utils' to the project root
-    data_dir = base_dir / "data"
-    output_dir = base_dir / "reforged_data"
+    data_dir = Path(data_dir) if data_dir else base_dir / "data"
+    output_dir = Path(output_dir) if output_dir else base_dir / "reforged_data"
 
-    output_dir.mkdir(exist_ok=True)
+    output_dir.mkdir(parents=True, exist_ok=True)
 
     all_products = []
     product_id_counter = 1
@@ -219,9 +471,9 @@ def process_anhoch_data():
             continue
 
         try:
-            df = pd.read_csv(file_path)
-
-            for index, row in df.iterrows():
+            row_count = 0
+            for row in read_rows(file_path, backend=backend):
+                row_count += 1
                 price, currency = parse_price(row['price'])
                 parsed = parser_func(row['name'])
                 product_id = f"anhoch-{category.lower()}-{product_id_counter}"
@@ -231,21 +483,29 @@ def process_anhoch_data():
                 all_products.append(product_schema)
                 product_id_counter += 1
 
-            print(f"  Successfully processed {len(df)} {category.lower()}.")
+            print(f"  Successfully processed {row_count} {category.lower()}.")
 
         except Exception as e:
             print(f"  Error processing {file_path}: {e}")
 
     # Save all products to a JSON-LD file
     output_file = output_dir / "anhoch_products_structured.jsonld"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(all_products, f, indent=2, ensure_ascii=False)
+    write_products(all_products, output_file)
 
     print(f"\nSuccessfully processed {len(all_products)} products total")
     print(f"Output saved to {output_file}")
 
+    if derived_outputs:
+        write_derived_outputs("anhoch", all_products, output_dir, graph_output=graph_output,
+                              columnar_format=columnar_format)
+
     return all_products
 
 
 if __name__ == "__main__":
-    process_anhoch_data()
\ No newline at end of file
+    with profiled(sys.modules[__name__], "--profile" in sys.argv, "--tracemalloc" in sys.argv):
+        process_anhoch_data(graph_output="--graph" in sys.argv, backend="pandas" if "--pandas" in sys.argv else None,
+                            columnar_format="parquet" if "--parquet" in sys.argv else "ipc")
+    # The pipeline passes --no-catalogue and rebuilds the cross-retailer outputs once after all reforges.
+    if "--no-catalogue" not in sys.argv:
+        rebuild_catalogue_outputs()
\ No newline at end of file
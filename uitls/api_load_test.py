@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from urllib.parse import quote
+
+from catalogue_api import DEFAULT_PORT
+
+
+async def _request(reader, writer, host, path, headers=None):
+    lines = [f"GET {path} HTTP/1.1", f"Host: {host}", "Accept-Encoding: gzip"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+    await writer.drain()
+
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+    etag = None
+    for line in head.decode("latin-1").split("\r\n")[1:]:
+        name, _, value = line.partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+        elif name.lower() == "etag":
+            etag = value.strip()
+    body = await reader.readexactly(length) if length else b""
+    return status, etag, body
+
+
+async def _fetch_json(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    return json.loads(data.split(b"\r\n\r\n", 1)[1])
+
+
+async def _worker(host, port, paths, deadline, latencies, statuses, rng):
+    reader, writer = await asyncio.open_connection(host, port)
+    etags = {}
+    try:
+        while time.perf_counter() < deadline:
+            path = rng.choice(paths)
+            headers = {"If-None-Match": etags[path]} if path in etags and rng.random() < 0.3 else None
+            start = time.perf_counter()
+            status, etag, _ = await _request(reader, writer, host, path, headers)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+            if etag:
+                etags[path] = etag
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_load_test(host, port, concurrency, duration, seed=0):
+    """
+    Keeps `concurrency` keep-alive connections busy for `duration` seconds with
+    a mix of product lookups and filtered listings; 30% of repeat requests
+    send If-None-Match.
+    """
+    listing = await _fetch_json(host, port, f"/products?limit={200}")
+    ids = [item["@id"] for item in listing["items"]]
+    if not ids:
+        raise SystemExit("The service has no products to request.")
+
+    paths = [f"/products/{quote(product_id)}" for product_id in ids]
+    paths += [
+        "/products?category=Laptops&limit=20",
+        "/products?retailer=neptun&category=Smartphones&max_price=30000",
+        "/products?brand=Samsung&limit=50",
+        "/products?category=Televisions&min_price=20000&limit=10",
+    ] * max(1, len(ids) // 20)
+
+    latencies = []
+    statuses = {}
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _worker(host, port, paths, deadline, latencies, statuses, random.Random(seed + worker))
+        for worker in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for uitls/catalogue_api.py.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_load_test(args.host, args.port, args.concurrency, args.duration))
+    print(f"{result['requests']:,} requests with {args.concurrency} connections in {args.duration:.0f} s")
+    print(f"Throughput: {result['rps']:,.0f} requests/sec")
+    print(f"Latency: p50 {result['p50_ms']:.2f} ms, p95 {result['p95_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms")
+    print(f"Status codes: {dict(sorted(result['statuses'].items()))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import re
+import hashlib
+import unicodedata
+from pathlib import Path
+
+from jsonld_graph import RETAILERS, load_products
+
+BASE_DIR = Path(__file__).parent.parent
+DATA_DIR = BASE_DIR / "data"
+REFORGED_DIR = BASE_DIR / "reforged_data"
+
+# Every PropertyValue name the reforgers emit, mapped to a flat column name.
+SPEC_COLUMNS = {
+    "Processor": "processor",
+    "RAM": "ram",
+    "Storage": "storage",
+    "Screen Size": "screen_size",
+    "Screen Info": "screen_info",
+    "Resolution": "resolution",
+    "Display Technology": "display_technology",
+    "Smart Platform": "smart_platform",
+    "Graphics Card": "graphics_card",
+    "Network Technology": "network_technology",
+    "Type": "type",
+    "Color": "color_property",
+    "Features": "features",
+}
+
+
+def reforged_file(retailer, reforged_dir=None):
+    return Path(reforged_dir or REFORGED_DIR) / f"{retailer}_products_structured.jsonld"
+
+
+def retailer_of(product_id):
+    return product_id.split("-", 1)[0]
+
+
+def slugify(text, max_length=60):
+    """ASCII URL/file name fragment; Cyrillic and other non-Latin letters are dropped."""
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode("ascii")
+    slug = re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+    return slug[:max_length].rstrip('-') or "item"
+
+
+def spec_column(property_name):
+    if property_name in SPEC_COLUMNS:
+        return SPEC_COLUMNS[property_name]
+    return re.sub(r'[^a-z0-9]+', '_', property_name.lower()).strip('_')
+
+
+def iter_catalogue(retailers=None, reforged_dir=None):
+    for retailer in retailers or RETAILERS:
+        path = reforged_file(retailer, reforged_dir)
+        if not path.exists():
+            print(f"Warning: {path} not found. Skipping.")
+            continue
+
+        for product in load_products(path):
+            yield retailer, product
+
+
+def product_key(retailer, category, name, occurrence=1):
+    """
+    Stable identity of a listing across runs. The @id counters shift whenever
+    a retailer adds or drops a product, so the key is derived from the name.
+    """
+    digest = hashlib.blake2b(f"{category}|{name}".encode("utf-8"), digest_size=8).hexdigest()
+    key = f"{retailer}:{digest}"
+    return key if occurrence == 1 else f"{key}-{occurrence}"
+
+
+def keyed_products(retailer, products):
+    """Yields (product_key, product); repeated names get an occurrence suffix in file order."""
+    occurrences = {}
+    for product in products:
+        identity = (product.get("category"), product.get("name"))
+        occurrences[identity] = occurrences.get(identity, 0) + 1
+        yield product_key(retailer, identity[0], identity[1], occurrences[identity]), product
+
+
+def regular_price(product):
+    """Neptun's pre-discount price, published as a ListPrice priceSpecification."""
+    specification = (product.get("offers") or {}).get("priceSpecification") or {}
+    if specification.get("priceType") == "https://schema.org/ListPrice":
+        return specification.get("price")
+    return None
+
+
+def flatten_product(retailer, product):
+    offers = product.get("offers") or {}
+    brand = product.get("brand") or {}
+
+    row = {
+        "id": product.get("@id"),
+        "retailer": retailer,
+        "category": product.get("category"),
+        "name": product.get("name"),
+        "brand": brand.get("name"),
+        "model": product.get("model"),
+        "color": product.get("color"),
+        "price": offers.get("price"),
+        "regular_price": regular_price(product),
+        "currency": offers.get("priceCurrency"),
+        "availability": offers.get("availability"),
+    }
+
+    for column in SPEC_COLUMNS.values():
+        row[column] = None
+
+    for prop in product.get("additionalProperty", []):
+        value = prop.get("value")
+        row[spec_column(prop.get("name", ""))] = str(value) if value is not None else None
+
+    return row
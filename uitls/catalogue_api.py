@@ -0,0 +1,297 @@
+import argparse
+import asyncio
+import base64
+import bisect
+import gzip
+import hashlib
+import json
+import time
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from catalogue import flatten_product, reforged_file
+from jsonld_graph import RETAILERS
+from jsonld_index import ProductReader
+
+DEFAULT_PORT = 8080
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+RELOAD_INTERVAL = 2.0
+GZIP_MIN_SIZE = 1024
+
+STATUS_TEXT = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+def _etag(body):
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def _summary(row):
+    return {
+        "@id": row["id"],
+        "name": row["name"],
+        "category": row["category"],
+        "retailer": row["retailer"],
+        "brand": row["brand"],
+        "price": row["price"],
+        "priceCurrency": row["currency"],
+        "url": f"/products/{row['id']}",
+    }
+
+
+def encode_cursor(product_id):
+    return base64.urlsafe_b64encode(product_id.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+
+
+class Catalogue:
+    """
+    Immutable snapshot of the reforged data. Only the listing summaries are
+    kept in memory, in file order; full products are read back through the
+    memory-mapped files, which the reforgers replace rather than rewrite, so
+    a snapshot keeps serving the version it opened. Every filter index is a
+    sorted list of positions, so a filtered listing is an intersection and a
+    cursor is a bisect.
+    """
+
+    def __init__(self, reforged_dir=None):
+        self.reforged_dir = reforged_dir
+        self.mtimes = source_mtimes(reforged_dir)
+        self.readers = {}
+        self.summaries = []
+        self.positions = {}
+        self.bodies = {}
+        self.indexes = {"category": {}, "retailer": {}, "brand": {}}
+
+        for retailer in RETAILERS:
+            path = reforged_file(retailer, reforged_dir)
+            if not path.exists():
+                print(f"Warning: {path} not found. Skipping.")
+                continue
+            self.readers[retailer] = ProductReader(path)
+
+        for retailer, reader in self.readers.items():
+            for product in reader:
+                position = len(self.summaries)
+                row = flatten_product(retailer, product)
+                self.summaries.append(_summary(row))
+                self.positions[row["id"]] = position
+                for field in self.indexes:
+                    value = (row[field] or "").lower()
+                    self.indexes[field].setdefault(value, []).append(position)
+
+    def product_body(self, product_id):
+        """Serialized JSON-LD and ETag of a single product, cached on first use."""
+        if product_id not in self.bodies:
+            position = self.positions.get(product_id)
+            if position is None:
+                return None
+            product = self.readers[self.summaries[position]["retailer"]].get(product_id)
+            body = json.dumps(product, ensure_ascii=False).encode("utf-8")
+            self.bodies[product_id] = (body, _etag(body))
+        return self.bodies[product_id]
+
+    def listing(self, filters, limit=DEFAULT_LIMIT, cursor=None):
+        candidates = None
+        for field, index in self.indexes.items():
+            if field in filters:
+                positions = index.get(filters[field].lower(), [])
+                candidates = positions if candidates is None else _intersect(candidates, positions)
+        if candidates is None:
+            candidates = range(len(self.summaries))
+
+        start = 0
+        if cursor:
+            last = self.positions.get(decode_cursor(cursor))
+            if last is None:
+                raise ValueError("cursor does not match the current catalogue")
+            start = bisect.bisect_right(candidates, last)
+
+        min_price = filters.get("min_price")
+        max_price = filters.get("max_price")
+        items = []
+        next_cursor = None
+        for position in candidates[start:]:
+            summary = self.summaries[position]
+            price = summary["price"]
+            if min_price is not None and (price is None or price < min_price):
+                continue
+            if max_price is not None and (price is None or price > max_price):
+                continue
+            if len(items) == limit:
+                next_cursor = encode_cursor(items[-1]["@id"])
+                break
+            items.append(summary)
+
+        return {"items": items, "next_cursor": next_cursor}
+
+
+def _intersect(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    members = set(b)
+    return [position for position in a if position in members]
+
+
+def source_mtimes(reforged_dir=None):
+    mtimes = {}
+    for retailer in RETAILERS:
+        path = reforged_file(retailer, reforged_dir)
+        mtimes[retailer] = path.stat().st_mtime_ns if path.exists() else None
+    return mtimes
+
+
+class CatalogueService:
+    def __init__(self, reforged_dir=None, reload_interval=RELOAD_INTERVAL):
+        self.reforged_dir = reforged_dir
+        self.reload_interval = reload_interval
+        self.catalogue = Catalogue(reforged_dir)
+        self.loaded_at = time.time()
+
+    async def watch(self):
+        """Polls the reforged files and swaps in a fresh catalogue when any of them changes."""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            if source_mtimes(self.reforged_dir) == self.catalogue.mtimes:
+                continue
+            try:
+                catalogue = await asyncio.get_running_loop().run_in_executor(None, Catalogue, self.reforged_dir)
+            except (OSError, ValueError) as e:
+                print(f"Warning: reload failed: {e}")
+                continue
+            self.catalogue = catalogue
+            self.loaded_at = time.time()
+            print(f"Reloaded catalogue: {len(catalogue.summaries)} products")
+
+    def route(self, path, query):
+        catalogue = self.catalogue
+
+        if path == "/health":
+            return 200, "application/json", _json({"products": len(catalogue.summaries), "loaded_at": self.loaded_at})
+
+        if path == "/products":
+            filters = {field: query[field] for field in ("category", "retailer", "brand") if field in query}
+            try:
+                for field in ("min_price", "max_price"):
+                    if field in query:
+                        filters[field] = float(query[field])
+                limit = min(max(int(query.get("limit", DEFAULT_LIMIT)), 1), MAX_LIMIT)
+                result = catalogue.listing(filters, limit, query.get("cursor"))
+            except ValueError as e:
+                return 400, "application/json", _json({"error": str(e)})
+            return 200, "application/json", _json(result)
+
+        if path.startswith("/products/"):
+            cached = catalogue.product_body(unquote(path[len("/products/"):]))
+            if cached is None:
+                return 404, "application/json", _json({"error": "product not found"})
+            body, etag = cached
+            return 200, "application/ld+json", (body, etag)
+
+        return 404, "application/json", _json({"error": "not found"})
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+
+                if method not in ("GET", "HEAD"):
+                    status, content_type, payload = 405, "application/json", _json({"error": "method not allowed"})
+                else:
+                    url = urlsplit(target)
+                    query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                    status, content_type, payload = self.route(url.path.rstrip("/") or "/", query)
+
+                writer.write(_response(status, content_type, payload, headers, keep_alive, method == "HEAD"))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+
+def _json(data):
+    body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    return body, _etag(body)
+
+
+def _etag_matches(if_none_match, etag):
+    """If-None-Match is a comma-separated list of entity tags (or *), compared weakly: a W/ prefix is ignored."""
+    tags = {tag[2:] if tag.startswith("W/") else tag for tag in (tag.strip() for tag in if_none_match.split(","))}
+    return "*" in tags or (etag[2:] if etag.startswith("W/") else etag) in tags
+
+
+def _response(status, content_type, payload, request_headers, keep_alive, head_only):
+    body, etag = payload
+    headers = {
+        "Content-Type": f"{content_type}; charset=utf-8",
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive" if keep_alive else "close",
+        "Vary": "Accept-Encoding",
+    }
+
+    compress = len(body) >= GZIP_MIN_SIZE and "gzip" in request_headers.get("accept-encoding", "")
+    if compress:
+        # The gzipped representation gets its own validator.
+        headers["ETag"] = etag[:-1] + '-gzip"'
+
+    if status == 200 and _etag_matches(request_headers.get("if-none-match", ""), headers["ETag"]):
+        status, body = 304, b""
+    elif compress:
+        body = gzip.compress(body, compresslevel=5)
+        headers["Content-Encoding"] = "gzip"
+
+    headers["Content-Length"] = str(len(body))
+    lines = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}"] + [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (b"" if head_only else body)
+
+
+async def serve(host, port, reforged_dir=None):
+    start = time.perf_counter()
+    service = CatalogueService(reforged_dir)
+    print(f"Loaded {len(service.catalogue.summaries)} products in {time.perf_counter() - start:.2f} s")
+
+    server = await asyncio.start_server(service.handle, host, port)
+    watcher = asyncio.create_task(service.watch())
+    print(f"Serving on http://{host}:{port}/products")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        watcher.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the reforged catalogue over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
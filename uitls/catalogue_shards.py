@@ -0,0 +1,160 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from catalogue import REFORGED_DIR, reforged_file, slugify
+from jsonld_graph import RETAILERS, load_products
+
+SHARDS_DIR = REFORGED_DIR / "shards"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+UNBRANDED = "unbranded"
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+
+def _load_brotli():
+    for module_name in ("brotli", "brotlicffi"):
+        try:
+            return __import__(module_name)
+        except ImportError:
+            continue
+    return None
+
+
+def shard_path(retailer, category, brand):
+    """<retailer>/<category>/<brand>.jsonld, relative to the shards directory."""
+    return f"{retailer}/{slugify(category or 'other')}/{slugify(brand) if brand else UNBRANDED}.jsonld"
+
+
+def encode_shard(products):
+    """The same JSON-LD array layout as <retailer>_products_structured.jsonld."""
+    return json.dumps(products, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def compressed_variants(data, brotli=None):
+    """{suffix: bytes}. gzip is written with mtime 0, so the same shard always compresses to the same bytes."""
+    variants = {"gz": gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(data, quality=BROTLI_QUALITY)
+    return variants
+
+
+def _write_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "wb") as f:
+        f.write(data)
+    os.replace(temporary, path)
+
+
+def load_manifest(shards_dir=None):
+    try:
+        with open(Path(shards_dir or SHARDS_DIR) / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {"version": MANIFEST_VERSION, "shards": []}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {"version": MANIFEST_VERSION, "shards": []}
+    return manifest
+
+
+def _is_current(entry, digest, suffixes, shards_dir):
+    if entry is None or entry["sha256"] != digest:
+        return False
+    files = [entry["path"]] + [entry[suffix]["path"] for suffix in suffixes if suffix in entry]
+    return all(suffix in entry for suffix in suffixes) and all((shards_dir / path).exists() for path in files)
+
+
+def write_shards(retailer, products, shards_dir=None):
+    """
+    Splits one retailer's products into a shard per category and brand, each
+    with gzip (and, when the brotli package is installed, brotli) variants,
+    and updates the retailer's entries in manifest.json, whose "variants"
+    lists the compressed variants every shard has (no "br" without brotli).
+    A shard whose bytes hash the same as in the manifest is left alone, so
+    its files, and any cached or uploaded copies of them, stay valid. Shards
+    that no longer have products are deleted. Returns (written, unchanged, removed) shard counts.
+    """
+    shards_dir = Path(shards_dir or SHARDS_DIR)
+    manifest = load_manifest(shards_dir)
+    previous = {entry["path"]: entry for entry in manifest["shards"] if entry["retailer"] == retailer}
+    brotli = _load_brotli()
+    suffixes = ["gz", "br"] if brotli is not None else ["gz"]
+
+    groups = {}
+    for product in products:
+        category = product.get("category")
+        brand = (product.get("brand") or {}).get("name")
+        path = shard_path(retailer, category, brand)
+        groups.setdefault(path, (category, brand, []))[2].append(product)
+
+    entries = []
+    written = unchanged = 0
+    for path, (category, brand, items) in sorted(groups.items()):
+        data = encode_shard(items)
+        digest = hashlib.sha256(data).hexdigest()
+        if _is_current(previous.get(path), digest, suffixes, shards_dir):
+            entries.append(previous[path])
+            unchanged += 1
+            continue
+
+        entry = {"path": path, "retailer": retailer, "category": category, "brand": brand,
+                 "records": len(items), "bytes": len(data), "sha256": digest}
+        _write_atomic(shards_dir / path, data)
+        for suffix, variant in compressed_variants(data, brotli).items():
+            _write_atomic(shards_dir / f"{path}.{suffix}", variant)
+            entry[suffix] = {"path": f"{path}.{suffix}", "bytes": len(variant)}
+        entries.append(entry)
+        written += 1
+
+    removed = 0
+    for path in previous.keys() - groups.keys():
+        for name in [path] + [previous[path][suffix]["path"] for suffix in ("gz", "br") if suffix in previous[path]]:
+            (shards_dir / name).unlink(missing_ok=True)
+        removed += 1
+        directory = (shards_dir / path).parent
+        if directory.exists() and not any(directory.iterdir()):
+            directory.rmdir()
+
+    shards = [entry for entry in manifest["shards"] if entry["retailer"] != retailer] + entries
+    shards.sort(key=lambda entry: entry["path"])
+    manifest = {"version": MANIFEST_VERSION,
+                "records": sum(entry["records"] for entry in shards),
+                "variants": [suffix for suffix in ("gz", "br") if all(suffix in entry for entry in shards)],
+                "shards": shards}
+    _write_atomic(shards_dir / MANIFEST_NAME,
+                  json.dumps(manifest, indent=2, ensure_ascii=False).encode("utf-8"))
+    return written, unchanged, removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split the reforged JSON-LD into precompressed shards.")
+    parser.add_argument("retailers", nargs="*", help=f"any of {', '.join(RETAILERS)} (default: all)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for retailer in args.retailers or RETAILERS:
+        source = reforged_file(retailer)
+        if not source.exists():
+            print(f"Warning: {source} not found. Skipping.")
+            continue
+        written, unchanged, removed = write_shards(retailer, load_products(source))
+        print(f"{retailer}: {written} shards written, {unchanged} unchanged, {removed} removed")
+
+    manifest = load_manifest()
+    raw = sum(entry["bytes"] for entry in manifest["shards"])
+    compressed = sum(entry["gz"]["bytes"] for entry in manifest["shards"])
+    print(f"{len(manifest['shards'])} shards, {manifest['records']} products, {raw / 1e6:.1f} MB "
+          f"({compressed / 1e6:.2f} MB gzip) in {time.perf_counter() - start:.2f} s")
+    if "br" not in manifest.get("variants", []):
+        print("Warning: not every shard has a brotli variant. Install brotli and rerun to write them.")
+
+
+if __name__ == "__main__":
+    main()
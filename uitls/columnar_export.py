@@ -0,0 +1,139 @@
+import shutil
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from catalogue import REFORGED_DIR, RETAILERS, SPEC_COLUMNS, iter_catalogue, flatten_product
+from spec_normalizer import normalize_product
+
+COLUMNAR_DIR = REFORGED_DIR / "columnar"
+
+FORMATS = {"ipc": "arrow", "parquet": "parquet"}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        return None
+
+
+def columnar_schema(pa):
+    """
+    The spec columns keep the retailer's text as is; their typed counterparts
+    (ram_gb, storage_gb, screen_in, resolution_class, ...) come from
+    spec_normalizer, so range filters never have to parse strings.
+    """
+    fields = [
+        ("id", pa.string()),
+        ("name", pa.string()),
+        ("brand", pa.dictionary(pa.int32(), pa.string())),
+        ("model", pa.string()),
+        ("color", pa.dictionary(pa.int32(), pa.string())),
+        ("price", pa.float64()),
+        ("regular_price", pa.float64()),
+        ("currency", pa.dictionary(pa.int8(), pa.string())),
+        ("availability", pa.dictionary(pa.int8(), pa.string())),
+    ]
+    fields += [(column, pa.string()) for column in SPEC_COLUMNS.values()]
+    fields += [
+        ("ram_gb", pa.int16()),
+        ("storage_gb", pa.int32()),
+        ("storage_type", pa.dictionary(pa.int8(), pa.string())),
+        ("screen_in", pa.float32()),
+        ("resolution_class", pa.dictionary(pa.int8(), pa.string())),
+        ("resolution_px", pa.int32()),
+        ("cpu_family", pa.dictionary(pa.int8(), pa.string())),
+    ]
+    return pa.schema(fields)
+
+
+def partitioning_schema(pa):
+    return pa.schema([("retailer", pa.string()), ("category", pa.string())])
+
+
+def _build_table(pa, schema, rows):
+    columns = {field.name: [row.get(field.name) for row in rows] for field in schema}
+    return pa.Table.from_pydict(columns, schema=schema)
+
+
+def export_retailer(retailer, products, output_dir=None, file_format="ipc"):
+    """
+    Writes one retailer's products as a flat table partitioned by
+    retailer=<name>/category=<name>. Arrow IPC files are written uncompressed
+    so they can be memory-mapped.
+    """
+    pa = _require_pyarrow()
+    if pa is None:
+        print("Warning: pyarrow is not installed. Skipping columnar export.")
+        return None
+
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    output_dir = Path(output_dir or COLUMNAR_DIR)
+    retailer_dir = output_dir / f"retailer={retailer}"
+    if retailer_dir.exists():
+        shutil.rmtree(retailer_dir)
+
+    by_category = defaultdict(list)
+    for product in products:
+        row = flatten_product(retailer, product)
+        row.update({key: value for key, value in normalize_product(product).items() if key not in row})
+        by_category[row["category"]].append(row)
+
+    schema = columnar_schema(pa)
+    extension = FORMATS[file_format]
+
+    for category, rows in by_category.items():
+        partition_dir = retailer_dir / f"category={category}"
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        table = _build_table(pa, schema, rows)
+        target = partition_dir / f"part-0.{extension}"
+
+        if file_format == "parquet":
+            pq.write_table(table, target)
+        else:
+            feather.write_feather(table, target, compression="uncompressed")
+
+    return retailer_dir
+
+
+def open_dataset(output_dir=None, file_format="ipc"):
+    import pyarrow.dataset as ds
+
+    pa = _require_pyarrow()
+    schema = columnar_schema(pa)
+    for field in partitioning_schema(pa):
+        schema = schema.append(field)
+
+    return ds.dataset(
+        str(output_dir or COLUMNAR_DIR),
+        format="ipc" if file_format == "ipc" else "parquet",
+        partitioning=ds.partitioning(partitioning_schema(pa), flavor="hive"),
+        schema=schema,
+    )
+
+
+def export_all(file_format="ipc"):
+    products_by_retailer = defaultdict(list)
+    for retailer, product in iter_catalogue():
+        products_by_retailer[retailer].append(product)
+
+    for retailer in RETAILERS:
+        if retailer in products_by_retailer:
+            target = export_retailer(retailer, products_by_retailer[retailer], file_format=file_format)
+            if target is None:
+                return
+            print(f"{retailer}: {len(products_by_retailer[retailer])} rows written to {target}")
+
+    start = time.perf_counter()
+    prices = open_dataset(file_format=file_format).to_table(columns=["retailer", "price"])
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"\nScanned {prices.num_rows} prices across all retailers in {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    export_all("parquet" if "--parquet" in sys.argv else "ipc")
@@ -0,0 +1,234 @@
+import json
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from catalogue import REFORGED_DIR, flatten_product, iter_catalogue
+from spec_normalizer import normalize_product
+
+FACETS_PATH = REFORGED_DIR / "facets.json"
+
+FACETS = ["brand", "category", "retailer", "ram", "storage", "screen", "display_technology", "smart_platform",
+          "price"]
+
+# Upper bounds in MKD; the last bucket is open-ended.
+PRICE_BUCKETS = [(10000, "< 10.000"), (20000, "10.000-20.000"), (40000, "20.000-40.000"),
+                 (70000, "40.000-70.000"), (100000, "70.000-100.000"), (None, "100.000+")]
+
+# Most TV listings carry the panel and OS only in the name.
+DISPLAY_PATTERNS = [("Neo QLED", r'\bneo\s*qled\b'), ("QNED", r'\bqned\b'), ("OLED", r'\boled\b'),
+                    ("QLED", r'\bqled\b'), ("Mini LED", r'\bmini\s*led\b'), ("LED", r'\bled\b')]
+PLATFORM_PATTERNS = [("Google TV", r'\bgoogle\s*tv\b|\bgtv\b'), ("Android TV", r'\bandroid\b'),
+                     ("webOS", r'\bweb\s*os\b'), ("Tizen", r'\btizen\b'), ("VIDAA", r'\bvidaa\b')]
+
+
+def price_bucket(price):
+    if price is None:
+        return None
+    for upper, label in PRICE_BUCKETS:
+        if upper is None or price < upper:
+            return label
+    return None
+
+
+def _capacity_label(gb):
+    if gb is None:
+        return None
+    return f"{gb // 1024} TB" if gb >= 1024 and gb % 1024 == 0 else f"{gb} GB"
+
+
+def _from_name(name, patterns):
+    for label, pattern in patterns:
+        if re.search(pattern, name, re.IGNORECASE):
+            return label
+    return None
+
+
+def facet_values(retailer, product):
+    row = flatten_product(retailer, product)
+    normalized = normalize_product(product)
+    name = row["name"] or ""
+    is_tv = row["category"] == "Televisions"
+
+    display = row["display_technology"] or (_from_name(name, DISPLAY_PATTERNS) if is_tv else None)
+    platform = row["smart_platform"] or (_from_name(name, PLATFORM_PATTERNS) if is_tv else None)
+    screen = normalized["screen_in"]
+
+    return {
+        "brand": row["brand"],
+        "category": row["category"],
+        "retailer": retailer,
+        "ram": _capacity_label(normalized["ram_gb"]),
+        "storage": _capacity_label(normalized["storage_gb"]),
+        "screen": f'{screen:g}"' if screen else None,
+        "display_technology": display,
+        "smart_platform": platform,
+        "price": price_bucket(row["price"]),
+    }
+
+
+def _bitmap(positions, size):
+    bits = bytearray((size + 7) // 8)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, "little")
+
+
+# int.bit_count() needs Python 3.10; bin() counts the same bits, more slowly, on 3.8 and 3.9.
+if hasattr(int, "bit_count"):
+    popcount = int.bit_count
+else:
+    def popcount(bitmap):
+        return bin(bitmap).count("1")
+
+
+def _positions(bitmap):
+    while bitmap:
+        lowest = bitmap & -bitmap
+        yield lowest.bit_length() - 1
+        bitmap ^= lowest
+
+
+def build_facets(catalogue=None):
+    """
+    One bitmap per facet value: bit i is set when product i has that value.
+    Brand spellings that differ only in case share one bitmap, labelled with
+    the most common spelling.
+    """
+    ids = []
+    values_by_product = []
+    for retailer, product in catalogue if catalogue is not None else iter_catalogue():
+        ids.append(product.get("@id"))
+        values_by_product.append(facet_values(retailer, product))
+
+    spellings = Counter(values["brand"] for values in values_by_product if values["brand"])
+    brand_labels = {}
+    for spelling, _ in sorted(spellings.items(), key=lambda item: (-item[1], item[0])):
+        brand_labels.setdefault(spelling.casefold(), spelling)
+
+    positions = {facet: {} for facet in FACETS}
+    for position, values in enumerate(values_by_product):
+        if values["brand"]:
+            values["brand"] = brand_labels[values["brand"].casefold()]
+        for facet in FACETS:
+            if values[facet] is not None:
+                positions[facet].setdefault(values[facet], []).append(position)
+
+    bitmaps = {facet: {value: _bitmap(members, len(ids)) for value, members in sorted(by_value.items())}
+               for facet, by_value in positions.items()}
+    return {"ids": ids, "bitmaps": bitmaps}
+
+
+def write_facets(facets, path=None):
+    data = {
+        "ids": facets["ids"],
+        "bitmaps": {facet: {value: format(bitmap, "x") for value, bitmap in by_value.items()}
+                    for facet, by_value in facets["bitmaps"].items()},
+    }
+    with open(path or FACETS_PATH, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    return path or FACETS_PATH
+
+
+def rebuild_facets(output_dir=None):
+    """Rebuilds facets.json from, and into, output_dir (reforged_data/ by default)."""
+    output_dir = Path(output_dir) if output_dir else REFORGED_DIR
+    return write_facets(build_facets(iter_catalogue(reforged_dir=output_dir)), output_dir / FACETS_PATH.name)
+
+
+class FacetEngine:
+    def __init__(self, facets=None, path=None):
+        if facets is None:
+            with open(path or FACETS_PATH, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            facets = {
+                "ids": data["ids"],
+                "bitmaps": {facet: {value: int(bitmap, 16) for value, bitmap in by_value.items()}
+                            for facet, by_value in data["bitmaps"].items()},
+            }
+        self.ids = facets["ids"]
+        self.bitmaps = facets["bitmaps"]
+        self.all = (1 << len(self.ids)) - 1
+
+    def _facet_mask(self, facet, values):
+        mask = 0
+        for value in values:
+            mask |= self.bitmaps[facet].get(value, 0)
+        return mask
+
+    def match(self, selection):
+        """Bitmap of the products matching every facet (values within a facet are OR-ed)."""
+        mask = self.all
+        for facet, values in selection.items():
+            if values:
+                mask &= self._facet_mask(facet, values)
+        return mask
+
+    def counts(self, selection=None):
+        """
+        Count of every facet value under the current selection. A facet's own
+        selection is left out of its counts, so picking "Samsung" still shows
+        how many products the other brands would add.
+        """
+        selection = {facet: values for facet, values in (selection or {}).items() if values}
+        masks = {facet: self._facet_mask(facet, values) for facet, values in selection.items()}
+
+        result = {}
+        for facet, by_value in self.bitmaps.items():
+            base = self.all
+            for other, mask in masks.items():
+                if other != facet:
+                    base &= mask
+            result[facet] = {value: count for value, bitmap in by_value.items()
+                             if (count := popcount(base & bitmap))}
+        return result
+
+    def products(self, selection, limit=None):
+        ids = []
+        for position in _positions(self.match(selection)):
+            if limit is not None and len(ids) == limit:
+                break
+            ids.append(self.ids[position])
+        return ids
+
+
+def parse_selection(arguments):
+    """'brand=Samsung,LG' 'category=Televisions' -> {'brand': ['Samsung', 'LG'], ...}"""
+    selection = {}
+    for argument in arguments:
+        facet, _, values = argument.partition("=")
+        if facet not in FACETS:
+            raise SystemExit(f"Unknown facet {facet!r}; choose from {', '.join(FACETS)}")
+        selection[facet] = [value for value in values.split(",") if value]
+    return selection
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "build":
+        start = time.perf_counter()
+        output_file = rebuild_facets()
+        print(f"Facet bitmaps rebuilt in {time.perf_counter() - start:.2f} s. Saved to {output_file}")
+        return
+
+    engine = FacetEngine()
+    selection = parse_selection(sys.argv[1:])
+
+    runs = 1000
+    start = time.perf_counter()
+    for _ in range(runs):
+        counts = engine.counts(selection)
+    elapsed = (time.perf_counter() - start) / runs * 1_000_000
+
+    for facet, values in counts.items():
+        print(f"{facet}:")
+        for value, count in sorted(values.items(), key=lambda item: (-item[1], item[0])):
+            marker = "*" if value in selection.get(facet, []) else " "
+            print(f"  {marker} {value:<24} {count}")
+    matching = popcount(engine.match(selection))
+    print(f"\n{matching} of {len(engine.ids)} products match; all facet counts in {elapsed:.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
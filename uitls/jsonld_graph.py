@@ -0,0 +1,141 @@
+import re
+import json
+import sys
+from pathlib import Path
+
+SCHEMA_CONTEXT = "https://schema.org"
+
+RETAILERS = ["anhoch", "neptun", "setec", "tehnomarket"]
+
+_SEPARATOR = re.compile(r'[\s,]*')
+
+
+def brand_id(brand_name):
+    slug = re.sub(r'[^a-z0-9]+', '-', brand_name.lower()).strip('-')
+    return f"brand-{slug or 'unknown'}"
+
+
+def to_graph(products):
+    """
+    Turns a list of standalone Product objects into a single JSON-LD document
+    with one @context, a @graph array and Brand nodes shared by @id. Brands
+    are keyed by brand_id, so "Samsung" and "SAMSUNG" share one node, named
+    with the first spelling seen.
+    """
+    brands = {}
+    graph_products = []
+
+    for product in products:
+        node = {key: value for key, value in product.items() if key != "@context"}
+
+        brand = node.get("brand")
+        if isinstance(brand, dict) and brand.get("name"):
+            node_id = brand_id(brand["name"])
+            brands.setdefault(node_id, {"@type": "Brand", "@id": node_id, "name": brand["name"]})
+            node["brand"] = {"@id": node_id}
+
+        graph_products.append(node)
+
+    return {
+        "@context": SCHEMA_CONTEXT,
+        "@graph": list(brands.values()) + graph_products
+    }
+
+
+def from_graph(document):
+    """
+    Inverse of to_graph: returns the standalone Product objects with the
+    @context and Brand nodes inlined again.
+    """
+    brands = {}
+    products = []
+
+    for node in document.get("@graph", []):
+        if node.get("@type") == "Brand":
+            brands[node["@id"]] = {"@type": "Brand", "name": node["name"]}
+        else:
+            products.append(node)
+
+    expanded = []
+    for node in products:
+        product = {"@context": document.get("@context", SCHEMA_CONTEXT)}
+        for key, value in node.items():
+            if key == "brand" and isinstance(value, dict) and "@id" in value and value["@id"] in brands:
+                value = dict(brands[value["@id"]])
+            product[key] = value
+        expanded.append(product)
+
+    return expanded
+
+
+def write_graph(products, output_file):
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(to_graph(products), f, ensure_ascii=False, separators=(",", ":"))
+
+
+def load_products(path):
+    with open(path, "r", encoding="utf-8") as f:
+        document = json.load(f)
+
+    if isinstance(document, dict) and "@graph" in document:
+        return from_graph(document)
+    return document
+
+
+def iter_json_array(path, chunk_size=1 << 16):
+    """Streams the items of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = f.read(chunk_size).lstrip()
+        if buffer.startswith("{"):
+            document = json.loads(buffer + f.read())
+            yield from from_graph(document)
+            return
+        if not buffer.startswith("["):
+            raise ValueError(f"{path} is not a JSON array")
+        position = 1
+        eof = False
+
+        while True:
+            position = _SEPARATOR.match(buffer, position).end()
+            if buffer.startswith("]", position):
+                return
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            yield item
+
+
+def graph_output_path(output_dir, retailer):
+    return Path(output_dir) / f"{retailer}_products_graph.jsonld"
+
+
+def convert_reforged_data(retailers=None):
+    base_dir = Path(__file__).parent.parent
+    output_dir = base_dir / "reforged_data"
+
+    for retailer in retailers or RETAILERS:
+        source = output_dir / f"{retailer}_products_structured.jsonld"
+        if not source.exists():
+            print(f"Warning: {source} not found. Skipping.")
+            continue
+
+        products = load_products(source)
+        target = graph_output_path(output_dir, retailer)
+        write_graph(products, target)
+
+        before = source.stat().st_size
+        after = target.stat().st_size
+        print(f"{retailer}: {len(products)} products, {before:,} -> {after:,} bytes "
+              f"({100 * after / before:.0f}%). Saved to {target}")
+
+
+if __name__ == "__main__":
+    convert_reforged_data(sys.argv[1:] or None)
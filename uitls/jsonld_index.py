@@ -0,0 +1,209 @@
+import json
+import mmap
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+from catalogue import reforged_file
+from jsonld_graph import RETAILERS
+
+INDEX_VERSION = 1
+
+_SEPARATOR = re.compile(r'[\s,]*')
+_WHITESPACE = re.compile(r'\s*')
+
+
+def index_path(path):
+    """neptun_products_structured.jsonld -> neptun_products_structured.idx.json"""
+    path = Path(path)
+    return path.with_name(path.stem + ".idx.json")
+
+
+def _fingerprint(stat):
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def write_index(path, entries, stat=None):
+    """
+    Writes the sidecar index of a JSON array file: the @id, byte offset and
+    byte length of every item, in file order, plus the size and mtime of the
+    file it describes (`stat`, by default the file's current one) so a
+    stale index is never trusted.
+    """
+    ids, offsets, lengths = [], [], []
+    for product_id, offset, length in entries:
+        ids.append(product_id)
+        offsets.append(offset)
+        lengths.append(length)
+
+    target = index_path(path)
+    temporary = target.with_name(target.name + ".tmp")
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump({"version": INDEX_VERSION, "source": _fingerprint(stat or os.stat(path)), "ids": ids, "offsets": offsets,
+                   "lengths": lengths}, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(temporary, target)
+    return target
+
+
+def load_index(path, stat=None):
+    """The sidecar index of `path`, or None if it is missing, unreadable or describes another version of the file."""
+    try:
+        with open(index_path(path), "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != INDEX_VERSION or index.get("source") != _fingerprint(stat or os.stat(path)):
+        return None
+    return index
+
+
+def scan_offsets(path, chunk_size=1 << 16):
+    """
+    Yields (@id, byte offset, byte length) for every item of a top-level JSON
+    array, reading the file in chunks. Used to rebuild a missing or stale index.
+    """
+    # newline="" keeps characters and bytes in step: no \r\n translation.
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        yield from _scan(f, path, chunk_size)
+
+
+def _scan(f, path, chunk_size):
+    decoder = json.JSONDecoder()
+    buffer = f.read(chunk_size)
+    position = _WHITESPACE.match(buffer).end()
+    if not buffer.startswith("[", position):
+        raise ValueError(f"{path} is not a JSON array")
+    position += 1
+    # buffer[counted] sits at byte offset byte_position of the file.
+    counted = byte_position = 0
+    eof = False
+
+    while True:
+        position = _SEPARATOR.match(buffer, position).end()
+        if buffer.startswith("]", position):
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            byte_position += len(buffer[counted:position].encode("utf-8"))
+            buffer = buffer[position:] + chunk
+            position = counted = 0
+            continue
+
+        byte_position += len(buffer[counted:position].encode("utf-8"))
+        length = len(buffer[position:end].encode("utf-8"))
+        yield (item.get("@id") if isinstance(item, dict) else None), byte_position, length
+        byte_position += length
+        position = counted = end
+
+
+class ProductReader:
+    """
+    Memory-maps a reforged JSON-LD array and decodes only the products asked
+    for, located through the sidecar index (rebuilt and saved if it is
+    missing or stale). The reforgers replace their files rather than
+    rewriting them, so an open reader keeps seeing the version it opened.
+    """
+
+    def __init__(self, path, save_index=True):
+        self.path = Path(path)
+        # The map, the index check and any rescan all use this one open file,
+        # even if the path is replaced meanwhile.
+        with open(self.path, "r", encoding="utf-8", newline="") as f:
+            stat = os.fstat(f.fileno())
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b""
+
+            index = load_index(self.path, stat)
+            if index is None:
+                entries = list(_scan(f, self.path, 1 << 16)) if stat.st_size else []
+                if save_index and stat.st_size:
+                    try:
+                        write_index(self.path, entries, stat)
+                    except OSError as e:
+                        print(f"Warning: could not save the index of {self.path}: {e}")
+                index = {"ids": [entry[0] for entry in entries], "offsets": [entry[1] for entry in entries],
+                         "lengths": [entry[2] for entry in entries]}
+
+        self.ids = index["ids"]
+        self._offsets = index["offsets"]
+        self._lengths = index["lengths"]
+        self._positions = {product_id: position for position, product_id in enumerate(self.ids)
+                           if product_id is not None}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, product_id):
+        return product_id in self._positions
+
+    def raw(self, product_id):
+        """The product's bytes exactly as stored in the file, or None."""
+        position = self._positions.get(product_id)
+        if position is None:
+            return None
+        return self._at(position)
+
+    def _at(self, position):
+        offset = self._offsets[position]
+        return self._map[offset:offset + self._lengths[position]]
+
+    def get(self, product_id):
+        raw = self.raw(product_id)
+        return None if raw is None else json.loads(raw)
+
+    def slice(self, start_id, end_id=None, limit=None):
+        """Products in file order from start_id through end_id (inclusive), or the next `limit` of them."""
+        start = self._positions.get(start_id)
+        if start is None:
+            return []
+        stop = len(self.ids) if end_id is None else self._positions.get(end_id, -1) + 1
+        if limit is not None:
+            stop = min(stop, start + limit)
+        return [json.loads(self._at(position)) for position in range(start, stop)]
+
+    def __iter__(self):
+        for position in range(len(self.ids)):
+            yield json.loads(self._at(position))
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def index_reforged_data(retailers=None, reforged_dir=None):
+    """Builds any missing or stale index and times a point lookup against loading the whole file."""
+    for retailer in retailers or RETAILERS:
+        path = reforged_file(retailer, reforged_dir)
+        if not path.exists():
+            print(f"Warning: {path} not found. Skipping.")
+            continue
+
+        start = time.perf_counter()
+        with ProductReader(path) as reader:
+            opened = time.perf_counter()
+            product_id = reader.ids[len(reader) // 2] if len(reader) else None
+            reader.get(product_id)
+            looked_up = time.perf_counter()
+        with open(path, "r", encoding="utf-8") as f:
+            products = json.load(f)
+        loaded = time.perf_counter()
+
+        print(f"{retailer}: {len(products)} products, index {index_path(path).name}; open "
+              f"{(opened - start) * 1000:.1f} ms, lookup {(looked_up - opened) * 1000:.2f} ms, "
+              f"json.load {(loaded - looked_up) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    index_reforged_data(sys.argv[1:] or None)
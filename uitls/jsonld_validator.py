@@ -0,0 +1,200 @@
+import argparse
+import json
+import re
+import sys
+import time
+from collections import Counter
+
+from catalogue import reforged_file
+from jsonld_graph import RETAILERS, SCHEMA_CONTEXT, iter_json_array
+
+NUMBER = (int, float)
+TEXT = (str,)
+
+# The shapes the reforgers promise. A property maps to the Python types its
+# value may have, or to the name of a nested shape; a list means "array of".
+SHAPES = {
+    "Product": {
+        "required": {"@context": TEXT, "@type": TEXT, "@id": TEXT, "category": TEXT, "name": TEXT,
+                     "offers": "Offer"},
+        "optional": {"brand": "Brand", "model": TEXT, "color": TEXT, "description": TEXT,
+                     "additionalProperty": ["PropertyValue"]},
+    },
+    "Offer": {
+        "required": {"@type": TEXT, "price": NUMBER, "priceCurrency": TEXT, "availability": TEXT},
+        "optional": {"priceSpecification": "UnitPriceSpecification"},
+    },
+    "UnitPriceSpecification": {
+        "required": {"@type": TEXT, "price": NUMBER, "priceCurrency": TEXT, "priceType": TEXT},
+        "optional": {},
+    },
+    "Brand": {
+        "required": {"@type": TEXT, "name": TEXT},
+        "optional": {},
+    },
+    "PropertyValue": {
+        "required": {"@type": TEXT, "name": TEXT, "value": TEXT + NUMBER},
+        "optional": {},
+    },
+}
+
+# Value constraints on top of the shapes, keyed by (shape, property).
+VALUE_RULES = {
+    ("Product", "@context"): ("context", lambda value: value == SCHEMA_CONTEXT),
+    ("Product", "@id"): ("id-format", re.compile(r'^[a-z]+-[a-z]+-\d+$').match),
+    ("Product", "category"): ("category", {"Laptops", "Smartphones", "Televisions"}.__contains__),
+    ("Product", "name"): ("non-empty", lambda value: bool(value.strip())),
+    ("Offer", "price"): ("positive", lambda value: value > 0),
+    ("Offer", "priceCurrency"): ("iso-4217", re.compile(r'^[A-Z]{3}$').match),
+    ("Offer", "availability"): ("schema-iri", lambda value: value.startswith("https://schema.org/")),
+    ("UnitPriceSpecification", "price"): ("positive", lambda value: value > 0),
+    ("UnitPriceSpecification", "priceType"): ("schema-iri", lambda value: value.startswith("https://schema.org/")),
+    ("Brand", "name"): ("non-empty", lambda value: bool(value.strip())),
+}
+
+
+def compile_shapes(shapes=SHAPES, value_rules=VALUE_RULES):
+    """
+    Turns the shape table into one validator function per shape. Each
+    validator appends (rule, path) tuples for the violations it finds, so
+    the per-node work is a fixed list of closure calls.
+    """
+    validators = {}
+
+    def make_validator(shape_name, shape):
+        checks = []
+        allowed = {"@type"} | set(shape["required"]) | set(shape["optional"])
+
+        def type_check(rule_prefix, key, expected):
+            def check(node, path, errors):
+                value = node.get(key)
+                if value is None:
+                    return
+                if isinstance(expected, list):
+                    if not isinstance(value, list):
+                        errors.append((f"{rule_prefix}.type", f"{path}.{key}"))
+                        return
+                    validate_child = validators[expected[0]]
+                    for index, item in enumerate(value):
+                        if isinstance(item, dict):
+                            validate_child(item, f"{path}.{key}[{index}]", errors)
+                        else:
+                            errors.append((f"{rule_prefix}.type", f"{path}.{key}[{index}]"))
+                elif isinstance(expected, str):
+                    if isinstance(value, dict):
+                        validators[expected](value, f"{path}.{key}", errors)
+                    else:
+                        errors.append((f"{rule_prefix}.type", f"{path}.{key}"))
+                elif isinstance(value, bool) or not isinstance(value, expected):
+                    errors.append((f"{rule_prefix}.type", f"{path}.{key}"))
+                elif (shape_name, key) in value_rules:
+                    rule, predicate = value_rules[(shape_name, key)]
+                    if not predicate(value):
+                        errors.append((f"{rule_prefix}.{rule}", f"{path}.{key}"))
+            return check
+
+        for key, expected in shape["required"].items():
+            rule_prefix = f"{shape_name}.{key}"
+
+            def required(node, path, errors, key=key, rule_prefix=rule_prefix):
+                if node.get(key) is None:
+                    errors.append((f"{rule_prefix}.{'null' if key in node else 'missing'}", f"{path}.{key}"))
+            checks.append(required)
+            checks.append(type_check(rule_prefix, key, expected))
+
+        for key, expected in shape["optional"].items():
+            checks.append(type_check(f"{shape_name}.{key}", key, expected))
+
+        def type_and_unknown(node, path, errors):
+            if node.get("@type") != shape_name:
+                errors.append((f"{shape_name}.@type.value", path))
+            for key in node.keys() - allowed:
+                errors.append((f"{shape_name}.unknown-property", f"{path}.{key}"))
+        checks.append(type_and_unknown)
+
+        def validate(node, path, errors):
+            for check in checks:
+                check(node, path, errors)
+        return validate
+
+    for shape_name, shape in shapes.items():
+        validators[shape_name] = make_validator(shape_name, shape)
+    return validators
+
+
+_VALIDATORS = compile_shapes()
+
+
+def validate_product(product, errors=None):
+    errors = [] if errors is None else errors
+    if not isinstance(product, dict):
+        errors.append(("Product.type", "$"))
+        return errors
+    _VALIDATORS["Product"](product, product.get("@id") or "$", errors)
+    return errors
+
+
+def validate_products(products, report=None, seen_ids=None):
+    """Validates an iterable of products into a report of rule counts and one example path per rule."""
+    report = report if report is not None else {"products": 0, "rules": Counter(), "examples": {}}
+    seen_ids = seen_ids if seen_ids is not None else set()
+
+    for product in products:
+        report["products"] += 1
+        errors = validate_product(product)
+        product_id = product.get("@id") if isinstance(product, dict) else None
+        if product_id is not None:
+            if product_id in seen_ids:
+                errors.append(("Product.@id.duplicate", product_id))
+            seen_ids.add(product_id)
+
+        for rule, path in errors:
+            report["rules"][rule] += 1
+            report["examples"].setdefault(rule, path)
+
+    return report
+
+
+def validate_reforged_data(retailers=None, reforged_dir=None):
+    reports = {}
+    for retailer in retailers or RETAILERS:
+        path = reforged_file(retailer, reforged_dir)
+        if not path.exists():
+            print(f"Warning: {path} not found. Skipping.")
+            continue
+        reports[retailer] = validate_products(iter_json_array(path))
+    return reports
+
+
+def summary_line(report):
+    violations = sum(report["rules"].values())
+    return f"{report['products']} products, {violations} violations of {len(report['rules'])} rules"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate reforged JSON-LD against the schema.org shapes we emit.")
+    parser.add_argument("retailers", nargs="*")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    reports = validate_reforged_data(args.retailers or None)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps({retailer: {"products": report["products"], "rules": dict(report["rules"]),
+                                     "examples": report["examples"]}
+                          for retailer, report in reports.items()}, indent=2, ensure_ascii=False))
+    else:
+        for retailer, report in reports.items():
+            print(f"{retailer}: {summary_line(report)}")
+            for rule, count in report["rules"].most_common():
+                print(f"  {rule:<40} {count:>6}  e.g. {report['examples'][rule]}")
+
+    total = sum(report["products"] for report in reports.values())
+    print(f"\nValidated {total} products in {elapsed * 1000:.0f} ms", file=sys.stderr)
+    sys.exit(1 if any(report["rules"] for report in reports.values()) else 0)
+
+
+if __name__ == "__main__":
+    main()
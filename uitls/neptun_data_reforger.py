@@ -1,13 +1,21 @@
 import re
-import json
-import pandas as pd
 import os
+import sys
 from pathlib import Path
 
+from parse_profiler import profiled
+from product_model import PRODUCT_KEYS, Offer, Product, write_products
+from reforge_input import is_missing, read_rows
+from reforge_outputs import rebuild_catalogue_outputs, write_derived_outputs
+
+
+# Neptun's description comes right after the offer.
+KEY_ORDER = PRODUCT_KEYS[:6] + ("description",) + PRODUCT_KEYS[6:-1]
+
 
 def parse_price(price_str):
     try:
-        if pd.isna(price_str) or price_str == 'N/A':
+        if is_missing(price_str) or price_str == 'N/A':
             return None
         cleaned = str(price_str).replace('.', '')
         price_float = float(cleaned)
@@ -17,7 +25,7 @@ def parse_price(price_str):
 
 
 def parse_laptop_name(name):
-    if pd.isna(name) or name == 'N/A':
+    if is_missing(name) or name == 'N/A':
         return {"brand": None, "model": None, "cpu": None, "ram": None,
                 "storage": None, "screen_size": None}
 
@@ -60,7 +68,7 @@ def parse_laptop_name(name):
     }
 
 def parse_phone_name(name):
-    if pd.isna(name) or name == 'N/A':
+    if is_missing(name) or name == 'N/A':
         return {"brand": None, "model": None, "ram": None, "storage": None, "color": None}
 
     brand_match = re.search(r'^([A-Za-z]+)', name)
@@ -100,7 +108,7 @@ def parse_phone_name(name):
 
 
 def parse_tv_name(name):
-    if pd.isna(name) or name == 'N/A':
+    if is_missing(name) or name == 'N/A':
         return {"brand": None, "model": None, "size": None, "resolution": None, "features": None}
 
 
@@ -144,19 +152,11 @@ def parse_tv_name(name):
 
 
 def create_product_schema(product_id, category, original_name, price_data, parsed_data):
-    product = {
-        "@context": "https://schema.org",
-        "@type": "Product",
-        "@id": product_id,
-        "category": category,
-        "name": original_name,
-        "offers": {
-            "@type": "Offer",
-            "price": price_data["price"],
-            "priceCurrency": "MKD",
-            "availability": "https://schema.org/InStock"
-        }
-    }
+    list_price = None
+    if (price_data["regular_price"] and
+        price_data["regular_price"] != price_data["price"]):
+        list_price = price_data["regular_price"]
+    offer = Offer(price_data["price"], "MKD", list_price=list_price)
 
     description_parts = []
     if parsed_data.get("brand"):
@@ -175,20 +175,7 @@ def create_product_schema(product_id, category, original_name, price_data, parse
         discount_info = f" (Discounted from {price_data['regular_price']:,.0f} MKD)"
         description_parts.append(discount_info)
 
-    if description_parts:
-        product["description"] = " ".join(description_parts).strip() + "."
-
-    if parsed_data.get("brand"):
-        product["brand"] = {
-            "@type": "Brand",
-            "name": parsed_data["brand"]
-        }
-
-    if parsed_data.get("model"):
-        product["model"] = parsed_data["model"]
-
-    if parsed_data.get("color"):
-        product["color"] = parsed_data["color"]
+    description = " ".join(description_parts).strip() + "." if description_parts else None
 
     additional_props = []
 
@@ -215,23 +202,23 @@ def create_product_schema(product_id, category, original_name, price_data, parse
 
     for key, schema_name in properties_map.items():
         if parsed_data.get(key):
-            additional_props.append({
-                "@type": "PropertyValue",
-                "name": schema_name,
-                "value": parsed_data[key]
-            })
-
-    if additional_props:
-        product["additionalProperty"] = additional_props
-
-    return product
-
-def process_neptun_data():
+            additional_props.append((schema_name, parsed_data[key]))
+
+    return Product(product_id, category, original_name, offer,
+                   brand=parsed_data.get("brand") or None,
+                   model=parsed_data.get("model") or None,
+                   color=parsed_data.get("color") or None,
+                   properties=additional_props,
+                   description=description,
+                   key_order=KEY_ORDER)
+
+def process_neptun_data(graph_output=False, data_dir=None, output_dir=None, derived_outputs=True, backend=None,
+                        columnar_format="ipc"):
     base_dir = Path(__file__).parent.parent
-    data_dir = base_dir / "data"
-    output_dir = base_dir / "reforged_data"
+    data_dir = Path(data_dir) if data_dir else base_dir / "data"
+    output_dir = Path(output_dir) if output_dir else base_dir / "reforged_data"
 
-    output_dir.mkdir(exist_ok=True)
+    output_dir.mkdir(parents=True, exist_ok=True)
 
     all_products = []
     product_id_counter = 1
@@ -253,12 +240,9 @@ def process_neptun_data():
 
         try:
             print(f"Processing {file_path}...")
-            df = pd.read_csv(file_path)
-
-            df = df[df['name'] != 'N/A']
-            df = df.dropna(subset=['name'])
-
-            for index, row in df.iterrows():
+            row_count = 0
+            for row in read_rows(file_path, skip_missing=["name"], backend=backend):
+                row_count += 1
                 price_data = {
                     "price": parse_price(row['price']),
                     "regular_price": parse_price(row['regular_price']),
@@ -276,7 +260,7 @@ def process_neptun_data():
                 all_products.append(product_schema)
                 product_id_counter += 1
 
-            print(f"  Successfully processed {len(df)} {category.lower()}.")
+            print(f"  Successfully processed {row_count} {category.lower()}.")
 
         except Exception as e:
             print(f"  Error processing {file_path}: {e}")
@@ -284,14 +268,22 @@ def process_neptun_data():
             traceback.print_exc()
 
     output_file = output_dir / "neptun_products_structured.jsonld"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(all_products, f, indent=2, ensure_ascii=False)
+    write_products(all_products, output_file)
 
     print(f"\nSuccessfully processed {len(all_products)} products total")
     print(f"Output saved to {output_file}")
 
+    if derived_outputs:
+        write_derived_outputs("neptun", all_products, output_dir, graph_output=graph_output,
+                              columnar_format=columnar_format)
+
     return all_products
 
 
 if __name__ == "__main__":
-    process_neptun_data()
\ No newline at end of file
+    with profiled(sys.modules[__name__], "--profile" in sys.argv, "--tracemalloc" in sys.argv):
+        process_neptun_data(graph_output="--graph" in sys.argv, backend="pandas" if "--pandas" in sys.argv else None,
+                            columnar_format="parquet" if "--parquet" in sys.argv else "ipc")
+    # The pipeline passes --no-catalogue and rebuilds the cross-retailer outputs once after all reforges.
+    if "--no-catalogue" not in sys.argv:
+        rebuild_catalogue_outputs()
\ No newline at end of file
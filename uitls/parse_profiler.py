@@ -0,0 +1,302 @@
+import argparse
+import functools
+import importlib
+import re
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+REFORGERS = {
+    "anhoch": ("anhoch_data_reforger", "process_anhoch_data"),
+    "neptun": ("neptun_data_reforger", "process_neptun_data"),
+    "setec": ("setec_data_reforget", "process_setec_data"),
+    "tehnomarket": ("tehnomarket_data_reforget", "process_tehnomarket_data"),
+}
+
+# How each re call decides whether it "matched".
+_HIT_TESTS = {
+    "search": lambda result: result is not None,
+    "match": lambda result: result is not None,
+    "fullmatch": lambda result: result is not None,
+    "findall": bool,
+    "split": lambda result: len(result) > 1,
+    "subn": lambda result: result[1] > 0,
+}
+
+
+class Profiler:
+    """
+    Call count, match count and cumulative time per regex call site and per
+    parser function, plus how often each parser filled each output field.
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self.fields = {}
+        self.started = time.perf_counter()
+
+    def record(self, key, hit, seconds):
+        entry = self.stats.get(key)
+        if entry is None:
+            entry = self.stats[key] = [0, 0, 0.0]
+        entry[0] += 1
+        entry[1] += bool(hit)
+        entry[2] += seconds
+
+    def record_fields(self, key, result):
+        if isinstance(result, dict):
+            counts = self.fields.setdefault(key, {})
+            for field, value in result.items():
+                counts[field] = counts.get(field, 0) + (value is not None and value != "")
+
+    def report(self, limit=30, out=None):
+        out = out or sys.stdout
+        elapsed = time.perf_counter() - self.started
+        rows = sorted(self.stats.items(), key=lambda item: item[1][2], reverse=True)
+        parser_time = sum(seconds for (kind, *_), (_, _, seconds) in self.stats.items() if kind == "parser")
+
+        print(f"\nParse profile: {elapsed:.2f} s total, {parser_time:.2f} s inside parser functions", file=out)
+        print(f"{'kind':<7} {'where':<44} {'calls':>8} {'match':>7} {'total ms':>10} {'µs/call':>9}  pattern", file=out)
+        for key, (calls, hits, seconds) in rows[:limit]:
+            kind, where, label = key
+            print(f"{kind:<7} {where:<44} {calls:>8} {hits / calls:>7.1%} {seconds * 1000:>10.2f} "
+                  f"{seconds / calls * 1_000_000:>9.1f}  {label[:70]}", file=out)
+        if len(rows) > limit:
+            print(f"... {len(rows) - limit} more", file=out)
+
+        for key, counts in self.fields.items():
+            calls = self.stats[key][0]
+            filled = ", ".join(f"{field} {count / calls:.0%}" for field, count in counts.items())
+            print(f"{key[1]} fields filled: {filled}", file=out)
+
+
+class ProfiledPattern:
+    """Stands in for a compiled pattern and times every call made through it."""
+
+    def __init__(self, pattern, profiler, where):
+        self._pattern = pattern
+        self._profiler = profiler
+        self._key = ("regex", where, pattern.pattern)
+
+    def __getattr__(self, name):
+        return getattr(self._pattern, name)
+
+    def _timed(self, method, *args, **kwargs):
+        start = time.perf_counter()
+        result = getattr(self._pattern, method)(*args, **kwargs)
+        self._profiler.record(self._key, _HIT_TESTS[method](result), time.perf_counter() - start)
+        return result
+
+    def search(self, *args, **kwargs):
+        return self._timed("search", *args, **kwargs)
+
+    def match(self, *args, **kwargs):
+        return self._timed("match", *args, **kwargs)
+
+    def fullmatch(self, *args, **kwargs):
+        return self._timed("fullmatch", *args, **kwargs)
+
+    def findall(self, *args, **kwargs):
+        return self._timed("findall", *args, **kwargs)
+
+    def split(self, *args, **kwargs):
+        return self._timed("split", *args, **kwargs)
+
+    def subn(self, *args, **kwargs):
+        return self._timed("subn", *args, **kwargs)
+
+    def sub(self, *args, **kwargs):
+        return self.subn(*args, **kwargs)[0]
+
+    def finditer(self, *args, **kwargs):
+        return _timed_iterator(self._profiler, self._key, self._pattern.finditer(*args, **kwargs))
+
+
+def _timed_iterator(profiler, key, iterator):
+    """finditer is lazy, so its time is the time spent producing matches; a hit is any match."""
+    hit = False
+    seconds = 0.0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                match = next(iterator)
+            except StopIteration:
+                seconds += time.perf_counter() - start
+                return
+            seconds += time.perf_counter() - start
+            hit = True
+            yield match
+    finally:
+        profiler.record(key, hit, seconds)
+
+
+class ProfiledRe:
+    """
+    Replaces a module's `re` global. Module-level calls such as
+    re.search(pattern, name) are keyed by the calling line and the pattern
+    text, so every pattern in a `for pattern in cpu_patterns` loop gets its
+    own row.
+    """
+
+    def __init__(self, profiler, module_name):
+        self._profiler = profiler
+        self._module_name = module_name
+
+    def __getattr__(self, name):
+        return getattr(re, name)
+
+    def _key(self, pattern):
+        # Two frames up: the proxy method, then the reforger line that called it.
+        line = sys._getframe(2).f_lineno
+        text = pattern.pattern if isinstance(pattern, re.Pattern) else pattern
+        return "regex", f"{self._module_name}:{line}", text
+
+    def _timed(self, method, key, pattern, *args, **kwargs):
+        start = time.perf_counter()
+        result = getattr(re, method)(pattern, *args, **kwargs)
+        self._profiler.record(key, _HIT_TESTS[method](result), time.perf_counter() - start)
+        return result
+
+    def search(self, pattern, *args, **kwargs):
+        return self._timed("search", self._key(pattern), pattern, *args, **kwargs)
+
+    def match(self, pattern, *args, **kwargs):
+        return self._timed("match", self._key(pattern), pattern, *args, **kwargs)
+
+    def fullmatch(self, pattern, *args, **kwargs):
+        return self._timed("fullmatch", self._key(pattern), pattern, *args, **kwargs)
+
+    def findall(self, pattern, *args, **kwargs):
+        return self._timed("findall", self._key(pattern), pattern, *args, **kwargs)
+
+    def split(self, pattern, *args, **kwargs):
+        return self._timed("split", self._key(pattern), pattern, *args, **kwargs)
+
+    def subn(self, pattern, *args, **kwargs):
+        return self._timed("subn", self._key(pattern), pattern, *args, **kwargs)
+
+    def sub(self, pattern, *args, **kwargs):
+        key = self._key(pattern)
+        start = time.perf_counter()
+        result, replaced = re.subn(pattern, *args, **kwargs)
+        self._profiler.record(key, replaced > 0, time.perf_counter() - start)
+        return result
+
+    def finditer(self, pattern, *args, **kwargs):
+        return _timed_iterator(self._profiler, self._key(pattern), re.finditer(pattern, *args, **kwargs))
+
+    def compile(self, pattern, flags=0):
+        compiled = re.compile(pattern, flags)
+        return ProfiledPattern(compiled, self._profiler, f"{self._module_name}:{sys._getframe(1).f_lineno}")
+
+
+def _profiled_parser(function, profiler, module_name):
+    key = ("parser", f"{module_name}.{function.__name__}", "")
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        values = result.values() if isinstance(result, dict) else result if isinstance(result, tuple) else [result]
+        profiler.record(key, any(value is not None for value in values), time.perf_counter() - start)
+        profiler.record_fields(key, result)
+        return result
+    return wrapper
+
+
+def instrument(module, profiler):
+    """
+    Swaps the module's `re`, its module-level compiled patterns and its
+    parse_* functions for profiled stand-ins. Returns the originals so
+    restore() can put them back.
+    """
+    module_name = Path(getattr(module, "__file__", None) or module.__name__).stem
+    namespace = vars(module)
+    originals = {}
+
+    for name, value in list(namespace.items()):
+        if value is re:
+            originals[name] = value
+            namespace[name] = ProfiledRe(profiler, module_name)
+        elif isinstance(value, re.Pattern):
+            originals[name] = value
+            namespace[name] = ProfiledPattern(value, profiler, f"{module_name}.{name}")
+        elif name.startswith("parse_") and callable(value) and getattr(value, "__module__", None) == module.__name__:
+            originals[name] = value
+            namespace[name] = _profiled_parser(value, profiler, module_name)
+
+    return originals
+
+
+def restore(module, originals):
+    vars(module).update(originals)
+
+
+@contextmanager
+def profiled(modules, enabled=True, trace_memory=False, limit=30):
+    """
+    Runs the block with the given modules instrumented and prints the ranked
+    report (and a tracemalloc summary) at the end. Does nothing unless enabled.
+    """
+    if not enabled:
+        yield None
+        return
+
+    modules = modules if isinstance(modules, (list, tuple)) else [modules]
+    profiler = Profiler()
+    if trace_memory:
+        tracemalloc.start()
+    instrumented = [(module, instrument(module, profiler)) for module in modules]
+    try:
+        yield profiler
+    finally:
+        for module, originals in instrumented:
+            restore(module, originals)
+        profiler.report(limit)
+        if trace_memory:
+            print_memory_summary(limit=10)
+            tracemalloc.stop()
+
+
+def print_memory_summary(limit=10, out=None):
+    out = out or sys.stdout
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ])
+    current, peak = tracemalloc.get_traced_memory()
+    print(f"\ntracemalloc: {current / 1024 / 1024:.1f} MB live, {peak / 1024 / 1024:.1f} MB peak", file=out)
+    for stat in snapshot.statistics("lineno")[:limit]:
+        frame = stat.traceback[0]
+        print(f"  {Path(frame.filename).name}:{frame.lineno:<5} {stat.size / 1024:>9.1f} KB {stat.count:>8} blocks",
+              file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run reforgers with per-pattern and per-parser profiling.")
+    parser.add_argument("retailers", nargs="*", help=f"any of {', '.join(REFORGERS)} (default: all)")
+    parser.add_argument("--tracemalloc", action="store_true", help="also print the top allocation sites")
+    parser.add_argument("--limit", type=int, default=30, help="rows in the ranked report")
+    args = parser.parse_args()
+
+    modules = []
+    runs = []
+    for retailer in args.retailers or REFORGERS:
+        if retailer not in REFORGERS:
+            parser.error(f"unknown retailer {retailer!r}")
+        module_name, function_name = REFORGERS[retailer]
+        module = importlib.import_module(module_name)
+        modules.append(module)
+        runs.append(getattr(module, function_name))
+
+    with profiled(modules, trace_memory=args.tracemalloc, limit=args.limit):
+        for run in runs:
+            run()
+
+
+if __name__ == "__main__":
+    main()
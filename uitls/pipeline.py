@@ -0,0 +1,315 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from jsonld_graph import RETAILERS
+from parse_profiler import REFORGERS
+
+BASE_DIR = Path(__file__).parent.parent
+DATA_DIR = BASE_DIR / "data"
+REFORGED_DIR = BASE_DIR / "reforged_data"
+SCRAPERS_DIR = BASE_DIR / "scrapers"
+UTILS_DIR = Path(__file__).parent
+STATE_FILE = REFORGED_DIR / "pipeline_state.json"
+SITE_DIR = BASE_DIR / "site"
+
+# retailer -> (scraper function, CSV it writes) for every category.
+SCRAPES = {
+    "anhoch": [("scrape_laptops", "anhoch_laptops.csv"), ("scrape_phones", "anhoch_phones.csv"),
+               ("scrape_tvs", "anhoch_tvs.csv")],
+    "neptun": [("scrape_laptops", "neptun_laptops.csv"), ("scrape_phones", "neptun_phones.csv"),
+               ("scrape_tvs", "neptun_tvs.csv")],
+    "setec": [("scrape_laptops", "setec_laptops.csv"), ("scrape_smartphones", "setec_smartphones.csv"),
+              ("scrape_oled_tvs", "setec_oled_tvs.csv")],
+    "tehnomarket": [("scrape_laptops", "tehnomarket_laptops.csv"), ("scrape_phones", "tehnomarket_phones.csv"),
+                    ("scrape_tvs", "tehnomarket_tvs.csv")],
+}
+
+# Reforges share the derived catalogue files, so they run one at a time; a
+# site gets one browser at a time unless --site-concurrency says otherwise.
+POOL_LIMITS = {"reforge": 1}
+SITE_CONCURRENCY = 1
+
+
+class Task:
+    """
+    One node of the pipeline DAG: a command, the tasks it waits for, the
+    files whose content decides whether it is up to date, and the files it
+    produces. Tasks in the same pool never run at the same time beyond the
+    pool's limit. With max_age (seconds) the outputs also have to be younger
+    than that to count as up to date.
+    """
+
+    def __init__(self, name, command, inputs=(), outputs=(), deps=(), pool=None, always_run=False, max_age=None):
+        self.name = name
+        self.command = command
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.deps = list(deps)
+        self.pool = pool
+        self.always_run = always_run
+        self.max_age = max_age
+
+
+def content_hash(paths):
+    """blake2b over the names and bytes of the given files; a missing file hashes differently from an empty one."""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in sorted(Path(path) for path in paths):
+        # Path.is_relative_to needs Python 3.9.
+        label = str(path.relative_to(BASE_DIR)) if BASE_DIR in path.parents else str(path)
+        digest.update(label.encode("utf-8"))
+        try:
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        except FileNotFoundError:
+            digest.update(b"\0missing")
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def task_input_hash(task):
+    """Hash of the task's arguments and input files, so e.g. a new --base-url reruns the site build."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("\0".join(task.command[1:]).encode("utf-8"))
+    digest.update(content_hash(task.inputs).encode("ascii"))
+    return digest.hexdigest()
+
+
+def load_state(path=STATE_FILE):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state, path=STATE_FILE):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(temporary, path)
+
+
+def scrape_tasks(retailer, max_age=None):
+    """
+    One task per category. A scrape has no local inputs besides its scraper,
+    so it always runs unless max_age (seconds) is given and its CSV is
+    younger than that and was written by the same scraper code.
+    """
+    tasks = []
+    scraper = SCRAPERS_DIR / f"{retailer}.py"
+    for function, filename in SCRAPES[retailer]:
+        csv_file = DATA_DIR / filename
+        category = filename[len(retailer) + 1:-len(".csv")]
+        code = f"import {retailer}; {retailer}.{function}()"
+        tasks.append(Task(f"scrape:{retailer}:{category}", [sys.executable, "-c", code], inputs=[scraper],
+                          outputs=[csv_file], pool=f"site:{retailer}", always_run=max_age is None,
+                          max_age=max_age))
+    return tasks
+
+
+def reforge_task(retailer, deps):
+    module_name, _ = REFORGERS[retailer]
+    # The reforger and every module it may import decide the output as much as the CSVs do.
+    code_files = sorted(UTILS_DIR.glob("*.py"))
+    csv_files = [DATA_DIR / filename for _, filename in SCRAPES[retailer]]
+    return Task(f"reforge:{retailer}", [sys.executable, str(UTILS_DIR / f"{module_name}.py"), "--no-catalogue"],
+                inputs=csv_files + code_files,
+                outputs=[REFORGED_DIR / f"{retailer}_products_structured.jsonld"],
+                deps=deps, pool="reforge")
+
+
+def catalogue_task(deps):
+    """
+    Facets, similar products and the price index read every retailer's
+    JSON-LD, so they are rebuilt once after all reforges.
+    """
+    jsonld_files = [REFORGED_DIR / f"{retailer}_products_structured.jsonld" for retailer in RETAILERS]
+    return Task("catalogue", [sys.executable, str(UTILS_DIR / "reforge_outputs.py")],
+                inputs=jsonld_files + sorted(UTILS_DIR.glob("*.py")),
+                outputs=[REFORGED_DIR / name for name in ("facets.json", "similar_products.json",
+                                                          "price_index.json", "product_groups.json")],
+                deps=deps)
+
+
+def site_task(deps, base_url=None):
+    """The static site is built from every retailer's JSON-LD, so it waits for all reforges."""
+    jsonld_files = [REFORGED_DIR / f"{retailer}_products_structured.jsonld" for retailer in RETAILERS]
+    command = [sys.executable, str(UTILS_DIR / "static_site.py")]
+    if base_url:
+        command += ["--base-url", base_url]
+    return Task("site", command,
+                inputs=jsonld_files + [UTILS_DIR / "static_site.py"],
+                outputs=[SITE_DIR / "sitemap.xml", SITE_DIR / "build_manifest.json"], deps=deps)
+
+
+def build_pipeline(retailers=None, scrape=True, max_age=None, site=True, base_url=None):
+    tasks = []
+    for retailer in retailers or RETAILERS:
+        scrapes = scrape_tasks(retailer, max_age) if scrape else []
+        tasks.extend(scrapes)
+        tasks.append(reforge_task(retailer, [task.name for task in scrapes]))
+    reforges = [task.name for task in tasks if task.name.startswith("reforge:")]
+    tasks.append(catalogue_task(reforges))
+    if site:
+        tasks.append(site_task(reforges, base_url))
+    return tasks
+
+
+def is_up_to_date(task, state, input_hash):
+    """Same input hash as the last successful run, and every output still exactly as that run left it."""
+    if task.always_run:
+        return False
+    recorded = state.get(task.name)
+    if not recorded or recorded.get("inputs") != input_hash:
+        return False
+    if not all(Path(path).exists() for path in task.outputs):
+        return False
+    if content_hash(task.outputs) != recorded.get("outputs"):
+        return False
+    if task.max_age is not None:
+        return all(time.time() - Path(path).stat().st_mtime < task.max_age for path in task.outputs)
+    return True
+
+
+_print_lock = threading.Lock()
+
+
+def _run_command(task):
+    """Runs the task's command, echoing its output line by line with the task name in front."""
+    env = dict(os.environ, PYTHONUNBUFFERED="1",
+               PYTHONPATH=os.pathsep.join(filter(None, [str(SCRAPERS_DIR), str(UTILS_DIR),
+                                                        os.environ.get("PYTHONPATH")])))
+    process = subprocess.Popen(task.command, cwd=BASE_DIR, env=env, stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT, text=True, encoding="utf-8", errors="replace")
+    for line in process.stdout:
+        with _print_lock:
+            print(f"[{task.name}] {line.rstrip()}")
+    return process.wait()
+
+
+def run_pipeline(tasks, jobs=None, force=False, dry_run=False, site_concurrency=SITE_CONCURRENCY,
+                 state_file=STATE_FILE):
+    """
+    Runs the DAG: every task starts as soon as its dependencies have finished
+    and its pool has room, and is skipped when its inputs hash to the same
+    value as on its last successful run. A failed task blocks only the tasks
+    that depend on it. Returns {task name: (status, seconds)}.
+    """
+    by_name = {task.name: task for task in tasks}
+    state = load_state(state_file)
+    results = {}
+    pools = {}
+    pending = list(tasks)
+    running = {}
+    jobs = jobs or max(1, sum(POOL_LIMITS.get(pool, site_concurrency) for pool in {task.pool for task in tasks}))
+
+    def blocked(task):
+        return any(results.get(dep, ("",))[0] in ("failed", "blocked") for dep in task.deps)
+
+    def ready(task):
+        if any(dep not in results for dep in task.deps if dep in by_name):
+            return False
+        limit = POOL_LIMITS.get(task.pool, site_concurrency)
+        return task.pool is None or pools.get(task.pool, 0) < limit
+
+    def execute(task):
+        started = time.perf_counter()
+        input_hash = task_input_hash(task)
+        # A dry run cannot know what a dependency that would run is going to write.
+        upstream_runs = dry_run and any(results[dep][0] == "would run" for dep in task.deps if dep in results)
+        if not force and not upstream_runs and is_up_to_date(task, state, input_hash):
+            return "up to date", time.perf_counter() - started, None
+        if dry_run:
+            return "would run", time.perf_counter() - started, None
+        returncode = _run_command(task)
+        if returncode != 0:
+            return "failed", time.perf_counter() - started, None
+        return "done", time.perf_counter() - started, {"inputs": task_input_hash(task),
+                                                       "outputs": content_hash(task.outputs)}
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while pending or running:
+            for task in list(pending):
+                if blocked(task):
+                    pending.remove(task)
+                    results[task.name] = ("blocked", 0.0)
+                    print(f"[{task.name}] blocked by a failed dependency")
+                elif len(running) < jobs and ready(task):
+                    pending.remove(task)
+                    if task.pool:
+                        pools[task.pool] = pools.get(task.pool, 0) + 1
+                    running[executor.submit(execute, task)] = task
+            if not running:
+                if pending:
+                    raise ValueError(f"unsatisfiable dependencies: {', '.join(task.name for task in pending)}")
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                task = running.pop(future)
+                if task.pool:
+                    pools[task.pool] -= 1
+                try:
+                    status, seconds, stamp = future.result()
+                except Exception as e:
+                    status, seconds, stamp = "failed", 0.0, None
+                    print(f"[{task.name}] {e}")
+                results[task.name] = (status, seconds)
+                print(f"[{task.name}] {status} ({seconds:.1f} s)")
+                if stamp is not None:
+                    state[task.name] = stamp
+                    save_state(state, state_file)
+
+    return results
+
+
+def print_summary(results, elapsed):
+    print(f"\n{'task':<36} {'status':<12} {'seconds':>8}")
+    for name, (status, seconds) in results.items():
+        print(f"{name:<36} {status:<12} {seconds:>8.1f}")
+    scrapes = [seconds for name, (status, seconds) in results.items() if name.startswith("scrape:")]
+    slowest = f", slowest scrape {max(scrapes):.1f} s" if scrapes else ""
+    print(f"\nPipeline finished in {elapsed:.1f} s{slowest}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape and reforge every retailer as one dependency-aware pipeline.")
+    parser.add_argument("retailers", nargs="*", help=f"any of {', '.join(RETAILERS)} (default: all)")
+    parser.add_argument("--no-scrape", action="store_true", help="only reforge the CSVs already in data/")
+    parser.add_argument("--no-site", action="store_true", help="do not rebuild the static site")
+    parser.add_argument("--base-url", default=os.environ.get("SITE_BASE_URL"),
+                        help="public URL of the static site (default: $SITE_BASE_URL)")
+    parser.add_argument("--max-age", type=float, help="skip scrapes whose CSV is younger than this many hours")
+    parser.add_argument("--jobs", type=int, help="tasks running at once (default: one per site plus reforge)")
+    parser.add_argument("--site-concurrency", type=int, default=SITE_CONCURRENCY,
+                        help="categories of one site scraped at the same time")
+    parser.add_argument("--force", action="store_true", help="run every task even if it is up to date")
+    parser.add_argument("--dry-run", action="store_true", help="show what would run without running it")
+    args = parser.parse_args()
+
+    for retailer in args.retailers:
+        if retailer not in RETAILERS:
+            parser.error(f"unknown retailer {retailer!r}")
+
+    max_age = args.max_age * 3600 if args.max_age is not None else None
+    tasks = build_pipeline(args.retailers or None, scrape=not args.no_scrape, max_age=max_age,
+                           site=not args.no_site, base_url=args.base_url)
+    start = time.perf_counter()
+    results = run_pipeline(tasks, jobs=args.jobs, force=args.force, dry_run=args.dry_run,
+                           site_concurrency=args.site_concurrency)
+    print_summary(results, time.perf_counter() - start)
+    sys.exit(1 if any(status in ("failed", "blocked") for status, _ in results.values()) else 0)
+
+
+if __name__ == "__main__":
+    main()
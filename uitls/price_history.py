@@ -0,0 +1,206 @@
+import argparse
+import sqlite3
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from catalogue import REFORGED_DIR, RETAILERS, iter_catalogue, keyed_products
+
+HISTORY_PATH = REFORGED_DIR / "price_history.sqlite"
+
+# Prices are stored as integer hundredths of a denar; SQLite stores small
+# integers in 1-4 bytes, so a change row costs only a few bytes on disk.
+PRICE_SCALE = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    observed_at TEXT NOT NULL,
+    retailer TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS series (
+    series_id INTEGER PRIMARY KEY,
+    product_key TEXT NOT NULL UNIQUE,
+    retailer TEXT NOT NULL,
+    category TEXT,
+    name TEXT
+);
+
+-- Run-length encoded observations: a row is written only when a listing's
+-- price or availability changes and stays in effect until the next row.
+CREATE TABLE IF NOT EXISTS changes (
+    series_id INTEGER NOT NULL,
+    run_id INTEGER NOT NULL,
+    price INTEGER,
+    available INTEGER NOT NULL,
+    PRIMARY KEY (series_id, run_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_series_name ON series(name);
+CREATE INDEX IF NOT EXISTS idx_runs_observed ON runs(observed_at);
+"""
+
+
+def connect(db_path=None):
+    conn = sqlite3.connect(str(db_path or HISTORY_PATH))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _encode_price(price):
+    return None if price is None else round(price * PRICE_SCALE)
+
+
+def _decode_price(price):
+    return None if price is None else price / PRICE_SCALE
+
+
+def _latest_states(conn, retailer):
+    rows = conn.execute("""
+        SELECT s.series_id, s.product_key, c.price, c.available
+        FROM series s
+        JOIN changes c ON c.series_id = s.series_id
+        WHERE s.retailer = ?
+          AND c.run_id = (SELECT MAX(run_id) FROM changes WHERE series_id = s.series_id)
+    """, (retailer,))
+    return {product_key: (series_id, price, available) for series_id, product_key, price, available in rows}
+
+
+def record_run(conn, retailer, products, observed_at=None):
+    """
+    Records one observation run for a retailer. Returns the number of change
+    rows written; listings missing from this run are marked unavailable.
+    """
+    observed_at = observed_at or datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    with conn:
+        run_id = conn.execute("INSERT INTO runs (observed_at, retailer) VALUES (?, ?)",
+                              (observed_at, retailer)).lastrowid
+        states = _latest_states(conn, retailer)
+        seen = set()
+        new_series = []
+        changes = []
+
+        for key, product in keyed_products(retailer, products):
+            if key in seen:
+                continue
+            seen.add(key)
+            price = _encode_price((product.get("offers") or {}).get("price"))
+
+            if key not in states:
+                new_series.append((key, retailer, product.get("category"), product.get("name"), price))
+                continue
+
+            series_id, last_price, last_available = states[key]
+            if last_price != price or not last_available:
+                changes.append((series_id, run_id, price, 1))
+
+        for key, (series_id, last_price, last_available) in states.items():
+            if key not in seen and last_available:
+                changes.append((series_id, run_id, last_price, 0))
+
+        for key, retailer_name, category, name, price in new_series:
+            series_id = conn.execute(
+                "INSERT INTO series (product_key, retailer, category, name) VALUES (?, ?, ?, ?)",
+                (key, retailer_name, category, name)).lastrowid
+            changes.append((series_id, run_id, price, 1))
+
+        conn.executemany("INSERT INTO changes (series_id, run_id, price, available) VALUES (?, ?, ?, ?)", changes)
+
+    return len(changes)
+
+
+def find_series(conn, query):
+    rows = conn.execute("SELECT series_id, product_key, retailer, name FROM series WHERE product_key = ? OR name = ?",
+                        (query, query)).fetchall()
+    if not rows:
+        rows = conn.execute("SELECT series_id, product_key, retailer, name FROM series WHERE name LIKE ? LIMIT 20",
+                            (f"%{query}%",)).fetchall()
+    return rows
+
+
+def price_series(conn, series_id):
+    rows = conn.execute("""
+        SELECT r.observed_at, c.price, c.available
+        FROM changes c JOIN runs r ON r.run_id = c.run_id
+        WHERE c.series_id = ?
+        ORDER BY c.run_id
+    """, (series_id,))
+    return [(observed_at, _decode_price(price), bool(available)) for observed_at, price, available in rows]
+
+
+def lowest_price(conn, series_id, since=None, until=None):
+    """
+    Lowest available price in [since, until]. The run in effect at `since`
+    is included, because an unchanged price is never written again.
+    """
+    since = since or ""
+    until = until or "9999"
+    rows = conn.execute("""
+        SELECT c.price FROM changes c JOIN runs r ON r.run_id = c.run_id
+        WHERE c.series_id = ? AND c.available = 1 AND r.observed_at BETWEEN ? AND ?
+        UNION ALL
+        SELECT price FROM (
+            SELECT c.price, c.available FROM changes c JOIN runs r ON r.run_id = c.run_id
+            WHERE c.series_id = ? AND r.observed_at < ?
+            ORDER BY c.run_id DESC LIMIT 1
+        ) WHERE available = 1
+    """, (series_id, since, until, series_id, since)).fetchall()
+    prices = [price for (price,) in rows if price is not None]
+    return _decode_price(min(prices)) if prices else None
+
+
+def record_reforged_data(conn, retailers=None):
+    products_by_retailer = defaultdict(list)
+    for retailer, product in iter_catalogue(retailers):
+        products_by_retailer[retailer].append(product)
+
+    for retailer in retailers or RETAILERS:
+        if retailer in products_by_retailer:
+            written = record_run(conn, retailer, products_by_retailer[retailer])
+            print(f"{retailer}: {len(products_by_retailer[retailer])} observations, {written} changes written")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append-only price history of the reforged catalogue.")
+    parser.add_argument("--db", default=str(HISTORY_PATH))
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="record the current reforged_data/*.jsonld as a run")
+    record_parser.add_argument("retailers", nargs="*")
+
+    series_parser = subparsers.add_parser("series", help="price series of a product (key or name)")
+    series_parser.add_argument("query")
+
+    lowest_parser = subparsers.add_parser("lowest", help="lowest price in a time window")
+    lowest_parser.add_argument("query")
+    lowest_parser.add_argument("--since", help="ISO date, e.g. 2025-01-01")
+    lowest_parser.add_argument("--until", help="ISO date, e.g. 2025-12-31")
+
+    args = parser.parse_args()
+    conn = connect(args.db)
+
+    if args.command == "record":
+        record_reforged_data(conn, args.retailers or None)
+    else:
+        start = time.perf_counter()
+        matches = find_series(conn, args.query)
+        for series_id, key, retailer, name in matches:
+            print(f"{retailer:<12} {key} {name}")
+            if args.command == "series":
+                for observed_at, price, available in price_series(conn, series_id):
+                    status = "" if available else " (unavailable)"
+                    print(f"    {observed_at}  {price or 0:>10,.0f}{status}")
+            else:
+                until = f"{args.until}T99" if args.until and "T" not in args.until else args.until
+                price = lowest_price(conn, series_id, args.since, until)
+                print(f"    lowest: {'-' if price is None else f'{price:,.0f}'}")
+        print(f"\n{len(matches)} series in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import json
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from catalogue import REFORGED_DIR, iter_catalogue, regular_price
+from product_matcher import GROUPS_PATH, match_products, normalize_name
+
+PRICE_INDEX_PATH = REFORGED_DIR / "price_index.json"
+
+
+def _offer_entry(retailer, product):
+    offers = product.get("offers") or {}
+    price = offers.get("price")
+    regular = regular_price(product)
+    return {
+        "id": product["@id"],
+        "retailer": retailer,
+        "name": product.get("name"),
+        "price": price,
+        "priceCurrency": offers.get("priceCurrency"),
+        "regularPrice": regular,
+        "discountPrice": price if regular is not None else None,
+    }
+
+
+def _price_sort_key(offer):
+    return (offer["price"] is None, offer["price"] or 0, offer["retailer"], offer["id"])
+
+
+def build_price_index(catalogue=None, reforged_dir=None):
+    """
+    Groups every offer by its cross-retailer product group and sorts each
+    group's offers by price, cheapest first. Offers without a price go last.
+    """
+    catalogue = list(catalogue if catalogue is not None else iter_catalogue(reforged_dir=reforged_dir))
+    groups = match_products(catalogue)
+
+    entries = defaultdict(list)
+    keys = {}
+    for retailer, product in catalogue:
+        gid = groups["products"][product["@id"]]
+        entries[gid].append(_offer_entry(retailer, product))
+        keys.setdefault(normalize_name(product.get("name") or ""), gid)
+
+    index_groups = {}
+    for gid, offers in entries.items():
+        offers.sort(key=_price_sort_key)
+        deduplicated = []
+        seen = set()
+        for offer in offers:
+            identity = (offer["retailer"], offer["name"], offer["price"])
+            if identity not in seen:
+                seen.add(identity)
+                deduplicated.append(offer)
+        index_groups[gid] = {
+            "key": min(normalize_name(offer["name"] or "") for offer in deduplicated),
+            "offers": deduplicated,
+        }
+
+    return {
+        "groups": index_groups,
+        "keys": keys,
+        "products": groups["products"],
+    }, groups
+
+
+def write_price_index(index, groups=None, output_dir=None):
+    output_dir = Path(output_dir) if output_dir else REFORGED_DIR
+    index_file = output_dir / PRICE_INDEX_PATH.name
+    with open(index_file, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    if groups is not None:
+        with open(output_dir / GROUPS_PATH.name, "w", encoding="utf-8") as f:
+            json.dump(groups, f, indent=2, ensure_ascii=False)
+    return index_file
+
+
+def rebuild_price_index(output_dir=None):
+    """
+    Matching runs over the whole catalogue, so the index is rebuilt once
+    after all reforges (reforge_outputs.rebuild_catalogue_outputs), not per retailer.
+    """
+    index, groups = build_price_index(reforged_dir=output_dir)
+    return write_price_index(index, groups, output_dir)
+
+
+class PriceIndex:
+    def __init__(self, path=None):
+        with open(path or PRICE_INDEX_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.groups = data["groups"]
+        self.keys = data["keys"]
+        self.products = data["products"]
+
+    def resolve(self, query):
+        """Accepts a product-group ID, a product @id or any product name."""
+        if query in self.groups:
+            return query
+        if query in self.products:
+            return self.products[query]
+        return self.keys.get(normalize_name(query))
+
+    def offers(self, query):
+        gid = self.resolve(query)
+        if gid is None:
+            return []
+        return self.groups[gid]["offers"]
+
+    def cheapest(self, query):
+        offers = self.offers(query)
+        return offers[0] if offers else None
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] == "build":
+        start = time.perf_counter()
+        output_file = rebuild_price_index()
+        print(f"Price index rebuilt in {time.perf_counter() - start:.2f} s. Saved to {output_file}")
+        return
+
+    index = PriceIndex()
+    query = " ".join(sys.argv[1:])
+    start = time.perf_counter()
+    offers = index.offers(query)
+    elapsed = (time.perf_counter() - start) * 1_000_000
+
+    if not offers:
+        print(f"No offers found for {query!r} ({elapsed:.0f} µs)")
+        return
+
+    for offer in offers:
+        line = f"{offer['price'] or 0:>10,.0f} {offer['priceCurrency'] or '':<4} {offer['retailer']:<12} {offer['name']}"
+        if offer["regularPrice"]:
+            line += f" (regular {offer['regularPrice']:,.0f})"
+        print(line)
+    print(f"\n{len(offers)} offers in {elapsed:.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
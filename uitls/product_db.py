@@ -0,0 +1,247 @@
+import argparse
+import sqlite3
+import time
+
+from catalogue import REFORGED_DIR, iter_catalogue
+from spec_normalizer import normalize_product
+
+DB_PATH = REFORGED_DIR / "products.sqlite"
+
+BATCH_SIZE = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id TEXT PRIMARY KEY,
+    retailer TEXT NOT NULL,
+    category TEXT NOT NULL,
+    name TEXT NOT NULL,
+    brand TEXT COLLATE NOCASE,
+    model TEXT COLLATE NOCASE,
+    color TEXT,
+    description TEXT,
+    ram_gb INTEGER,
+    storage_gb INTEGER,
+    storage_type TEXT,
+    screen_in REAL,
+    resolution_class TEXT,
+    cpu_family TEXT
+);
+
+CREATE TABLE IF NOT EXISTS offers (
+    product_id TEXT NOT NULL REFERENCES products(id),
+    price REAL,
+    currency TEXT,
+    availability TEXT
+);
+
+CREATE TABLE IF NOT EXISTS specs (
+    product_id TEXT NOT NULL REFERENCES products(id),
+    name TEXT NOT NULL,
+    value TEXT
+);
+"""
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_products_brand ON products(brand, category);
+CREATE INDEX IF NOT EXISTS idx_products_model ON products(model);
+CREATE INDEX IF NOT EXISTS idx_products_category ON products(category, retailer);
+CREATE INDEX IF NOT EXISTS idx_offers_price ON offers(price, product_id);
+CREATE INDEX IF NOT EXISTS idx_offers_product ON offers(product_id);
+CREATE INDEX IF NOT EXISTS idx_specs_product ON specs(product_id);
+CREATE INDEX IF NOT EXISTS idx_specs_name_value ON specs(name, value);
+"""
+
+DROP_INDEXES = """
+DROP INDEX IF EXISTS idx_products_brand;
+DROP INDEX IF EXISTS idx_products_model;
+DROP INDEX IF EXISTS idx_products_category;
+DROP INDEX IF EXISTS idx_offers_price;
+DROP INDEX IF EXISTS idx_offers_product;
+DROP INDEX IF EXISTS idx_specs_product;
+DROP INDEX IF EXISTS idx_specs_name_value;
+"""
+
+
+def connect(db_path=None):
+    conn = sqlite3.connect(str(db_path or DB_PATH))
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _product_rows(retailer, product):
+    offers = product.get("offers") or {}
+    normalized = normalize_product(product)
+    product_id = product["@id"]
+
+    product_row = (
+        product_id,
+        retailer,
+        product.get("category"),
+        product.get("name"),
+        (product.get("brand") or {}).get("name"),
+        product.get("model"),
+        product.get("color"),
+        product.get("description"),
+        normalized["ram_gb"],
+        normalized["storage_gb"],
+        normalized["storage_type"],
+        normalized["screen_in"],
+        normalized["resolution_class"],
+        normalized["cpu_family"],
+    )
+    offer_row = (product_id, offers.get("price"), offers.get("priceCurrency"), offers.get("availability"))
+    spec_rows = [(product_id, prop.get("name"), None if prop.get("value") is None else str(prop.get("value")))
+                 for prop in product.get("additionalProperty", [])]
+    return product_row, offer_row, spec_rows
+
+
+def load_catalogue(conn, retailers=None):
+    """
+    Full refresh: replaces every product, offer and spec in a single
+    transaction, inserting in batches with the indexes dropped and rebuilt
+    once at the end.
+    """
+    products, offers, specs = [], [], []
+    loaded = 0
+
+    def flush():
+        conn.executemany("INSERT INTO products VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", products)
+        conn.executemany("INSERT INTO offers VALUES (?, ?, ?, ?)", offers)
+        conn.executemany("INSERT INTO specs VALUES (?, ?, ?)", specs)
+        products.clear()
+        offers.clear()
+        specs.clear()
+
+    conn.execute("PRAGMA synchronous=OFF")
+    try:
+        with conn:
+            conn.executescript("BEGIN;" + DROP_INDEXES)
+            if retailers:
+                placeholders = ", ".join("?" for _ in retailers)
+                for table in ("offers", "specs"):
+                    conn.execute(f"DELETE FROM {table} WHERE product_id IN "
+                                 f"(SELECT id FROM products WHERE retailer IN ({placeholders}))", retailers)
+                conn.execute(f"DELETE FROM products WHERE retailer IN ({placeholders})", retailers)
+            else:
+                conn.execute("DELETE FROM specs")
+                conn.execute("DELETE FROM offers")
+                conn.execute("DELETE FROM products")
+
+            for retailer, product in iter_catalogue(retailers):
+                product_row, offer_row, spec_rows = _product_rows(retailer, product)
+                products.append(product_row)
+                offers.append(offer_row)
+                specs.extend(spec_rows)
+                loaded += 1
+                if len(products) >= BATCH_SIZE:
+                    flush()
+            flush()
+
+            for statement in INDEXES.strip().splitlines():
+                conn.execute(statement)
+    finally:
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+    conn.execute("ANALYZE")
+    return loaded
+
+
+def find_products(conn, brand=None, model=None, category=None, retailer=None,
+                  min_price=None, max_price=None, limit=50):
+    clauses = []
+    params = []
+
+    if brand:
+        clauses.append("p.brand = ?")
+        params.append(brand)
+    if model:
+        clauses.append("p.model LIKE ?")
+        params.append(model.replace("%", "").replace("_", "") + "%")
+    if category:
+        clauses.append("p.category = ?")
+        params.append(category)
+    if retailer:
+        clauses.append("p.retailer = ?")
+        params.append(retailer)
+    if min_price is not None:
+        clauses.append("o.price >= ?")
+        params.append(min_price)
+    if max_price is not None:
+        clauses.append("o.price <= ?")
+        params.append(max_price)
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    query = f"""
+        SELECT p.id, p.retailer, p.category, p.name, p.brand, p.model, o.price, o.currency
+        FROM products p JOIN offers o ON o.product_id = p.id
+        {where}
+        ORDER BY o.price IS NULL, o.price
+        LIMIT ?
+    """
+    params.append(limit)
+    return [dict(row) for row in conn.execute(query, params)]
+
+
+def get_product(conn, product_id):
+    row = conn.execute("SELECT * FROM products WHERE id = ?", (product_id,)).fetchone()
+    if row is None:
+        return None
+
+    product = dict(row)
+    product["offers"] = [dict(offer) for offer in
+                         conn.execute("SELECT price, currency, availability FROM offers WHERE product_id = ?",
+                                      (product_id,))]
+    product["specs"] = {spec["name"]: spec["value"] for spec in
+                        conn.execute("SELECT name, value FROM specs WHERE product_id = ?", (product_id,))}
+    return product
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local SQLite database of the reforged catalogue.")
+    parser.add_argument("--db", default=str(DB_PATH))
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    load_parser = subparsers.add_parser("load", help="bulk load reforged_data/*.jsonld")
+    load_parser.add_argument("retailers", nargs="*")
+
+    query_parser = subparsers.add_parser("query", help="look up products")
+    query_parser.add_argument("--brand")
+    query_parser.add_argument("--model")
+    query_parser.add_argument("--category", choices=["Laptops", "Smartphones", "Televisions"])
+    query_parser.add_argument("--retailer")
+    query_parser.add_argument("--min-price", type=float)
+    query_parser.add_argument("--max-price", type=float)
+    query_parser.add_argument("--limit", type=int, default=20)
+
+    get_parser = subparsers.add_parser("get", help="show one product by @id")
+    get_parser.add_argument("product_id")
+
+    args = parser.parse_args()
+    conn = connect(args.db)
+
+    start = time.perf_counter()
+    if args.command == "load":
+        loaded = load_catalogue(conn, args.retailers or None)
+        print(f"Loaded {loaded} products into {args.db} in {time.perf_counter() - start:.2f} s")
+    elif args.command == "query":
+        results = find_products(conn, args.brand, args.model, args.category, args.retailer,
+                                args.min_price, args.max_price, args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+        for row in results:
+            print(f"{row['price'] or 0:>10,.0f} {row['currency'] or '':<4} {row['retailer']:<12} {row['name']}")
+        print(f"\n{len(results)} results in {elapsed:.2f} ms")
+    elif args.command == "get":
+        product = get_product(conn, args.product_id)
+        if product is None:
+            print(f"No product with @id {args.product_id}")
+        else:
+            for key, value in product.items():
+                print(f"{key}: {value}")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+import re
+import json
+import sys
+import time
+import hashlib
+import random
+from collections import defaultdict
+from itertools import combinations
+
+from catalogue import REFORGED_DIR, iter_catalogue
+
+GROUPS_PATH = REFORGED_DIR / "product_groups.json"
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+MIN_SIMILARITY = 0.35
+MAX_BLOCK_SIZE = 200
+
+# (a * h + b) % p with 32-bit shingle hashes and a, b < 2^31 stays below 2^64,
+# so every permutation of a whole shingle set is one uint64 NumPy operation.
+MERSENNE_PRIME = (1 << 31) - 1
+_rng = random.Random(1337)
+PERMUTATIONS = [(_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+
+# Category words and retailer decoration that never identify a product.
+STOP_WORDS = {
+    "лаптоп", "мобилен", "телефон", "телевизор", "notebook", "laptop", "tv", "smart", "led", "mobile", "phone",
+    "dual", "sim", "ds", "with", "and", "win11", "win11pro", "w11p", "dos", "nos", "no", "os", "ubuntu", "linux",
+}
+BRAND_ALIASES = {"hewlett": "hp", "hewlett-packard": "hp"}
+# Words that turn one model into a different one ("iPhone 16" vs "iPhone 16 Pro Max").
+VARIANT_WORDS = {"pro", "max", "plus", "ultra", "lite", "mini", "fe", "neo", "air", "edge", "e"}
+LINE_WORDS_SCANNED = 3
+
+CAPACITY_PATTERN = re.compile(r'\b(\d+)\s*(gb|tb)\b')
+RAM_STORAGE_PATTERN = re.compile(r'\b(\d{1,2})\s*(?:gb)?\s*[/+]\s*(\d{2,4})\s*(gb|tb)\b')
+CPU_PATTERN = re.compile(r'\b(?:i[3579]|r[3579]|ryzen\s*[3579]|ultra\s*[579]|core\s*[357])[-\s]*(n?\d{3,5}[a-z]{0,2}\d?)\b')
+INCH_PATTERN = re.compile(r'\d+(?:[.,]\d+)?\s*(?:"|”|``|`|inch)')
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+(?:-[a-z0-9]+)*|[а-я]+')
+
+
+def normalize_name(name):
+    text = re.sub(r'(\d)к', r'\1k', name.lower()).replace("”", '"')
+    text = INCH_PATTERN.sub(" ", text)
+    text = re.sub(r'(?<=[a-z0-9])\+(?=[\s,]|$)', ' plus', text)
+    text = RAM_STORAGE_PATTERN.sub(lambda m: f" {m.group(1)}gb {m.group(2)}{m.group(3)} ", text)
+    text = re.sub(r'[/,()\[\]|+]', ' ', text)
+    return " ".join(token for token in TOKEN_PATTERN.findall(text) if token not in STOP_WORDS)
+
+
+def normalize_brand(product, normalized_name):
+    brand = ((product.get("brand") or {}).get("name") or "").lower().strip()
+    if not brand:
+        tokens = normalized_name.split()
+        brand = tokens[0] if tokens else ""
+    return BRAND_ALIASES.get(brand, brand)
+
+
+def product_features(product):
+    name = product.get("name") or ""
+    normalized = normalize_name(name)
+    brand = normalize_brand(product, normalized)
+
+    capacities = frozenset(f"{amount}{unit}" for amount, unit in CAPACITY_PATTERN.findall(normalized))
+    cpus = frozenset(CPU_PATTERN.findall(normalized))
+    tokens = [token for token in normalized.split() if token != brand]
+    model_tokens = frozenset(
+        token for token in tokens
+        if any(char.isdigit() for char in token)
+        and not CAPACITY_PATTERN.fullmatch(token)
+        and token not in cpus
+        and not re.fullmatch(r'\d+hz|\d+nits|[458]k|\dg|\d+\.\d+|\d+cm|20[12]\d', token)
+    )
+    words = [token for token in tokens if token.isalpha()]
+    line_words = frozenset(word for word in words[:LINE_WORDS_SCANNED] if word not in VARIANT_WORDS)
+
+    return {
+        "brand": brand,
+        "normalized": normalized,
+        "capacities": capacities,
+        "cpus": cpus,
+        "model_tokens": model_tokens,
+        "line_words": line_words,
+        "variants": frozenset(word for word in words if word in VARIANT_WORDS),
+    }
+
+
+def shingles(text):
+    text = f" {text} "
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def _stable_hash(value):
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+def _permutation_arrays():
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    a, b = zip(*PERMUTATIONS)
+    return np, np.array(a, dtype=np.uint64), np.array(b, dtype=np.uint64)
+
+
+_PERMUTATION_ARRAYS = _permutation_arrays()
+
+
+def minhash(shingle_set):
+    hashes = [_stable_hash(shingle) for shingle in shingle_set]
+    if _PERMUTATION_ARRAYS is None:
+        return tuple(min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in PERMUTATIONS)
+    np, a, b = _PERMUTATION_ARRAYS
+    values = (np.array(hashes, dtype=np.uint64)[:, None] * a + b) % MERSENNE_PRIME
+    return tuple(values.min(axis=0).tolist())
+
+
+def estimated_similarity(signature_a, signature_b):
+    return sum(1 for a, b in zip(signature_a, signature_b) if a == b) / NUM_PERM
+
+
+def is_match(a, b):
+    if a["brand"] != b["brand"]:
+        return False
+    if a["capacities"] and b["capacities"] and a["capacities"] != b["capacities"]:
+        return False
+    if a["cpus"] and b["cpus"] and a["cpus"] != b["cpus"]:
+        return False
+    if a["variants"] != b["variants"]:
+        return False
+    if a["line_words"] and b["line_words"] and not a["line_words"] & b["line_words"]:
+        return False
+    if a["model_tokens"] and b["model_tokens"]:
+        smaller, larger = sorted((a["model_tokens"], b["model_tokens"]), key=len)
+        if not smaller <= larger:
+            return False
+    return True
+
+
+def is_weak(features):
+    """Listings without capacities (e.g. Setec laptops) fit several configurations of the same model."""
+    return not features["capacities"]
+
+
+class UnionFind:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, item):
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+def candidate_pairs(entries):
+    """
+    Blocks on (brand, model token) and on (brand, LSH band) so that only
+    products sharing a brand and either a model token or a MinHash band are
+    ever compared.
+    """
+    blocks = defaultdict(list)
+    for index, entry in enumerate(entries):
+        features = entry["features"]
+        brand = features["brand"]
+        for token in features["model_tokens"]:
+            blocks[("model", brand, token)].append(index)
+        signature = entry["signature"]
+        for band in range(BANDS):
+            blocks[("lsh", brand, band, signature[band * ROWS:(band + 1) * ROWS])].append(index)
+
+    pairs = set()
+    for members in blocks.values():
+        if len(members) < 2 or len(members) > MAX_BLOCK_SIZE:
+            continue
+        for a, b in combinations(members, 2):
+            if entries[a]["retailer"] != entries[b]["retailer"]:
+                pairs.add((a, b) if a < b else (b, a))
+    return pairs
+
+
+def group_id(key):
+    return "pg-" + hashlib.blake2b(key.encode("utf-8"), digest_size=6).hexdigest()
+
+
+def match_products(catalogue=None):
+    entries = []
+    for retailer, product in catalogue if catalogue is not None else iter_catalogue():
+        features = product_features(product)
+        entries.append({
+            "id": product["@id"],
+            "retailer": retailer,
+            "features": features,
+            "signature": minhash(shingles(features["normalized"])),
+        })
+
+    pairs = candidate_pairs(entries)
+    union_find = UnionFind(len(entries))
+    weak_union = UnionFind(len(entries))
+    weak_links = defaultdict(set)
+    matched = 0
+    for a, b in pairs:
+        entry_a, entry_b = entries[a], entries[b]
+        if not is_match(entry_a["features"], entry_b["features"]):
+            continue
+        if estimated_similarity(entry_a["signature"], entry_b["signature"]) < MIN_SIMILARITY:
+            continue
+        weak_a, weak_b = is_weak(entry_a["features"]), is_weak(entry_b["features"])
+        if not weak_a and not weak_b:
+            union_find.union(a, b)
+        elif weak_a and weak_b:
+            weak_union.union(a, b)
+        else:
+            weak, strong = (a, b) if weak_a else (b, a)
+            weak_links[weak].add(strong)
+        matched += 1
+
+    # Weak listings matched to each other are resolved as one component: it
+    # only joins a group when every configuration any of its members matches
+    # already belongs to that one group, so it can never bridge two groups.
+    components = defaultdict(list)
+    for index, entry in enumerate(entries):
+        if is_weak(entry["features"]):
+            components[weak_union.find(index)].append(index)
+    for component in components.values():
+        roots = {union_find.find(strong) for weak in component for strong in weak_links[weak]}
+        for weak in component[1:]:
+            union_find.union(component[0], weak)
+        if len(roots) == 1:
+            union_find.union(component[0], roots.pop())
+
+    members = defaultdict(list)
+    for index in range(len(entries)):
+        members[union_find.find(index)].append(index)
+
+    groups = []
+    product_groups = {}
+    for root, indexes in members.items():
+        key = min(entries[index]["features"]["normalized"] for index in indexes)
+        gid = group_id(f"{entries[root]['features']['brand']}|{key}")
+        ids = [entries[index]["id"] for index in indexes]
+        for product_id in ids:
+            product_groups[product_id] = gid
+        if len({entries[index]["retailer"] for index in indexes}) > 1:
+            groups.append({"id": gid, "key": key, "members": ids})
+
+    return {
+        "groups": groups,
+        "products": product_groups,
+        "stats": {"products": len(entries), "candidate_pairs": len(pairs), "matched_pairs": matched},
+    }
+
+
+def main():
+    start = time.perf_counter()
+    result = match_products()
+    elapsed = time.perf_counter() - start
+
+    output_file = GROUPS_PATH
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+
+    stats = result["stats"]
+    all_pairs = stats["products"] * (stats["products"] - 1) // 2
+    print(f"Compared {stats['candidate_pairs']:,} candidate pairs instead of {all_pairs:,}")
+    print(f"Found {len(result['groups'])} cross-retailer product groups in {elapsed:.2f} s")
+    print(f"Output saved to {output_file}")
+
+    if "--show" in sys.argv:
+        for group in result["groups"]:
+            print(f"\n{group['id']} {group['key']}")
+            for product_id in group["members"]:
+                print(f"  {product_id}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+import json
+import os
+import sys
+import tracemalloc
+from pathlib import Path
+
+from catalogue import reforged_file
+from jsonld_graph import RETAILERS, SCHEMA_CONTEXT, iter_json_array
+from jsonld_index import write_index
+
+IN_STOCK = "https://schema.org/InStock"
+LIST_PRICE = "https://schema.org/ListPrice"
+
+# Key order of a reforged Product; keys without a value are left out. Neptun
+# writes its description right after the offer, so it passes its own order.
+PRODUCT_KEYS = ("@context", "@type", "@id", "category", "name", "offers", "brand", "model", "color",
+                "additionalProperty", "description")
+OFFER_KEYS = ("@type", "price", "priceCurrency", "availability", "priceSpecification")
+
+# Shared so each product does not build its own encoder.
+_ENCODER = json.JSONEncoder(indent=2, ensure_ascii=False)
+
+_layouts = {}
+
+
+def _layout(keys):
+    """One shared tuple per distinct key order, so a product pays a pointer for it."""
+    keys = tuple(keys)
+    return _layouts.setdefault(keys, keys)
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class Offer:
+    """A schema.org Offer, with Neptun's pre-discount price as list_price."""
+
+    __slots__ = ("price", "currency", "availability", "list_price", "layout", "extra")
+
+    def __init__(self, price, currency="MKD", availability=IN_STOCK, list_price=None):
+        self.price = price
+        self.currency = _intern(currency)
+        self.availability = _intern(availability)
+        self.list_price = list_price
+        self.layout = _layout(key for key in OFFER_KEYS if key != "priceSpecification" or list_price is not None)
+        self.extra = None
+
+    @classmethod
+    def from_jsonld(cls, offer):
+        self = cls.__new__(cls)
+        self.price = self.currency = self.availability = self.list_price = None
+        extra = {}
+        for key, value in offer.items():
+            if key == "@type" and value == "Offer":
+                continue
+            if key == "price":
+                self.price = value
+            elif key == "priceCurrency":
+                self.currency = _intern(value)
+            elif key == "availability":
+                self.availability = _intern(value)
+            elif key == "priceSpecification" and _is_list_price(value):
+                self.list_price = value["price"]
+            else:
+                extra[key] = value
+        # The specification repeats the offer currency; anything else is kept verbatim.
+        specification = offer.get("priceSpecification")
+        if ("priceSpecification" not in extra and specification is not None
+                and specification["priceCurrency"] != self.currency):
+            extra["priceSpecification"] = specification
+            self.list_price = None
+        self.layout = _layout(offer)
+        self.extra = extra or None
+        return self
+
+    def to_jsonld(self):
+        extra = self.extra
+        offer = {}
+        for key in self.layout:
+            if extra and key in extra:
+                offer[key] = extra[key]
+            elif key == "@type":
+                offer[key] = "Offer"
+            elif key == "price":
+                offer[key] = self.price
+            elif key == "priceCurrency":
+                offer[key] = self.currency
+            elif key == "availability":
+                offer[key] = self.availability
+            elif key == "priceSpecification":
+                offer[key] = {"@type": "UnitPriceSpecification", "priceType": LIST_PRICE,
+                              "price": self.list_price, "priceCurrency": self.currency}
+        return offer
+
+
+def _is_list_price(value):
+    return (isinstance(value, dict)
+            and list(value) == ["@type", "priceType", "price", "priceCurrency"]
+            and value["@type"] == "UnitPriceSpecification" and value["priceType"] == LIST_PRICE)
+
+
+def _is_brand(value):
+    return isinstance(value, dict) and list(value) == ["@type", "name"] and value["@type"] == "Brand"
+
+
+def _flat_properties(items):
+    """additionalProperty as a flat (name, value, name, value, ...) tuple, or None if any item has another shape."""
+    flat = []
+    for item in items:
+        if not (isinstance(item, dict) and list(item) == ["@type", "name", "value"]
+                and item["@type"] == "PropertyValue"):
+            return None
+        flat.append(_intern(item["name"]))
+        flat.append(_intern(item["value"]))
+    return tuple(flat)
+
+
+class Product:
+    """
+    Compact in-memory form of a reforged schema.org Product. Categorical
+    strings (category, currency, availability, brand, color, property names
+    and values) are interned, constant keys are not stored at all, and the
+    JSON-LD dict is only built by to_jsonld(). Keys a product carries that the
+    model does not know are kept verbatim in `extra`, so from_jsonld() and
+    to_jsonld() round-trip any product exactly, key order included.
+    """
+
+    __slots__ = ("id", "category", "name", "offers", "brand", "model", "color", "properties", "description",
+                 "layout", "extra")
+
+    def __init__(self, product_id, category, name, offers, brand=None, model=None, color=None, properties=(),
+                 description=None, key_order=PRODUCT_KEYS):
+        self.id = product_id
+        self.category = _intern(category)
+        self.name = name
+        self.offers = offers
+        self.brand = _intern(brand)
+        self.model = model
+        self.color = _intern(color)
+        self.properties = tuple(_intern(part) for pair in properties for part in pair)
+        self.description = description
+        present = {"brand": brand is not None, "model": model is not None, "color": color is not None,
+                   "additionalProperty": bool(self.properties), "description": description is not None}
+        self.layout = _layout(key for key in key_order if present.get(key, True))
+        self.extra = None
+
+    @classmethod
+    def from_jsonld(cls, product):
+        self = cls.__new__(cls)
+        self.id = self.category = self.name = self.offers = self.brand = None
+        self.model = self.color = self.description = None
+        self.properties = ()
+        extra = {}
+        for key, value in product.items():
+            if key == "@context" and value == SCHEMA_CONTEXT or key == "@type" and value == "Product":
+                continue
+            if key == "@id":
+                self.id = value
+            elif key == "category":
+                self.category = _intern(value)
+            elif key == "name":
+                self.name = value
+            elif key == "model":
+                self.model = value
+            elif key == "color":
+                self.color = _intern(value)
+            elif key == "description":
+                self.description = value
+            elif key == "offers" and isinstance(value, dict):
+                self.offers = Offer.from_jsonld(value)
+            elif key == "brand" and _is_brand(value):
+                self.brand = _intern(value["name"])
+            elif key == "additionalProperty" and isinstance(value, list):
+                properties = _flat_properties(value)
+                if properties is None:
+                    extra[key] = value
+                else:
+                    self.properties = properties
+            else:
+                extra[key] = value
+        self.layout = _layout(product)
+        self.extra = extra or None
+        return self
+
+    def property_items(self):
+        """(name, value) pairs of the additionalProperty list."""
+        return zip(self.properties[::2], self.properties[1::2])
+
+    def to_jsonld(self):
+        extra = self.extra
+        product = {}
+        for key in self.layout:
+            if extra and key in extra:
+                product[key] = extra[key]
+            elif key == "@context":
+                product[key] = SCHEMA_CONTEXT
+            elif key == "@type":
+                product[key] = "Product"
+            elif key == "@id":
+                product[key] = self.id
+            elif key == "category":
+                product[key] = self.category
+            elif key == "name":
+                product[key] = self.name
+            elif key == "offers":
+                product[key] = self.offers.to_jsonld()
+            elif key == "brand":
+                product[key] = {"@type": "Brand", "name": self.brand}
+            elif key == "model":
+                product[key] = self.model
+            elif key == "color":
+                product[key] = self.color
+            elif key == "additionalProperty":
+                product[key] = [{"@type": "PropertyValue", "name": name, "value": value}
+                                for name, value in self.property_items()]
+            elif key == "description":
+                product[key] = self.description
+        return product
+
+    def __repr__(self):
+        return f"Product({self.id!r}, {self.name!r})"
+
+
+def as_jsonld(product):
+    return product.to_jsonld() if isinstance(product, Product) else product
+
+
+class JsonldView:
+    """
+    Re-iterable view of a product list as JSON-LD dicts, built one at a time,
+    for code that expects the dicts (validator, exports, price history).
+    """
+
+    __slots__ = ("products",)
+
+    def __init__(self, products):
+        self.products = products
+
+    def __len__(self):
+        return len(self.products)
+
+    def __iter__(self):
+        for product in self.products:
+            yield as_jsonld(product)
+
+
+def write_products(products, output_file):
+    """
+    Writes products as a JSON array, byte-identical to
+    json.dump(products, f, indent=2, ensure_ascii=False) with \n line endings,
+    serializing one product at a time. The file is written next to the target
+    and moved into place, then its @id -> byte range index is saved beside it.
+    """
+    output_file = Path(output_file)
+    temporary = output_file.with_name(output_file.name + ".tmp")
+    entries = []
+    with open(temporary, "wb") as f:
+        separator = b"[\n  "
+        offset = 0
+        for product in products:
+            product = as_jsonld(product)
+            encoded = _ENCODER.encode(product).replace("\n", "\n  ").encode("utf-8")
+            offset += len(separator)
+            entries.append((product.get("@id"), offset, len(encoded)))
+            f.write(separator)
+            f.write(encoded)
+            offset += len(encoded)
+            separator = b",\n  "
+        f.write(b"[]" if not entries else b"\n]")
+    os.replace(temporary, output_file)
+    write_index(output_file, entries)
+
+
+def load_products(path):
+    """Reads a reforged JSON-LD file straight into Product objects."""
+    return [Product.from_jsonld(item) for item in iter_json_array(path)]
+
+
+def _traced_size(load):
+    tracemalloc.start()
+    try:
+        products = load()
+        return len(products), tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def compare_memory(retailers=None, reforged_dir=None):
+    """Round-trips every reforged file through the model and compares its in-memory size with plain dicts."""
+    for retailer in retailers or RETAILERS:
+        path = reforged_file(retailer, reforged_dir)
+        if not path.exists():
+            print(f"Warning: {path} not found. Skipping.")
+            continue
+
+        count, dict_bytes = _traced_size(lambda: list(iter_json_array(path)))
+        _, model_bytes = _traced_size(lambda: load_products(path))
+        round_trip = all(json.dumps(Product.from_jsonld(item).to_jsonld()) == json.dumps(item)
+                         for item in iter_json_array(path))
+        print(f"{retailer}: {count} products, {dict_bytes / count:,.0f} -> {model_bytes / count:,.0f} bytes "
+              f"per product ({100 * model_bytes / dict_bytes:.0f}%), round trip {'ok' if round_trip else 'FAILED'}")
+
+
+if __name__ == "__main__":
+    compare_memory(sys.argv[1:] or None)
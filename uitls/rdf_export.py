@@ -0,0 +1,157 @@
+import argparse
+import gzip
+import re
+import time
+from pathlib import Path
+
+from catalogue import REFORGED_DIR, reforged_file
+from jsonld_graph import RETAILERS, brand_id, iter_json_array
+
+SCHEMA = "https://schema.org/"
+RDF_TYPE = "<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>"
+XSD = "http://www.w3.org/2001/XMLSchema#"
+
+# Product @ids in the reforged files are relative ("anhoch-laptops-1"); they
+# are resolved against this base, as a JSON-LD processor would with @base.
+DEFAULT_BASE = "urn:webbasedsystems:"
+
+_ESCAPES = {"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r"}
+_ESCAPE_PATTERN = re.compile(r'[\\"\n\r]')
+_LABEL_PATTERN = re.compile(r'[^A-Za-z0-9_-]')
+
+
+def literal(value):
+    """N-Triples literal following the JSON-LD to RDF conversion of native JSON values."""
+    if isinstance(value, bool):
+        return f'"{str(value).lower()}"^^<{XSD}boolean>'
+    if isinstance(value, (int, float)):
+        if value == int(value) and abs(value) < 1e21:
+            return f'"{int(value)}"^^<{XSD}integer>'
+        mantissa, exponent = f"{value:.15E}".split("E")
+        mantissa = mantissa.rstrip("0")
+        if mantissa.endswith("."):
+            mantissa += "0"
+        return f'"{mantissa}E{int(exponent)}"^^<{XSD}double>'
+    text = _ESCAPE_PATTERN.sub(lambda m: _ESCAPES[m.group()], str(value))
+    return f'"{text}"'
+
+
+def iri(value):
+    return f"<{value}>"
+
+
+def blank_node(*parts):
+    """Deterministic blank-node label derived from the owning product and the property path."""
+    return "_:" + "-".join(_LABEL_PATTERN.sub("_", str(part)) for part in parts)
+
+
+class RdfWriter:
+    def __init__(self, out, base=DEFAULT_BASE, quads=False):
+        self.out = out
+        self.base = base
+        self.quads = quads
+        self.graph = None
+        # graph IRI (None for N-Triples) -> Brand IRIs already described in that graph
+        self.emitted_brands = {}
+        self.statements = 0
+
+    def _statement(self, lines, subject, predicate, obj):
+        graph = f" {self.graph}" if self.quads and self.graph else ""
+        lines.append(f"{subject} {predicate} {obj}{graph} .\n")
+
+    def _object(self, lines, owner, path, value):
+        if isinstance(value, dict):
+            return self._node(lines, owner, path, value)
+        if isinstance(value, str) and value.startswith(("http://", "https://")):
+            return iri(value)
+        return literal(value)
+
+    def _brand(self, lines, value):
+        # Same @id as the Brand node to_graph writes, and likewise named by the first spelling seen.
+        subject = iri(self.base + brand_id(value["name"]))
+        emitted = self.emitted_brands.setdefault(self.graph if self.quads else None, set())
+        if subject not in emitted:
+            emitted.add(subject)
+            self._statement(lines, subject, RDF_TYPE, iri(SCHEMA + "Brand"))
+            self._statement(lines, subject, iri(SCHEMA + "name"), literal(value["name"]))
+        return subject
+
+    def _node(self, lines, owner, path, node):
+        if "@id" in node:
+            subject = iri(self.base + node["@id"])
+        else:
+            subject = blank_node(owner, *path)
+
+        for key, value in node.items():
+            if key in ("@context", "@id") or value is None:
+                continue
+            if key == "@type":
+                for type_name in value if isinstance(value, list) else [value]:
+                    self._statement(lines, subject, RDF_TYPE, iri(SCHEMA + type_name))
+                continue
+
+            predicate = iri(SCHEMA + key)
+            values = value if isinstance(value, list) else [value]
+            for index, item in enumerate(values):
+                if item is None:
+                    continue
+                if key == "brand" and isinstance(item, dict) and item.get("name"):
+                    obj = self._brand(lines, item)
+                else:
+                    item_path = path + [key, index] if isinstance(value, list) else path + [key]
+                    obj = self._object(lines, owner, item_path, item)
+                self._statement(lines, subject, predicate, obj)
+
+        return subject
+
+    def write_product(self, product):
+        lines = []
+        self._node(lines, product.get("@id", f"product{self.statements}"), [], product)
+        self.out.write("".join(lines))
+        self.statements += len(lines)
+
+
+def rdf_output_path(quads=False, output_dir=None):
+    return Path(output_dir or REFORGED_DIR) / ("catalogue.nq.gz" if quads else "catalogue.nt.gz")
+
+
+def export_rdf(retailers=None, output=None, quads=False, base=DEFAULT_BASE, reforged_dir=None):
+    """
+    Streams every reforged product straight to gzipped N-Triples (or N-Quads
+    with one named graph per retailer); only one product is in memory at a time.
+    """
+    output = Path(output or rdf_output_path(quads))
+    products = 0
+
+    with gzip.open(output, "wt", encoding="utf-8", compresslevel=6) as out:
+        writer = RdfWriter(out, base, quads)
+        for retailer in retailers or RETAILERS:
+            source = reforged_file(retailer, reforged_dir)
+            if not source.exists():
+                print(f"Warning: {source} not found. Skipping.")
+                continue
+            writer.graph = iri(f"{base}graph/{retailer}")
+            for product in iter_json_array(source):
+                writer.write_product(product)
+                products += 1
+
+    return output, products, writer.statements
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the reforged catalogue as gzipped N-Triples or N-Quads.")
+    parser.add_argument("retailers", nargs="*")
+    parser.add_argument("--nquads", action="store_true", help="one named graph per retailer")
+    parser.add_argument("--base", default=DEFAULT_BASE, help="base IRI for product and brand nodes")
+    parser.add_argument("-o", "--output")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    output, products, statements = export_rdf(args.retailers or None, args.output, args.nquads, args.base)
+    elapsed = time.perf_counter() - start
+    print(f"Exported {products} products as {statements:,} statements in {elapsed:.2f} s")
+    print(f"Output saved to {output} ({output.stat().st_size / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import csv
+import math
+import os
+
+# pandas' default NA spellings (pandas._libs.parsers.STR_NA_VALUES), so both
+# backends agree on which cells are missing; the scrapers write "N/A".
+NA_VALUES = frozenset(['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                       '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'])
+
+BACKENDS = ("csv", "pandas")
+
+
+def default_backend():
+    return os.environ.get("REFORGE_BACKEND", "csv")
+
+
+def is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _csv_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield {key: None if value is None or value in NA_VALUES else value for key, value in row.items()}
+
+
+def _pandas_rows(path):
+    import pandas as pd
+
+    # Every column as text: inferring floats turns a price such as "37.990" into 37.99.
+    df = pd.read_csv(path, dtype=str)
+    yield from df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def read_rows(path, skip_missing=(), backend=None):
+    """
+    Rows of a scraped CSV as dicts of strings, with missing cells as None.
+    Rows missing any column in `skip_missing` are dropped. The csv backend
+    streams the file; the pandas backend reads it with read_csv and is only
+    imported when chosen (backend="pandas" or REFORGE_BACKEND=pandas).
+    """
+    backend = backend or default_backend()
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown reforge backend {backend!r}; choose from {', '.join(BACKENDS)}")
+
+    rows = _pandas_rows(path) if backend == "pandas" else _csv_rows(path)
+    for row in rows:
+        if any(row.get(column) is None for column in skip_missing):
+            continue
+        yield row
@@ -0,0 +1,76 @@
+from pathlib import Path
+
+from jsonld_graph import write_graph, graph_output_path
+from columnar_export import export_retailer
+from spec_normalizer import write_spec_arrays
+from catalogue_shards import SHARDS_DIR, write_shards
+from search_index import update_search_index
+from facets import rebuild_facets
+from similar_products import rebuild_similar_products
+from price_index import rebuild_price_index
+from jsonld_validator import summary_line, validate_products
+from product_model import JsonldView
+import price_history
+
+
+def write_derived_outputs(retailer, products, output_dir, graph_output=False, columnar_format="ipc"):
+    """
+    Writes everything derived from a retailer's freshly reforged products,
+    next to its <retailer>_products_structured.jsonld file. Products are
+    turned into JSON-LD dicts one at a time as each output reads them.
+    """
+    output_dir = Path(output_dir)
+    products = JsonldView(products)
+
+    report = validate_products(products)
+    print(f"Validation: {summary_line(report)}")
+    for rule, count in report["rules"].most_common():
+        print(f"  {rule}: {count} (e.g. {report['examples'][rule]})")
+
+    if graph_output:
+        graph_file = graph_output_path(output_dir, retailer)
+        write_graph(products, graph_file)
+        print(f"Compact @graph output saved to {graph_file}")
+
+    columnar_dir = export_retailer(retailer, products, output_dir / "columnar", columnar_format)
+    if columnar_dir:
+        print(f"Columnar export saved to {columnar_dir}")
+
+    spec_file = write_spec_arrays(retailer, products, output_dir)
+    if spec_file:
+        print(f"Normalized spec arrays saved to {spec_file}")
+
+    written, unchanged, removed = write_shards(retailer, products, output_dir / SHARDS_DIR.name)
+    print(f"Shards: {written} written, {unchanged} unchanged, {removed} removed in {output_dir / SHARDS_DIR.name}")
+
+    if update_search_index([retailer], output_dir):
+        print(f"Search index updated for {retailer}")
+
+    history = price_history.connect(output_dir / price_history.HISTORY_PATH.name)
+    try:
+        changes = price_history.record_run(history, retailer, products)
+    finally:
+        history.close()
+    print(f"Price history: {changes} changes recorded")
+
+
+def rebuild_catalogue_outputs(output_dir=None):
+    """
+    Rebuilds the outputs computed over every retailer at once: facet bitmaps,
+    similar products and the price index. They are rebuilt once after the
+    reforges (the pipeline's catalogue task, or the end of a reforger run by
+    hand), not inside each retailer's write_derived_outputs.
+    """
+    facets_file = rebuild_facets(output_dir=output_dir)
+    print(f"Facet bitmaps saved to {facets_file}")
+
+    similar_file = rebuild_similar_products(output_dir=output_dir)
+    if similar_file:
+        print(f"Similar products saved to {similar_file}")
+
+    price_index_file = rebuild_price_index(output_dir=output_dir)
+    print(f"Price index saved to {price_index_file}")
+
+
+if __name__ == "__main__":
+    rebuild_catalogue_outputs()
@@ -0,0 +1,207 @@
+import argparse
+import bisect
+import hashlib
+import json
+import math
+import re
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from catalogue import REFORGED_DIR, reforged_file
+from jsonld_graph import RETAILERS, load_products
+
+SEARCH_INDEX_DIR = REFORGED_DIR / "search_index"
+
+# Exact word hits count double compared to trigram hits, so "5540" ranks a
+# Latitude 5540 above names that merely contain "554".
+WORD_WEIGHT = 2.0
+# A query word that is only a prefix of a name word ("128" of "128gb").
+PREFIX_FACTOR = 0.8
+MIN_SCORE = 0.3
+DEFAULT_LIMIT = 10
+
+WORD_PATTERN = re.compile(r'[^\W_]+(?:[.,]\d+)?')
+
+
+def tokenize(text):
+    """Lower-cased words of a product name or query; '15.6' and 'i5' stay whole."""
+    text = re.sub(r'(\d)к\b', r'\1k', text.lower())
+    return [word.replace(",", ".") for word in WORD_PATTERN.findall(text)]
+
+
+def trigrams(word):
+    """Trigrams of the word padded on the left only, so a query word also matches as a prefix ("128" -> "128gb")."""
+    padded = f" {word}"
+    if len(padded) < 3:
+        return {padded}
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def query_terms(text):
+    words = set(tokenize(text))
+    grams = set()
+    for word in words:
+        grams |= trigrams(word)
+    return words, grams
+
+
+def file_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def index_path(retailer, index_dir=None):
+    return Path(index_dir or SEARCH_INDEX_DIR) / f"{retailer}.json"
+
+
+def build_retailer_index(products, source_hash=None):
+    docs = []
+    words = defaultdict(list)
+    grams = defaultdict(list)
+
+    for doc_id, product in enumerate(products):
+        name = product.get("name") or ""
+        docs.append([product.get("@id"), name, product.get("category"), (product.get("offers") or {}).get("price")])
+        doc_words, doc_grams = query_terms(name)
+        for word in doc_words:
+            words[word].append(doc_id)
+        for gram in doc_grams:
+            grams[gram].append(doc_id)
+
+    return {"source": source_hash, "docs": docs, "words": words, "grams": grams}
+
+
+def update_search_index(retailers=None, reforged_dir=None, index_dir=None, force=False):
+    """
+    Re-indexes only the retailers whose reforged JSON-LD changed since the
+    last build. Returns the list of retailers that were rebuilt.
+    """
+    index_dir = Path(index_dir or SEARCH_INDEX_DIR)
+    index_dir.mkdir(parents=True, exist_ok=True)
+    rebuilt = []
+
+    for retailer in retailers or RETAILERS:
+        source = reforged_file(retailer, reforged_dir)
+        if not source.exists():
+            print(f"Warning: {source} not found. Skipping.")
+            continue
+
+        source_hash = file_hash(source)
+        target = index_path(retailer, index_dir)
+        if not force and target.exists():
+            with open(target, "r", encoding="utf-8") as f:
+                if json.load(f).get("source") == source_hash:
+                    continue
+
+        index = build_retailer_index(load_products(source), source_hash)
+        with open(target, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+        rebuilt.append(retailer)
+
+    return rebuilt
+
+
+class SearchIndex:
+    def __init__(self, index_dir=None):
+        self.docs = []
+        self.words = defaultdict(list)
+        self.grams = defaultdict(list)
+
+        for retailer in RETAILERS:
+            path = index_path(retailer, index_dir)
+            if not path.exists():
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            offset = len(self.docs)
+            self.docs.extend(data["docs"])
+            for word, postings in data["words"].items():
+                self.words[word].extend(doc_id + offset for doc_id in postings)
+            for gram, postings in data["grams"].items():
+                self.grams[gram].extend(doc_id + offset for doc_id in postings)
+
+        self.vocabulary = sorted(self.words)
+
+    def _idf(self, postings):
+        return math.log(1 + len(self.docs) / (1 + len(postings)))
+
+    def _word_hits(self, word):
+        """Documents containing the word, plus those with a longer word starting with it."""
+        exact = set(self.words.get(word, ()))
+        prefixed = set()
+        position = bisect.bisect_right(self.vocabulary, word)
+        while position < len(self.vocabulary) and self.vocabulary[position].startswith(word):
+            prefixed.update(self.words[self.vocabulary[position]])
+            position += 1
+        return exact, prefixed - exact
+
+    def search(self, query, limit=DEFAULT_LIMIT, min_score=MIN_SCORE):
+        """
+        Ranks products by the IDF-weighted share of the query's words and
+        trigrams they contain. Misspelled words still share most trigrams.
+        """
+        words, grams = query_terms(query)
+        scores = defaultdict(float)
+        total = 0.0
+
+        for word in words:
+            exact, prefixed = self._word_hits(word)
+            term_weight = WORD_WEIGHT * self._idf(exact | prefixed)
+            total += term_weight
+            for doc_id in exact:
+                scores[doc_id] += term_weight
+            for doc_id in prefixed:
+                scores[doc_id] += term_weight * PREFIX_FACTOR
+
+        for gram in grams:
+            postings = self.grams.get(gram, ())
+            term_weight = self._idf(postings)
+            total += term_weight
+            for doc_id in postings:
+                scores[doc_id] += term_weight
+
+        if not total:
+            return []
+
+        ranked = sorted(
+            ((score / total, doc_id) for doc_id, score in scores.items() if score / total >= min_score),
+            key=lambda item: (-item[0], len(self.docs[item[1]][1]), item[1]),
+        )
+        results = []
+        for score, doc_id in ranked[:limit]:
+            product_id, name, category, price = self.docs[doc_id]
+            results.append({"@id": product_id, "name": name, "category": category, "price": price,
+                            "score": round(score, 3)})
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search over product names of all retailers.")
+    parser.add_argument("query", nargs="*", help="search text, or 'build' to refresh the index")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    parser.add_argument("--force", action="store_true", help="rebuild every retailer, even if unchanged")
+    args = parser.parse_args()
+
+    if not args.query or args.query == ["build"]:
+        start = time.perf_counter()
+        rebuilt = update_search_index(force=args.force)
+        print(f"Re-indexed {', '.join(rebuilt) or 'nothing (all up to date)'} in {time.perf_counter() - start:.2f} s")
+        return
+
+    start = time.perf_counter()
+    index = SearchIndex()
+    loaded = time.perf_counter()
+    results = index.search(" ".join(args.query), args.limit)
+    elapsed = (time.perf_counter() - loaded) * 1000
+
+    for result in results:
+        print(f"{result['score']:.3f} {result['price'] or 0:>10,.0f}  {result['@id']:<22} {result['name']}")
+    print(f"\n{len(results)} results in {elapsed:.2f} ms (index loaded in {(loaded - start) * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+import argparse
+import json
+import time
+from pathlib import Path
+
+from catalogue import REFORGED_DIR, RETAILERS, iter_catalogue, reforged_file
+from jsonld_graph import load_products
+from spec_normalizer import load_spec_arrays, spec_arrays_path, write_spec_arrays
+
+SIMILAR_PRODUCTS_PATH = REFORGED_DIR / "similar_products.json"
+DEFAULT_K = 10
+LEAF_SIZE = 64
+
+# (feature, weight) per category. RAM and storage are compared on a log2
+# scale with a heavy weight, so a product one class away (8 vs 16 GB) is
+# rarely closer than one of the same class; a step of one standard
+# deviation in any feature costs its weight in distance.
+FEATURES = {
+    "Laptops": [("ram", 3.0), ("storage", 3.0), ("screen", 1.5), ("resolution", 1.0), ("cpu", 1.5), ("price", 2.0)],
+    "Smartphones": [("ram", 3.0), ("storage", 3.0), ("screen", 1.0), ("price", 2.0)],
+    "Televisions": [("screen", 3.0), ("resolution", 2.0), ("price", 2.0)],
+}
+# Rough performance tier of each spec_normalizer CPU family, so the CPU is
+# one ordered dimension instead of one column per family.
+CPU_TIERS = {
+    "Intel Celeron": 0, "Intel Pentium": 0, "Intel N": 0, "AMD Athlon": 0,
+    "Snapdragon": 1,
+    "Intel Core i": 2, "Intel Core": 2, "AMD Ryzen": 2,
+    "Intel Core Ultra": 3, "Apple M1": 3, "Apple M2": 3,
+    "Apple M3": 4, "Apple M4": 4,
+}
+
+
+def spec_features(retailers=None, output_dir=None):
+    """
+    The normalized spec arrays of every retailer (uitls/spec_normalizer.py),
+    written first for any retailer whose .npz is missing.
+    """
+    for retailer in retailers or RETAILERS:
+        source = reforged_file(retailer, output_dir)
+        if source.exists() and not spec_arrays_path(retailer, output_dir).exists():
+            write_spec_arrays(retailer, load_products(source), output_dir)
+    return load_spec_arrays(retailers, output_dir)
+
+
+def feature_matrix(np, arrays, category):
+    """
+    Rows of the category and their weighted, standardized feature vectors.
+    Missing values (unparsed specs, no price) take the category median, so
+    they neither attract nor repel neighbours.
+    """
+    rows = np.flatnonzero(arrays["category"] == category)
+    raw = {
+        "ram": np.log2(np.where(arrays["ram_gb"][rows] > 0, arrays["ram_gb"][rows], np.nan)),
+        "storage": np.log2(np.where(arrays["storage_gb"][rows] > 0, arrays["storage_gb"][rows], np.nan)),
+        "screen": arrays["screen_in"][rows].astype(np.float64),
+        "resolution": np.log2(np.where(arrays["resolution_px"][rows] > 0, arrays["resolution_px"][rows], np.nan)),
+        "cpu": np.array([CPU_TIERS.get(family, np.nan) for family in arrays["cpu_family"][rows].tolist()],
+                        dtype=np.float64),
+        "price": np.log(np.where(arrays["price"][rows] > 0, arrays["price"][rows], np.nan)),
+    }
+
+    columns = []
+    for name, weight in FEATURES[category]:
+        column = raw[name]
+        known = column[~np.isnan(column)]
+        if len(known) == 0:
+            continue
+        column = np.where(np.isnan(column), np.median(known), column)
+        spread = column.std() or 1.0
+        columns.append((column - column.mean()) / spread * weight)
+
+    return rows, np.column_stack(columns) if columns else np.zeros((len(rows), 0))
+
+
+class KDTree:
+    """
+    Static KD-tree over the rows of `points`: every split is at the median of
+    the dimension with the widest spread, down to leaves of at most leaf_size
+    points, each with the bounding box of its points. A search measures every
+    query's distance to every leaf box in one NumPy operation and opens the
+    leaves nearest first, in batches that double in size, skipping a leaf
+    once its box is farther from each query than that query's k-th nearest
+    point so far; no point in such a leaf can be among the k nearest.
+    """
+
+    def __init__(self, np, points, leaf_size=LEAF_SIZE):
+        self.np = np
+        self.points = np.asarray(points, dtype=np.float64)
+        self.norms = (self.points * self.points).sum(axis=1)
+        self.order = np.arange(len(self.points))
+        self.leaf_size = leaf_size
+        leaves = []
+        if len(self.points):
+            self._split(0, len(self.points), leaves)
+        self.leaf_start = np.array([start for start, _ in leaves], dtype=np.int64)
+        self.leaf_end = np.array([end for _, end in leaves], dtype=np.int64)
+        self.leaf_lower = np.array([self.points[self.order[start:end]].min(axis=0) for start, end in leaves])
+        self.leaf_upper = np.array([self.points[self.order[start:end]].max(axis=0) for start, end in leaves])
+
+    def _split(self, start, end, leaves):
+        np = self.np
+        block = self.points[self.order[start:end]]
+        spread = block.max(axis=0) - block.min(axis=0) if len(block) else np.zeros(0)
+        if end - start <= self.leaf_size or not spread.any():
+            leaves.append((start, end))
+            return
+        middle = (end - start) // 2
+        partition = np.argpartition(block[:, int(np.argmax(spread))], middle)
+        self.order[start:end] = self.order[start:end][partition]
+        self._split(start, start + middle, leaves)
+        self._split(start + middle, end, leaves)
+
+    def _leaf_rows(self, leaves):
+        return self.np.concatenate([self.order[self.leaf_start[leaf]:self.leaf_end[leaf]] for leaf in leaves])
+
+    def _merge(self, queries, rows, best, best_rows, k, exclude):
+        np = self.np
+        # |q - p|^2 as |q|^2 + |p|^2 - 2 q.p, one matrix product per block; _search recomputes the winners exactly.
+        distances = ((queries * queries).sum(axis=1)[:, None] + self.norms[rows][None, :]
+                     - 2.0 * (queries @ self.points[rows].T))
+        if exclude is not None:
+            distances[exclude[:, None] == rows[None, :]] = np.inf
+        candidates = np.concatenate([best, distances], axis=1)
+        candidate_rows = np.concatenate([best_rows, np.broadcast_to(rows, distances.shape)], axis=1)
+        keep = np.argpartition(candidates, k - 1, axis=1)[:, :k]
+        return np.take_along_axis(candidates, keep, axis=1), np.take_along_axis(candidate_rows, keep, axis=1)
+
+    def _search(self, queries, k, exclude=None):
+        """
+        k nearest rows for each of a block of query points: (squared
+        distances, rows), both shaped (len(queries), k), nearest first and
+        padded with inf/-1. Rows equal to `exclude` (one per query) are skipped.
+        """
+        np = self.np
+        gap = np.maximum(0.0, np.maximum(self.leaf_lower[None, :, :] - queries[:, None, :],
+                                         queries[:, None, :] - self.leaf_upper[None, :, :]))
+        leaf_gaps = (gap * gap).sum(axis=2)
+        nearest_gap = leaf_gaps.min(axis=0)
+        ranked = np.argsort(nearest_gap, kind="stable")
+
+        best = np.full((len(queries), k), np.inf)
+        best_rows = np.full((len(queries), k), -1)
+        kth = best[:, -1]
+        position, batch = 0, 1
+        while position < len(ranked):
+            leaves = ranked[position:position + batch]
+            position += len(leaves)
+            if nearest_gap[leaves[0]] > kth.max():
+                break
+            # Leaves ahead of some query's k-th distance; the others cannot change any answer.
+            leaves = leaves[(leaf_gaps[:, leaves] <= kth[:, None]).any(axis=0)]
+            if len(leaves):
+                best, best_rows = self._merge(queries, self._leaf_rows(leaves), best, best_rows, k, exclude)
+                kth = best.max(axis=1)
+            batch *= 2
+
+        found = best_rows >= 0
+        exact = ((self.points[np.where(found, best_rows, 0)] - queries[:, None, :]) ** 2).sum(axis=2)
+        best = np.where(found, exact, np.inf)
+        order = np.lexsort((best_rows, best), axis=1)
+        return np.take_along_axis(best, order, axis=1), np.take_along_axis(best_rows, order, axis=1)
+
+    def query(self, point, k):
+        """The k nearest rows to one point as (distance, row) pairs, nearest first."""
+        np = self.np
+        k = min(k, len(self.points))
+        if k <= 0:
+            return []
+        distances, rows = self._search(np.asarray(point, dtype=np.float64)[None, :], k)
+        return [(float(np.sqrt(distance)), int(row)) for distance, row in zip(distances[0], rows[0])]
+
+    def all_neighbours(self, k):
+        """
+        The k nearest other rows of every row, searched a leaf of queries at a
+        time: (distances, rows) shaped (n, k), nearest first, padded with
+        inf/-1 when the tree holds k points or fewer.
+        """
+        np = self.np
+        n = len(self.points)
+        distances = np.full((n, k), np.inf)
+        rows = np.full((n, k), -1)
+        if n < 2 or k <= 0:
+            return distances, rows
+        width = min(k, n - 1)
+        for start, end in zip(self.leaf_start.tolist(), self.leaf_end.tolist()):
+            queries = self.order[start:end]
+            found, found_rows = self._search(self.points[queries], width, exclude=queries)
+            distances[queries, :width] = np.sqrt(found)
+            rows[queries, :width] = found_rows
+        return distances, rows
+
+
+def brute_force_neighbours(np, points, k):
+    """Exhaustive k-NN of every row, one row against all others at a time (what a per-request search would do)."""
+    distances = np.empty((len(points), k))
+    rows = np.empty((len(points), k), dtype=np.int64)
+    for row in range(len(points)):
+        squared = ((points - points[row]) ** 2).sum(axis=1)
+        squared[row] = np.inf
+        nearest = np.argpartition(squared, k - 1)[:k]
+        nearest = nearest[np.lexsort((nearest, squared[nearest]))]
+        distances[row] = np.sqrt(squared[nearest])
+        rows[row] = nearest
+    return distances, rows
+
+
+def listing_names(retailers=None, output_dir=None):
+    return {product.get("@id"): (retailer, product.get("name"))
+            for retailer, product in iter_catalogue(retailers, output_dir)}
+
+
+def build_similar_products(k=DEFAULT_K, retailers=None, output_dir=None):
+    """
+    {@id: [[neighbour @id, distance], ...]} for every product, its k nearest
+    within its category. A retailer listing the same name several times is
+    indexed once and every copy gets the first one's neighbours, so the
+    list is not filled with the product itself.
+    """
+    import numpy as np
+
+    arrays = spec_features(retailers, output_dir)
+    similar = {}
+    if not arrays:
+        return similar
+    names = listing_names(retailers, output_dir)
+    for category in FEATURES:
+        rows, points = feature_matrix(np, arrays, category)
+        ids = arrays["id"][rows].tolist()
+        first = {}
+        for position, product_id in enumerate(ids):
+            first.setdefault(names.get(product_id, product_id), position)
+        unique = sorted(first.values())
+        unique_ids = [ids[position] for position in unique]
+
+        distances, neighbours = KDTree(np, points[unique]).all_neighbours(k)
+        lists = [[[unique_ids[other], round(distance, 4)] for distance, other in zip(row_distances, row_neighbours)
+                  if other != -1]
+                 for row_distances, row_neighbours in zip(distances.tolist(), neighbours.tolist())]
+        slot = {position: index for index, position in enumerate(unique)}
+        for product_id in ids:
+            similar[product_id] = lists[slot[first[names.get(product_id, product_id)]]]
+    return similar
+
+
+def rebuild_similar_products(k=DEFAULT_K, output_dir=None):
+    """Recomputes the top-k table over every retailer and writes similar_products.json. Returns its path."""
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print("Warning: numpy is not installed. Skipping similar products.")
+        return None
+
+    similar = build_similar_products(k, output_dir=output_dir)
+    target = Path(output_dir) / SIMILAR_PRODUCTS_PATH.name if output_dir else SIMILAR_PRODUCTS_PATH
+    with open(target, "w", encoding="utf-8") as f:
+        json.dump({"k": k, "products": similar}, f, ensure_ascii=False, separators=(",", ":"))
+    return target
+
+
+def check_against_brute_force(k=DEFAULT_K, scale=1):
+    """
+    Compares the KD-tree neighbours of every product with an exhaustive
+    search and times both. scale > 1 adds jittered copies of every product
+    to see how both grow with the catalogue.
+    """
+    import numpy as np
+
+    arrays = spec_features()
+    generator = np.random.default_rng(0)
+    for category in FEATURES:
+        _, points = feature_matrix(np, arrays, category)
+        if scale > 1:
+            points = np.concatenate([points] + [points + generator.normal(0, 0.05, points.shape)
+                                                for _ in range(scale - 1)])
+        start = time.perf_counter()
+        tree = KDTree(np, points)
+        built = time.perf_counter()
+        tree_distances, _ = tree.all_neighbours(k)
+        queried = time.perf_counter()
+        brute_distances, _ = brute_force_neighbours(np, points, k)
+        brute = time.perf_counter()
+
+        # Neighbours at exactly the same distance may come in either order, so the distances are compared.
+        mismatches = int((~np.isclose(tree_distances, brute_distances).all(axis=1)).sum())
+        print(f"{category}: {len(points)} products, {points.shape[1]} features, tree built in "
+              f"{(built - start) * 1000:.0f} ms, k-NN for all {(queried - built) * 1000:.0f} ms "
+              f"(brute force {(brute - queried) * 1000:.0f} ms), {mismatches} mismatches")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute similar products per category with a KD-tree.")
+    parser.add_argument("product", nargs="?", help="@id to show the similar products of")
+    parser.add_argument("--k", type=int, default=DEFAULT_K)
+    parser.add_argument("--check", action="store_true", help="compare with brute force and time both")
+    parser.add_argument("--scale", type=int, default=1, help="with --check: grow each category this many times")
+    args = parser.parse_args()
+
+    if args.check:
+        check_against_brute_force(args.k, args.scale)
+        return
+
+    start = time.perf_counter()
+    target = rebuild_similar_products(args.k)
+    if target is None:
+        return
+    print(f"Similar products saved to {target} in {time.perf_counter() - start:.2f} s")
+
+    if args.product:
+        with open(target, "r", encoding="utf-8") as f:
+            similar = json.load(f)["products"]
+        if args.product not in similar:
+            print(f"No product with @id {args.product!r}")
+            return
+        names = {}
+        for retailer in RETAILERS:
+            source = reforged_file(retailer)
+            if source.exists():
+                for product in load_products(source):
+                    names[product["@id"]] = (product.get("name"), (product.get("offers") or {}).get("price"))
+        name, price = names[args.product]
+        print(f"\n{args.product}: {name} ({price or 0:,.0f} MKD)")
+        for other, distance in similar[args.product]:
+            other_name, other_price = names[other]
+            print(f"  {distance:6.3f}  {other_price or 0:>9,.0f}  {other:<22} {other_name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+import argparse
+import csv
+import json
+import re
+import shutil
+import tempfile
+import time
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+from catalogue import BASE_DIR, REFORGED_DIR, product_key, regular_price, retailer_of
+from jsonld_graph import iter_json_array
+
+SNAPSHOTS_DIR = BASE_DIR / "snapshots"
+
+BUCKETS = 64
+
+CSV_CATEGORIES = {
+    "laptops": "Laptops",
+    "phones": "Smartphones",
+    "smartphones": "Smartphones",
+    "tvs": "Televisions",
+    "oled_tvs": "Televisions",
+}
+
+
+def parse_any_price(value):
+    """
+    Retailer-agnostic price parser: '48.980,00 ден.', '14,995 ден.', '14.999'
+    and '460 ден.' all become floats. A lone separator followed by exactly
+    three digits is a thousands separator.
+    """
+    if value is None:
+        return None
+    text = re.sub(r'[^\d.,]', '', str(value)).strip(".,")
+    if not text:
+        return None
+    if "." in text and "," in text:
+        decimal = "." if text.rfind(".") > text.rfind(",") else ","
+        thousands = "," if decimal == "." else "."
+        text = text.replace(thousands, "").replace(decimal, ".")
+    elif re.fullmatch(r'\d{1,3}([.,]\d{3})+', text):
+        text = re.sub(r'[.,]', '', text)
+    else:
+        text = text.replace(",", ".")
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def _csv_records(path):
+    retailer, _, category = path.stem.partition("_")
+    category = CSV_CATEGORIES.get(category, category)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            name = row.get("name")
+            if not name or name == "N/A":
+                continue
+            price = parse_any_price(row.get("price"))
+            regular = parse_any_price(row.get("regular_price"))
+            yield retailer, category, name, price, regular if regular != price else None
+
+
+def _jsonld_records(path):
+    for product in iter_json_array(path):
+        yield (retailer_of(product.get("@id", "")), product.get("category"), product.get("name"),
+               (product.get("offers") or {}).get("price"), regular_price(product))
+
+
+def iter_snapshot(source):
+    """Yields (retailer, category, name, price, regular_price) from a snapshot file or directory."""
+    source = Path(source)
+    paths = [source] if source.is_file() else sorted(
+        list(source.glob("*_products_structured.jsonld")) or list(source.glob("*.csv")))
+    for path in paths:
+        yield from (_jsonld_records(path) if path.suffix == ".jsonld" else _csv_records(path))
+
+
+def _bucket_of(key, buckets):
+    return zlib.crc32(key.encode("utf-8")) % buckets
+
+
+def partition_snapshot(source, target_dir, buckets):
+    """
+    Writes every record to one of `buckets` JSON-lines files on disk. Records
+    are bucketed by their first-occurrence key, so every repeat of a name
+    lands in the same bucket, in snapshot order, and gets its occurrence
+    number when the bucket is read back.
+    """
+    target_dir.mkdir(parents=True, exist_ok=True)
+    files = [open(target_dir / f"{bucket}.jsonl", "w", encoding="utf-8") for bucket in range(buckets)]
+    count = 0
+    try:
+        for retailer, category, name, price, regular in iter_snapshot(source):
+            base_key = product_key(retailer, category, name)
+            record = [base_key, retailer, category, name, price, regular]
+            files[_bucket_of(base_key, buckets)].write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    finally:
+        for f in files:
+            f.close()
+    return count
+
+
+def read_bucket(path):
+    """The records of one bucket file with their full keys (see catalogue.product_key)."""
+    occurrences = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for record in map(json.loads, f):
+            base_key = record[0]
+            occurrences[base_key] = occurrences.get(base_key, 0) + 1
+            if occurrences[base_key] > 1:
+                record[0] = f"{base_key}-{occurrences[base_key]}"
+            yield record
+
+
+def _event(event_type, record, old_price=None, new_price=None, **extra):
+    event = {
+        "type": event_type,
+        "key": record[0],
+        "retailer": record[1],
+        "category": record[2],
+        "name": record[3],
+        "old_price": old_price,
+        "new_price": new_price,
+    }
+    event.update(extra)
+    return event
+
+
+def compare_records(old, new):
+    events = []
+    old_price, new_price = old[4], new[4]
+    old_regular, new_regular = old[5], new[5]
+
+    if old_price is not None and new_price is not None and old_price != new_price:
+        change = round(100 * (new_price - old_price) / old_price, 2) if old_price else None
+        event_type = "price_drop" if new_price < old_price else "price_increase"
+        events.append(_event(event_type, new, old_price, new_price, change_pct=change))
+
+    if new_regular and not old_regular:
+        events.append(_event("discount_started", new, old_price, new_price, regular_price=new_regular))
+    elif old_regular and not new_regular:
+        events.append(_event("discount_ended", new, old_price, new_price, regular_price=old_regular))
+
+    return events
+
+
+def diff_snapshots(old_source, new_source, output, buckets=BUCKETS):
+    """
+    Partitioned hash join of two snapshots on the stable product key. Only
+    one bucket of each snapshot is held in memory at a time.
+    """
+    counts = {}
+    work_dir = Path(tempfile.mkdtemp(prefix="snapshot_diff_"))
+    try:
+        old_rows = partition_snapshot(old_source, work_dir / "old", buckets)
+        new_rows = partition_snapshot(new_source, work_dir / "new", buckets)
+
+        with open(output, "w", encoding="utf-8") as out:
+            for bucket in range(buckets):
+                build = {record[0]: record for record in read_bucket(work_dir / "old" / f"{bucket}.jsonl")}
+
+                events = []
+                for record in read_bucket(work_dir / "new" / f"{bucket}.jsonl"):
+                    old = build.pop(record[0], None)
+                    if old is None:
+                        events.append(_event("new", record, new_price=record[4]))
+                    else:
+                        events.extend(compare_records(old, record))
+
+                events.extend(_event("removed", record, old_price=record[4]) for record in build.values())
+
+                for event in events:
+                    counts[event["type"]] = counts.get(event["type"], 0) + 1
+                    out.write(json.dumps(event, ensure_ascii=False) + "\n")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return old_rows, new_rows, counts
+
+
+def archive_snapshot(source_dir=None, snapshots_dir=None):
+    """Copies the current reforged JSON-LD files into snapshots/<timestamp>/."""
+    source_dir = Path(source_dir or REFORGED_DIR)
+    snapshots_dir = Path(snapshots_dir or SNAPSHOTS_DIR)
+    target = snapshots_dir / datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    target.mkdir(parents=True, exist_ok=True)
+    for path in source_dir.glob("*_products_structured.jsonld"):
+        shutil.copy2(path, target / path.name)
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff two catalogue snapshots into a JSON-lines change feed.")
+    parser.add_argument("old", nargs="?", help="previous snapshot (directory of CSV/JSON-LD files or one file)")
+    parser.add_argument("new", nargs="?", help="current snapshot")
+    parser.add_argument("-o", "--output", help="change feed path (JSON lines)")
+    parser.add_argument("--buckets", type=int, default=BUCKETS)
+    parser.add_argument("--archive", action="store_true",
+                        help="archive reforged_data/ as a new snapshot and diff it against the previous one")
+    args = parser.parse_args()
+
+    if args.archive:
+        previous = sorted(path for path in SNAPSHOTS_DIR.glob("*") if path.is_dir()) if SNAPSHOTS_DIR.exists() else []
+        current = archive_snapshot()
+        print(f"Snapshot saved to {current}")
+        if not previous:
+            print("No previous snapshot to compare with.")
+            return
+        old_source, new_source = previous[-1], current
+        output = Path(args.output or current / "changes.jsonl")
+    elif args.old and args.new:
+        old_source, new_source = args.old, args.new
+        output = Path(args.output or "changes.jsonl")
+    else:
+        parser.error("pass OLD and NEW snapshots, or --archive")
+
+    start = time.perf_counter()
+    old_rows, new_rows, counts = diff_snapshots(old_source, new_source, output, args.buckets)
+    elapsed = time.perf_counter() - start
+
+    print(f"Compared {old_rows:,} -> {new_rows:,} rows in {elapsed:.2f} s")
+    for event_type, count in sorted(counts.items()):
+        print(f"  {event_type}: {count}")
+    print(f"Change feed saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
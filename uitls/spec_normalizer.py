@@ -0,0 +1,263 @@
+import re
+import sys
+from pathlib import Path
+
+from catalogue import REFORGED_DIR, RETAILERS, iter_catalogue
+
+CATEGORIES = ["Laptops", "Smartphones", "Televisions"]
+
+# Plausible ranges per category, used to reject spec values the name parsers
+# picked up from the wrong part of the name (model numbers, GPU memory...).
+RAM_RANGE_GB = {"Laptops": (2, 128), "Smartphones": (1, 24)}
+STORAGE_RANGE_GB = {"Laptops": (64, 8192), "Smartphones": (8, 2048)}
+SCREEN_RANGE_IN = {"Laptops": (10.0, 19.0), "Smartphones": (1.5, 8.0), "Televisions": (19.0, 120.0)}
+
+STORAGE_TYPES = ["SSD", "HDD", "eMMC", "UFS"]
+
+# (class, pixel count) ordered from the most to the least specific marker.
+RESOLUTION_CLASSES = [
+    ("8K", 7680 * 4320, r'(?<![\d.])8[KК]\b'),
+    ("4K", 3840 * 2160, r'(?<![\d.])4[KК]\b|(?<!INTEL )\bUHD\b|ULTRA\s*HD|ULTRAHD'),
+    ("QHD", 2560 * 1440, r'\bW?QHD\+?|\b2\.?[58]?K\b|\b3K\b|RETINA'),
+    ("WUXGA", 1920 * 1200, r'\bWUXGA\b'),
+    ("FHD", 1920 * 1080, r'\bFHD\b|FULL\s*HD'),
+    ("HD", 1280 * 720, r'\bHD\b'),
+]
+RESOLUTION_PATTERNS = [(label, pixels, re.compile(pattern, re.IGNORECASE))
+                       for label, pixels, pattern in RESOLUTION_CLASSES]
+RESOLUTION_PIXELS = {label: pixels for label, pixels, _ in RESOLUTION_CLASSES}
+
+CPU_FAMILIES = [
+    ("Apple M", r'\bM([1-4])\b(?:\s*(?:PRO|MAX))?'),
+    ("Intel Core Ultra", r'\bULTRA\s*[579]\b|\bCORE\s*ULTRA'),
+    ("Intel Core", r'\bCORE\s*[357]\s+\d{3}[A-Z]'),
+    ("Intel Core i", r'\bi[3579]-\w+|CORE\W*i[3579]'),
+    ("AMD Ryzen", r'\bRYZEN\s*[3579]|\bR[3579]-\d{4}'),
+    ("Intel N", r'\bN\d{3,4}\b'),
+    ("Intel Celeron", r'CELERON'),
+    ("Intel Pentium", r'PENTIUM'),
+    ("AMD Athlon", r'ATHLON'),
+    ("Snapdragon", r'SNAPDRAGON'),
+]
+CPU_PATTERNS = [(family, re.compile(pattern, re.IGNORECASE)) for family, pattern in CPU_FAMILIES]
+
+SIZE_PATTERN = re.compile(r'(\d+)\s*(TB|GB)', re.IGNORECASE)
+INCH_PATTERN = re.compile(r'(\d{1,3}(?:[.,]\d)?)\s*(?:"|``|`|\'\'|inch|in\b)', re.IGNORECASE)
+
+
+def _in_range(value, bounds):
+    if value is None or bounds is None:
+        return value
+    low, high = bounds
+    return value if low <= value <= high else None
+
+
+def to_gb(value):
+    if value is None:
+        return None
+    match = SIZE_PATTERN.search(str(value))
+    if not match:
+        digits = re.fullmatch(r'\s*(\d+)\s*', str(value))
+        return int(digits.group(1)) if digits else None
+    amount = int(match.group(1))
+    return amount * 1024 if match.group(2).upper() == "TB" else amount
+
+
+def ram_gb(value, category=None):
+    return _in_range(to_gb(value), RAM_RANGE_GB.get(category))
+
+
+def storage_gb(value, category=None):
+    return _in_range(to_gb(value), STORAGE_RANGE_GB.get(category))
+
+
+def storage_type(*texts):
+    for text in texts:
+        if not text:
+            continue
+        upper = str(text).upper()
+        for kind in STORAGE_TYPES:
+            if kind.upper() in upper:
+                return kind
+    return None
+
+
+def screen_inches(value, category=None):
+    if value is None:
+        return None
+    text = str(value)
+    match = INCH_PATTERN.search(text) or re.fullmatch(r'\s*(\d{1,3}(?:[.,]\d)?)\s*', text)
+    if not match:
+        return None
+    inches = float(match.group(1).replace(',', '.'))
+    return _in_range(inches, SCREEN_RANGE_IN.get(category))
+
+
+def resolution_class(*texts):
+    for text in texts:
+        if not text:
+            continue
+        for label, _, pattern in RESOLUTION_PATTERNS:
+            if pattern.search(str(text)):
+                return label
+    return None
+
+
+def cpu_family(*texts):
+    for text in texts:
+        if not text:
+            continue
+        for family, pattern in CPU_PATTERNS:
+            match = pattern.search(str(text))
+            if match:
+                if family == "Apple M":
+                    return f"Apple M{match.group(1)}"
+                return family
+    return None
+
+
+def normalize_product(product):
+    """
+    Returns the typed spec fields of one reforged product. Parsed spec values
+    are preferred, the original name is the fallback for every field.
+    """
+    category = product.get("category")
+    name = product.get("name") or ""
+    specs = {prop.get("name"): prop.get("value") for prop in product.get("additionalProperty", [])}
+    offers = product.get("offers") or {}
+
+    ram = ram_gb(specs.get("RAM"), category)
+    storage = storage_gb(specs.get("Storage"), category)
+    if category == "Laptops" and (ram is None or storage is None):
+        sizes = [to_gb(part) for part in re.findall(r'\d+\s*[GT]B', name, re.IGNORECASE)]
+        sizes = [size for size in sizes if size]
+        if ram is None:
+            ram = next((size for size in sizes if _in_range(size, RAM_RANGE_GB[category])), None)
+        if storage is None:
+            storage = next((size for size in sizes if size > (ram or 0)
+                            and _in_range(size, STORAGE_RANGE_GB[category])), None)
+
+    screen = screen_inches(specs.get("Screen Size"), category)
+    if screen is None:
+        screen = screen_inches(name, category)
+    if screen is None and category == "Televisions":
+        sizes = [float(size) for size in re.findall(r'(?<![\w.])(\d{2,3})(?![\w.])', name)]
+        screen = next((size for size in sizes if _in_range(size, SCREEN_RANGE_IN[category])), None)
+
+    if category == "Smartphones":
+        resolution = None
+    else:
+        resolution = resolution_class(specs.get("Resolution"), specs.get("Screen Info"), name)
+
+    return {
+        "id": product.get("@id"),
+        "category": category,
+        "price": offers.get("price"),
+        "ram_gb": ram,
+        "storage_gb": storage,
+        "storage_type": storage_type(specs.get("Storage"), name) if category == "Laptops" else None,
+        "screen_in": screen,
+        "resolution_class": resolution,
+        "resolution_px": RESOLUTION_PIXELS.get(resolution),
+        "cpu_family": cpu_family(specs.get("Processor"), name) if category == "Laptops" else None,
+    }
+
+
+def spec_arrays_path(retailer, output_dir=None):
+    return Path(output_dir or REFORGED_DIR) / f"{retailer}_specs.npz"
+
+
+def _codes(np, values, vocabulary):
+    lookup = {value: index for index, value in enumerate(vocabulary)}
+    return np.array([lookup.get(value, -1) for value in values], dtype=np.int8)
+
+
+def write_spec_arrays(retailer, products, output_dir=None):
+    """
+    Stores the normalized specs as compact typed arrays (.npz) next to the
+    JSON-LD file. Missing integers are -1, missing floats are NaN and
+    categorical fields are int8 codes into the stored vocabularies.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        print("Warning: numpy is not installed. Skipping spec arrays.")
+        return None
+
+    rows = [normalize_product(product) for product in products]
+    cpu_vocabulary = sorted({row["cpu_family"] for row in rows if row["cpu_family"]})
+
+    def column(key, dtype, missing):
+        return np.array([missing if row[key] is None else row[key] for row in rows], dtype=dtype)
+
+    target = spec_arrays_path(retailer, output_dir)
+    np.savez(
+        target,
+        id=np.array([row["id"] for row in rows], dtype=str),
+        category=_codes(np, [row["category"] for row in rows], CATEGORIES),
+        price=column("price", np.float64, np.nan),
+        ram_gb=column("ram_gb", np.int16, -1),
+        storage_gb=column("storage_gb", np.int32, -1),
+        screen_in=column("screen_in", np.float32, np.nan),
+        resolution_px=column("resolution_px", np.int32, -1),
+        storage_type=_codes(np, [row["storage_type"] for row in rows], STORAGE_TYPES),
+        cpu_family=_codes(np, [row["cpu_family"] for row in rows], cpu_vocabulary),
+        category_vocabulary=np.array(CATEGORIES, dtype=str),
+        storage_type_vocabulary=np.array(STORAGE_TYPES, dtype=str),
+        cpu_family_vocabulary=np.array(cpu_vocabulary or [""], dtype=str),
+    )
+    return target
+
+
+def load_spec_arrays(retailers=None, output_dir=None):
+    """
+    Loads and concatenates the per-retailer spec arrays. Categorical codes are
+    decoded to string arrays so retailers with different vocabularies combine.
+    """
+    import numpy as np
+
+    parts = []
+    for retailer in retailers or RETAILERS:
+        path = spec_arrays_path(retailer, output_dir)
+        if not path.exists():
+            continue
+        with np.load(path) as data:
+            part = {key: data[key] for key in ("id", "price", "ram_gb", "storage_gb", "screen_in", "resolution_px")}
+            for key in ("category", "storage_type", "cpu_family"):
+                vocabulary = np.append(data[f"{key}_vocabulary"], "")
+                part[key] = vocabulary[data[key]]
+            part["retailer"] = np.full(len(part["id"]), retailer)
+        parts.append(part)
+
+    if not parts:
+        return {}
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+def filter_laptops(arrays, min_ram_gb=16, max_price=50000, min_screen_in=15.0, max_screen_in=16.0):
+    mask = ((arrays["category"] == "Laptops")
+            & (arrays["ram_gb"] >= min_ram_gb)
+            & (arrays["price"] < max_price)
+            & (arrays["screen_in"] >= min_screen_in)
+            & (arrays["screen_in"] <= max_screen_in))
+    return arrays["id"][mask]
+
+
+def normalize_reforged_data(retailers=None):
+    products_by_retailer = {}
+    for retailer, product in iter_catalogue(retailers):
+        products_by_retailer.setdefault(retailer, []).append(product)
+
+    for retailer, products in products_by_retailer.items():
+        target = write_spec_arrays(retailer, products)
+        if target is None:
+            return
+        print(f"{retailer}: {len(products)} products normalized. Saved to {target}")
+
+    arrays = load_spec_arrays(retailers)
+    matches = filter_laptops(arrays)
+    print(f"\n16 GB+ laptops under 50,000 MKD with a 15-16\" screen: {len(matches)}")
+
+
+if __name__ == "__main__":
+    normalize_reforged_data(sys.argv[1:] or None)
@@ -0,0 +1,310 @@
+import argparse
+import hashlib
+import html
+import json
+import os
+import time
+from datetime import date
+from pathlib import Path
+from string import Template
+from xml.sax.saxutils import escape as xml_escape
+
+from catalogue import BASE_DIR, keyed_products, reforged_file, slugify
+from jsonld_graph import RETAILERS, load_products
+
+SITE_DIR = BASE_DIR / "site"
+MANIFEST_NAME = "build_manifest.json"
+# Canonical links, JSON-LD urls and the sitemap point here; set SITE_BASE_URL (or
+# --base-url) to the public address before publishing.
+BASE_URL = os.environ.get("SITE_BASE_URL", "http://localhost:8000/")
+
+PAGE = Template("""<!DOCTYPE html>
+<html lang="mk">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>$title</title>
+<meta name="description" content="$description">
+<link rel="canonical" href="$canonical">
+<script type="application/ld+json">
+$jsonld
+</script>
+</head>
+<body>
+<nav><a href="${root}index.html">Home</a>$breadcrumb</nav>
+<main>
+$main
+</main>
+</body>
+</html>
+""")
+
+PRODUCT_MAIN = Template("""<h1>$name</h1>
+<p class="price">$price</p>
+<p>$availability at $retailer</p>
+<p>Brand: $brand &middot; Category: <a href="${root}$category_path">$category</a></p>
+$description
+<table class="specs">
+$specs
+</table>""")
+
+SPEC_ROW = Template("<tr><th>$name</th><td>$value</td></tr>")
+
+LISTING_MAIN = Template("""<h1>$heading</h1>
+<p>$count products</p>
+<ul class="products">
+$items
+</ul>""")
+
+LISTING_ITEM = Template('<li><a href="${root}$path">$name</a> <span class="price">$price</span> <small>$retailer</small></li>')
+
+INDEX_MAIN = Template("""<h1>Tech prices in North Macedonia</h1>
+<h2>Categories</h2>
+<ul>
+$categories
+</ul>
+<h2>Brands</h2>
+<ul>
+$brands
+</ul>""")
+
+INDEX_ITEM = Template('<li><a href="$path">$name</a> ($count)</li>')
+
+# Any change to the templates changes every page hash, so the next build re-renders everything.
+TEMPLATES_FINGERPRINT = hashlib.blake2b("\0".join(
+    template.template for template in (PAGE, PRODUCT_MAIN, SPEC_ROW, LISTING_MAIN, LISTING_ITEM, INDEX_MAIN,
+                                       INDEX_ITEM)).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def format_price(offers):
+    if not offers or offers.get("price") is None:
+        return "Price on request"
+    return f"{offers['price']:,.0f} {offers.get('priceCurrency') or ''}".strip()
+
+
+def script_json(data):
+    """JSON for a <script> element: '</' is escaped so a product name cannot close the element."""
+    return json.dumps(data, ensure_ascii=False, indent=2).replace("</", "<\\/")
+
+
+def page_hash(*parts):
+    digest = hashlib.blake2b(TEMPLATES_FINGERPRINT.encode("utf-8"), digest_size=16)
+    for part in parts:
+        digest.update(b"\0")
+        digest.update(json.dumps(part, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class Page:
+    """A page to write: where it goes, the hash of everything it is rendered from, and how to render it."""
+
+    __slots__ = ("path", "hash", "render")
+
+    def __init__(self, path, hash, render):
+        self.path = path
+        self.hash = hash
+        self.render = render
+
+
+def product_path(retailer, key, name):
+    return f"products/{retailer}/{slugify(name)}-{key.split(':', 1)[1]}.html"
+
+
+def listing_path(kind, name):
+    return f"{kind}/{slugify(name)}.html"
+
+
+def product_page(retailer, path, product, base_url):
+    url = base_url + path
+    offers = product.get("offers") or {}
+    brand = (product.get("brand") or {}).get("name")
+    category = product.get("category") or "Other"
+
+    def render():
+        specs = "\n".join(SPEC_ROW.substitute(name=html.escape(str(prop.get("name"))),
+                                              value=html.escape(str(prop.get("value"))))
+                          for prop in product.get("additionalProperty") or [])
+        description = product.get("description")
+        main = PRODUCT_MAIN.substitute(
+            name=html.escape(product.get("name") or ""),
+            price=html.escape(format_price(offers)),
+            availability="In stock" if offers.get("availability", "").endswith("InStock") else "Availability unknown",
+            retailer=html.escape(retailer.capitalize()),
+            brand=(f'<a href="../../{listing_path("brands", brand)}">{html.escape(brand)}</a>' if brand else "-"),
+            category_path=listing_path("categories", category),
+            category=html.escape(category),
+            description=f"<p>{html.escape(description)}</p>" if description else "",
+            specs=specs,
+            root="../../")
+        return PAGE.substitute(
+            title=html.escape(f"{product.get('name')} - {format_price(offers)}"),
+            description=html.escape(description or f"{product.get('name')} at {retailer.capitalize()}", quote=True),
+            canonical=html.escape(url, quote=True),
+            jsonld=script_json(dict(product, url=url)),
+            root="../../",
+            breadcrumb=f' &rsaquo; <a href="../../{listing_path("categories", category)}">{html.escape(category)}</a>',
+            main=main)
+
+    return Page(path, page_hash(base_url, retailer, path, product), render)
+
+
+def listing_page(kind, name, entries, base_url):
+    """A category or brand page; entries are (product path, name, offers, retailer) tuples in catalogue order."""
+    path = listing_path(kind, name)
+    url = base_url + path
+    heading = name if kind == "categories" else f"{name} products"
+
+    def render():
+        items = "\n".join(LISTING_ITEM.substitute(root="../", path=item_path, name=html.escape(item_name or ""),
+                                                  price=html.escape(format_price(offers)),
+                                                  retailer=retailer.capitalize())
+                          for item_path, item_name, offers, retailer in entries)
+        jsonld = {
+            "@context": "https://schema.org",
+            "@type": "CollectionPage",
+            "name": heading,
+            "url": url,
+            "mainEntity": {
+                "@type": "ItemList",
+                "numberOfItems": len(entries),
+                "itemListElement": [{"@type": "ListItem", "position": position, "url": base_url + item_path,
+                                     "name": item_name}
+                                    for position, (item_path, item_name, _, _) in enumerate(entries, 1)],
+            },
+        }
+        return PAGE.substitute(
+            title=html.escape(heading), description=html.escape(f"{len(entries)} {heading} compared across "
+                                                                 f"North Macedonian retailers", quote=True),
+            canonical=html.escape(url, quote=True), jsonld=script_json(jsonld), root="../", breadcrumb="",
+            main=LISTING_MAIN.substitute(heading=html.escape(heading), count=len(entries), items=items))
+
+    return Page(path, page_hash(base_url, kind, name, entries), render)
+
+
+def index_page(categories, brands, base_url):
+    counts = [[name, listing_path("categories", name), len(entries)] for name, entries in sorted(categories.items())]
+    brand_counts = [[name, listing_path("brands", name), len(entries)] for name, entries in sorted(brands.items())]
+
+    def render():
+        jsonld = {"@context": "https://schema.org", "@type": "WebSite", "name": "Tech prices in North Macedonia",
+                  "url": base_url}
+        main = INDEX_MAIN.substitute(
+            categories="\n".join(INDEX_ITEM.substitute(path=path, name=html.escape(name), count=count)
+                                 for name, path, count in counts),
+            brands="\n".join(INDEX_ITEM.substitute(path=path, name=html.escape(name), count=count)
+                             for name, path, count in brand_counts))
+        return PAGE.substitute(title="Tech prices in North Macedonia",
+                               description="Laptops, TVs and phones from Anhoch, Neptun, Setec and Tehnomarket",
+                               canonical=html.escape(base_url, quote=True), jsonld=script_json(jsonld), root="",
+                               breadcrumb="", main=main)
+
+    return Page("index.html", page_hash(base_url, counts, brand_counts), render)
+
+
+def collect_pages(retailers=None, reforged_dir=None, base_url=BASE_URL):
+    """Every page of the site, in a fixed order, without rendering any of them."""
+    pages = []
+    # Keyed by slug, so names that differ only in case or accents share one page.
+    categories = {}
+    brands = {}
+    for retailer in retailers or RETAILERS:
+        source = reforged_file(retailer, reforged_dir)
+        if not source.exists():
+            print(f"Warning: {source} not found. Skipping.")
+            continue
+        for key, product in keyed_products(retailer, load_products(source)):
+            path = product_path(retailer, key, product.get("name"))
+            pages.append(product_page(retailer, path, product, base_url))
+            entry = (path, product.get("name"), product.get("offers"), retailer)
+            category = product.get("category") or "Other"
+            categories.setdefault(slugify(category), (category, []))[1].append(entry)
+            brand = (product.get("brand") or {}).get("name")
+            if brand:
+                brands.setdefault(slugify(brand), (brand, []))[1].append(entry)
+
+    categories = dict(categories.values())
+    brands = dict(brands.values())
+    pages.extend(listing_page("categories", name, entries, base_url) for name, entries in categories.items())
+    pages.extend(listing_page("brands", name, entries, base_url) for name, entries in brands.items())
+    pages.append(index_page(categories, brands, base_url))
+    return pages
+
+
+def load_manifest(site_dir):
+    try:
+        with open(Path(site_dir) / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_sitemap(site_dir, base_url, manifest_pages):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for path, (_, lastmod) in sorted(manifest_pages.items()):
+        loc = base_url if path == "index.html" else base_url + path
+        lines.append(f"<url><loc>{xml_escape(loc)}</loc><lastmod>{lastmod}</lastmod></url>")
+    lines.append("</urlset>")
+    content = "\n".join(lines) + "\n"
+
+    sitemap = Path(site_dir) / "sitemap.xml"
+    if not sitemap.exists() or sitemap.read_text(encoding="utf-8") != content:
+        sitemap.write_text(content, encoding="utf-8")
+
+
+def build_site(retailers=None, reforged_dir=None, site_dir=None, base_url=BASE_URL, force=False):
+    """
+    Writes one page per product, category and brand plus index.html and
+    sitemap.xml. A page is only rendered when the hash of the data it is
+    made from differs from the last build (kept in build_manifest.json) or
+    its file is gone; pages of products that disappeared are deleted.
+    Returns (rendered, unchanged, removed) page counts.
+    """
+    site_dir = Path(site_dir or SITE_DIR)
+    base_url = base_url.rstrip("/") + "/"
+    previous = load_manifest(site_dir)
+    old_pages = previous.get("pages", {}) if previous.get("base_url") == base_url else {}
+    today = date.today().isoformat()
+
+    pages = {}
+    rendered = unchanged = 0
+    for page in collect_pages(retailers, reforged_dir, base_url):
+        target = site_dir / page.path
+        old = old_pages.get(page.path)
+        if not force and old and old[0] == page.hash and target.exists():
+            pages[page.path] = old
+            unchanged += 1
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(page.render(), encoding="utf-8")
+        pages[page.path] = [page.hash, today]
+        rendered += 1
+
+    removed = 0
+    for path in old_pages.keys() - pages.keys():
+        (site_dir / path).unlink(missing_ok=True)
+        removed += 1
+
+    write_sitemap(site_dir, base_url, pages)
+    site_dir.mkdir(parents=True, exist_ok=True)
+    with open(site_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump({"base_url": base_url, "pages": pages}, f, separators=(",", ":"))
+    return rendered, unchanged, removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the static catalogue site with embedded JSON-LD.")
+    parser.add_argument("--base-url", default=BASE_URL, help="public URL the site is served from")
+    parser.add_argument("--out", type=Path, default=SITE_DIR)
+    parser.add_argument("--force", action="store_true", help="re-render every page")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rendered, unchanged, removed = build_site(site_dir=args.out, base_url=args.base_url,
+                                              force=args.force)
+    print(f"Site built in {args.out}: {rendered} pages rendered, {unchanged} unchanged, {removed} removed "
+          f"in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
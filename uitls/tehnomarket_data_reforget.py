@@ -1,13 +1,17 @@
 import re
-import json
-import pandas as pd
 import os
+import sys
 from pathlib import Path
 
+from parse_profiler import profiled
+from product_model import Offer, Product, write_products
+from reforge_input import is_missing, read_rows
+from reforge_outputs import rebuild_catalogue_outputs, write_derived_outputs
+
 
 def parse_price(price_str):
     try:
-        if pd.isna(price_str):
+        if is_missing(price_str):
             return None
         cleaned = str(price_str).replace(' ден.', '').replace(',', '')
         price_float = float(cleaned)
@@ -17,7 +21,7 @@ def parse_price(price_str):
 
 
 def parse_laptop_name(name):
-    if pd.isna(name):
+    if is_missing(name):
         return {"brand": None, "model": None, "cpu": None, "ram": None,
                 "storage": None, "gpu": None, "screen_size": None, "color": None}
 
@@ -104,7 +108,7 @@ def parse_phone_name(name):
     Parses a Tehnomarket phone name string into its components.
     Tehnomarket phone names are extremely detailed.
     """
-    if pd.isna(name):
+    if is_missing(name):
         return {"brand": None, "model": None, "ram": None, "storage": None, "color": None, "network": None}
 
     result = {
@@ -165,7 +169,7 @@ def parse_phone_name(name):
 
 
 def parse_tv_name(name):
-    if pd.isna(name):
+    if is_missing(name):
         return {"brand": None, "model": None, "size": None, "resolution": None, "technology": None,
                 "smart_platform": None}
 
@@ -214,31 +218,7 @@ def parse_tv_name(name):
 
 
 def create_product_schema(product_id, category, original_name, price, parsed_data):
-    product = {
-        "@context": "https://schema.org",
-        "@type": "Product",
-        "@id": product_id,
-        "category": category,
-        "name": original_name,
-        "offers": {
-            "@type": "Offer",
-            "price": price,
-            "priceCurrency": "MKD",
-            "availability": "https://schema.org/InStock"
-        }
-    }
-
-    if parsed_data.get("brand"):
-        product["brand"] = {
-            "@type": "Brand",
-            "name": parsed_data["brand"]
-        }
-
-    if parsed_data.get("model"):
-        product["model"] = parsed_data["model"]
-
-    if parsed_data.get("color"):
-        product["color"] = parsed_data["color"]
+    offer = Offer(price, "MKD")
 
     additional_props = []
 
@@ -268,14 +248,7 @@ def create_product_schema(product_id, category, original_name, price, parsed_dat
 
     for key, schema_name in properties_map.items():
         if parsed_data.get(key):
-            additional_props.append({
-                "@type": "PropertyValue",
-                "name": schema_name,
-                "value": parsed_data[key]
-            })
-
-    if additional_props:
-        product["additionalProperty"] = additional_props
+            additional_props.append((schema_name, parsed_data[key]))
 
     description_parts = []
     if parsed_data.get("brand"):
@@ -289,18 +262,23 @@ def create_product_schema(product_id, category, original_name, price, parsed_dat
     if category == "Televisions" and parsed_data.get("size"):
         description_parts.append(f"{parsed_data['size']} {parsed_data.get('technology', 'display')}")
 
-    if description_parts:
-        product["description"] = " ".join(description_parts) + "."
+    description = " ".join(description_parts) + "." if description_parts else None
 
-    return product
+    return Product(product_id, category, original_name, offer,
+                   brand=parsed_data.get("brand") or None,
+                   model=parsed_data.get("model") or None,
+                   color=parsed_data.get("color") or None,
+                   properties=additional_props,
+                   description=description)
 
 
-def process_tehnomarket_data():
+def process_tehnomarket_data(graph_output=False, data_dir=None, output_dir=None, derived_outputs=True, backend=None,
+                             columnar_format="ipc"):
     base_dir = Path(__file__).parent.parent
-    data_dir = base_dir / "data"
-    output_dir = base_dir / "reforged_data"
+    data_dir = Path(data_dir) if data_dir else base_dir / "data"
+    output_dir = Path(output_dir) if output_dir else base_dir / "reforged_data"
 
-    output_dir.mkdir(exist_ok=True)
+    output_dir.mkdir(parents=True, exist_ok=True)
 
     all_products = []
     product_id_counter = 1
@@ -322,12 +300,8 @@ def process_tehnomarket_data():
 
         try:
             print(f"Processing {file_path}...")
-            df = pd.read_csv(file_path)
-
-            df = df.dropna(subset=['name'])
-
             processed_count = 0
-            for index, row in df.iterrows():
+            for row in read_rows(file_path, skip_missing=["name"], backend=backend):
                 price = parse_price(row['price'])
 
                 if price is None:
@@ -350,14 +324,22 @@ def process_tehnomarket_data():
             traceback.print_exc()
 
     output_file = output_dir / "tehnomarket_products_structured.jsonld"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(all_products, f, indent=2, ensure_ascii=False)
+    write_products(all_products, output_file)
 
     print(f"\nSuccessfully processed {len(all_products)} products total")
     print(f"Output saved to {output_file}")
 
+    if derived_outputs:
+        write_derived_outputs("tehnomarket", all_products, output_dir, graph_output=graph_output,
+                              columnar_format=columnar_format)
+
     return all_products
 
 
 if __name__ == "__main__":
-    process_tehnomarket_data()
\ No newline at end of file
+    with profiled(sys.modules[__name__], "--profile" in sys.argv, "--tracemalloc" in sys.argv):
+        process_tehnomarket_data(graph_output="--graph" in sys.argv, backend="pandas" if "--pandas" in sys.argv else None,
+                                 columnar_format="parquet" if "--parquet" in sys.argv else "ipc")
+    # The pipeline passes --no-catalogue and rebuilds the cross-retailer outputs once after all reforges.
+    if "--no-catalogue" not in sys.argv:
+        rebuild_catalogue_outputs()
\ No newline at end of file